@@ -0,0 +1 @@
+"""Benchmarks for Yo-tei. Run from the project root with ``python -m benchmarks.<name>``."""
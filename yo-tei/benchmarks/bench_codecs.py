@@ -0,0 +1,81 @@
+"""Compare row codecs on realistic Yo-tei models.
+
+Measures encode and decode time plus stored size (raw and, for archived
+events, zlib-compressed) for every codec whose package is installed.
+
+    python -m benchmarks.bench_codecs [--iterations N] [--json]
+"""
+
+import argparse
+import json
+import random
+import time
+import zlib
+from typing import Callable, Dict, List
+
+from yotei.db.codecs import CODECS, get_codec
+from yotei.db.local import ARCHIVE_COMPRESSION_LEVEL
+
+from .synthetic import make_event, make_friend, make_schedule
+
+
+def _time(fn: Callable[[], object], iterations: int) -> float:
+    """Mean microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(iterations: int = 2000, seed: int = 7) -> List[Dict]:
+    """Benchmark every available codec and return one result row per (codec, model)."""
+    rng = random.Random(seed)
+    samples = {
+        "event": make_event(rng),
+        "friend": make_friend(rng, 1),
+        "schedule": make_schedule(rng),
+    }
+
+    results = []
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except RuntimeError:
+            continue
+        for kind, model in samples.items():
+            data = codec.encode(model)
+            raw = data.encode() if isinstance(data, str) else data
+            model_cls = type(model)
+            assert codec.decode(model_cls, data).model_dump() == model.model_dump()
+            results.append({
+                "codec": name,
+                "model": kind,
+                "encode_us": round(_time(lambda: codec.encode(model), iterations), 2),
+                "decode_us": round(_time(lambda: codec.decode(model_cls, data), iterations), 2),
+                "bytes": len(raw),
+                "zlib_bytes": len(zlib.compress(raw, ARCHIVE_COMPRESSION_LEVEL)),
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'codec':<8} {'model':<9} {'encode µs':>10} {'decode µs':>10} {'bytes':>8} {'zlib':>8}")
+    for row in results:
+        print(
+            f"{row['codec']:<8} {row['model']:<9} {row['encode_us']:>10} {row['decode_us']:>10} "
+            f"{row['bytes']:>8} {row['zlib_bytes']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Scheduling benchmark on synthetic calendars.
+
+Builds groups of varied calendars (recurring blocks, blackouts, dense
+one-off busy slots) for every combination of group size and horizon, then
+times the scheduling hot paths and reports p50/p99 latency as JSON, in the
+same format as ``bench_storage`` so reports can be compared. Each group
+keeps one evening a week free for everyone, so the common-slot searches
+find and return slots at every group size; ``results`` counts them.
+
+    python -m benchmarks.bench_scheduling --output report.json
+    python -m benchmarks.bench_scheduling --compare report.json --max-regression 0.25
+
+Each operation is also timed once "cold", right after every schedule's
+compiled form has been dropped.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Sized
+
+from yotei.agent.scheduler import ENGINES, Scheduler, np
+from yotei.models.event import EventType
+from yotei.models.schedule import MinuteSlot, day_minutes, find_common_availability
+
+from .bench_storage import _git_commit, _summarize, compare
+from .synthetic import make_calendar, make_shared_windows
+
+REPORT_VERSION = 1
+START = date(2025, 6, 2)  # A Monday
+ZONES = ["America/Los_Angeles", "America/New_York", "Europe/London"]
+
+
+def _time(fn: Callable[[], Sized], repeats: int, schedules: list) -> Dict:
+    """One cold call, then ``repeats`` warm ones; timings in milliseconds."""
+    for schedule in schedules:
+        schedule.invalidate()
+    started = time.perf_counter()
+    result = fn()
+    cold = (time.perf_counter() - started) * 1000
+
+    warm = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        warm.append((time.perf_counter() - started) * 1000)
+    return {**_summarize(warm), "cold_ms": round(cold, 3), "results": len(result)}
+
+
+def run_case(
+    rng: random.Random,
+    participants: int,
+    days: int,
+    repeats: int,
+    candidates: int,
+    checks: int,
+    mixed_zones: bool,
+) -> Dict[str, Dict]:
+    """Time every operation for one group size and horizon."""
+    shared = make_shared_windows(rng, START, days, ZONES[0])
+    schedules = [
+        make_calendar(rng, f"U{i}", START, days, ZONES[i % len(ZONES)] if mixed_zones else ZONES[0], shared)
+        for i in range(participants)
+    ]
+    preferences = {
+        schedule.user_id: {
+            flag: rng.random() < 0.2 for flag in ("early_bird", "night_owl", "budget_conscious")
+        }
+        for schedule in schedules
+    }
+    end = START + timedelta(days=days - 1)
+
+    # Candidate slots spread over the horizon, on the 15-minute grid
+    first = day_minutes(START)
+    slots = []
+    for _ in range(candidates):
+        begin = first + 15 * rng.randrange(days * 96)
+        slots.append(MinuteSlot(begin, begin + 15 * rng.randint(4, 16)))
+    proposals = slots[:checks]
+
+    operations = {}
+    operations["find_common_availability"] = lambda: find_common_availability(schedules, START, end, 2.0)
+    for engine in ENGINES:
+        if engine == "bitmap" and np is None:
+            continue
+        scheduler = Scheduler(engine)
+        for schedule in schedules:
+            scheduler.add_schedule(schedule.user_id, schedule)
+        operations[f"find_common_slots[{engine}]"] = (
+            lambda scheduler=scheduler: scheduler.find_common_slots(EventType.DINNER, START, end)
+        )
+
+    scheduler = Scheduler()
+    for schedule in schedules:
+        scheduler.add_schedule(schedule.user_id, schedule)
+    operations["rank_slots"] = lambda: scheduler.rank_slots(slots, EventType.DINNER, preferences)
+    operations["check_conflicts"] = lambda: [scheduler.check_conflicts(slot) for slot in proposals]
+    operations["check_conflicts_bulk"] = lambda: scheduler.check_conflicts_bulk(slots)
+
+    return {name: _time(fn, repeats, schedules) for name, fn in operations.items()}
+
+
+def run(
+    participant_counts: List[int],
+    horizons: List[int],
+    repeats: int,
+    candidates: int,
+    checks: int,
+    mixed_zones: bool,
+    seed: int,
+) -> Dict:
+    """Run every (group size, horizon) case and return the benchmark report."""
+    rng = random.Random(seed)
+    operations = {}
+    for participants in participant_counts:
+        for days in horizons:
+            case = run_case(rng, participants, days, repeats, candidates, checks, mixed_zones)
+            for name, result in case.items():
+                operations[f"{name} n={participants} d={days}"] = result
+            print(f"n={participants:<4} days={days:<4} done", file=sys.stderr)
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+        "seed": seed,
+        "scale": {
+            "participants": participant_counts,
+            "days": horizons,
+            "repeats": repeats,
+            "candidates": candidates,
+            "checks": checks,
+            "mixed_zones": mixed_zones,
+        },
+        "operations": operations,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, nargs="+", default=[2, 10, 50, 200, 500])
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90, 365], help="search horizons")
+    parser.add_argument("--repeats", type=int, default=5, help="warm timed calls per operation")
+    parser.add_argument("--candidates", type=int, default=1000, help="slots passed to rank_slots and check_conflicts_bulk")
+    parser.add_argument("--checks", type=int, default=20, help="slots passed to check_conflicts")
+    parser.add_argument("--mixed-zones", action="store_true", help="spread participants over three time zones")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="only groups up to 50 and horizons up to 30 days")
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="baseline report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="fail when p50/p99 grow by more than this fraction")
+    args = parser.parse_args()
+
+    participants, days = args.participants, args.days
+    if args.quick:
+        participants = [n for n in participants if n <= 50] or [2]
+        days = [d for d in days if d <= 30] or [7]
+
+    report = run(participants, days, args.repeats, args.candidates, args.checks, args.mixed_zones, args.seed)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print("\n".join(["", "Regressions:"] + regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare pydantic ``TimeSlot`` with the compact ``MinuteSlot``.
+
+Measures construction time and allocated bytes, ranking time, and a full
+common-availability search returning each type.
+
+    python -m benchmarks.bench_slots [--slots N] [--json]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+from yotei.agent.scheduler import Scheduler
+from yotei.models.event import EventType
+from yotei.models.schedule import (
+    MinuteSlot,
+    TimeSlot,
+    common_minute_slots,
+    find_common_availability,
+    to_minutes,
+)
+
+from .synthetic import make_schedule
+
+
+def _measure(fn: Callable[[], object]) -> Dict[str, float]:
+    """Wall time of one call, then bytes still allocated by its result."""
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    result = fn()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"ms": round(elapsed * 1000, 2), "bytes": allocated}
+
+
+def run(slots: int = 10_000, participants: int = 20, days: int = 365, seed: int = 7) -> List[Dict]:
+    """Benchmark both slot types; one result row per (case, type)."""
+    rng = random.Random(seed)
+    bounds = []
+    for _ in range(slots):
+        start = datetime(2025, 1, 1) + timedelta(minutes=15 * rng.randrange(365 * 96))
+        bounds.append((start, start + timedelta(minutes=15 * rng.randint(4, 16))))
+    minute_bounds = [(to_minutes(start), to_minutes(end)) for start, end in bounds]
+    timeslots = [TimeSlot(start=start, end=end) for start, end in bounds]
+    compact = [MinuteSlot(start, end) for start, end in minute_bounds]
+
+    scheduler = Scheduler()
+    preferences = {"U1": {"early_bird": True}, "U2": {"budget_conscious": True}}
+    schedules = [
+        make_schedule(rng).model_copy(update={"user_id": f"U{i}"}) for i in range(participants)
+    ]
+    first = date(2025, 6, 1)
+    last = first + timedelta(days=days - 1)
+
+    cases = {
+        "construct": (
+            lambda: [TimeSlot(start=start, end=end) for start, end in bounds],
+            lambda: [MinuteSlot(start, end) for start, end in minute_bounds],
+        ),
+        "rank": (
+            lambda: scheduler.rank_slots(timeslots, EventType.DINNER, preferences),
+            lambda: scheduler.rank_slots(compact, EventType.DINNER, preferences),
+        ),
+        "common_availability": (
+            lambda: find_common_availability(schedules, first, last, 2.0),
+            lambda: common_minute_slots(schedules, first, last, 2.0),
+        ),
+    }
+
+    results = []
+    for case, (with_timeslot, with_minuteslot) in cases.items():
+        for kind, fn in (("TimeSlot", with_timeslot), ("MinuteSlot", with_minuteslot)):
+            results.append({"case": case, "type": kind, **_measure(fn)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slots", type=int, default=10_000)
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.slots, args.participants, args.days)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'case':<20} {'type':<11} {'ms':>9} {'bytes':>11}")
+    for row in results:
+        print(f"{row['case']:<20} {row['type']:<11} {row['ms']:>9} {row['bytes']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Latency benchmark for the local Database at realistic scale.
+
+Fills a fresh database with synthetic users, friends, schedules and events
+(with proposals and notes), then samples the hot storage calls and reports
+p50/p99 latency as JSON. The decoded-model cache is cleared before every
+read sample, so reads measure SQLite and decoding rather than memory;
+``get_user_events_cache_hit`` and ``get_user_events_cache_off`` time the
+same call with the user's events already cached and with the cache disabled.
+``get_user_events_blob`` times the same reads against a copy of the events
+in the layout the store used before its normalized schema, one JSON
+document per event, as a before/after for ``get_user_events``.
+
+    python -m benchmarks.bench_storage --output report.json
+    python -m benchmarks.bench_storage --compare report.json --max-regression 0.25
+
+The defaults (10k friends, 100k events) take a few minutes; ``--quick``
+runs at a tenth of that scale.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiosqlite
+
+from yotei.db.local import Database
+from yotei.models.event import Event, EventStatus
+from yotei.models.user import User
+
+from .synthetic import make_event, make_friend, make_schedule
+
+REPORT_VERSION = 1
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    return samples[min(len(samples) - 1, round(q * (len(samples) - 1)))]
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "samples": len(samples),
+        "p50_ms": round(_percentile(samples, 0.50), 3),
+        "p99_ms": round(_percentile(samples, 0.99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+async def _sample(
+    count: int,
+    prepare: Callable[[], Awaitable[tuple]],
+    call: Callable[..., Awaitable[object]],
+) -> List[float]:
+    """Time ``call(*await prepare())`` ``count`` times, in milliseconds."""
+    timings = []
+    for _ in range(count):
+        args = await prepare()
+        started = time.perf_counter()
+        await call(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def _sample_uncached(db: Database, *args) -> List[float]:
+    """``_sample`` with the decoded-model cache turned off."""
+    maxsize, db.cache.maxsize = db.cache.maxsize, 0
+    try:
+        return await _sample(*args)
+    finally:
+        db.cache.maxsize = maxsize
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def populate(db: Database, rng: random.Random, scale: Dict[str, int]) -> Dict[str, float]:
+    """Load the synthetic data set; returns the time each phase took."""
+    timings = {}
+    batch = scale["batch_size"]
+
+    started = time.perf_counter()
+    users = [User(name=f"User {i}") for i in range(scale["users"])]
+    async with db.transaction():
+        for user in users:
+            await db.save_user(user)
+            await db.save_schedule(make_schedule(rng).model_copy(update={"user_id": user.id}))
+    timings["users_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    owner = users[0].id
+    for start in range(0, scale["friends"], batch):
+        await db.save_friends(owner, [
+            make_friend(rng, i) for i in range(start, min(start + batch, scale["friends"]))
+        ])
+    timings["friends_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    user_ids = [user.id for user in users]
+    statuses = list(EventStatus)
+    for start in range(0, scale["events"], batch):
+        events = []
+        for _ in range(min(batch, scale["events"] - start)):
+            event = make_event(
+                rng,
+                participants=scale["participants"],
+                proposals=scale["proposals"],
+                notes=scale["notes"],
+                user_ids=user_ids,
+            )
+            event.status = rng.choice(statuses)
+            events.append(event)
+        await db.save_events(events)
+    timings["events_s"] = time.perf_counter() - started
+
+    return {name: round(seconds, 2) for name, seconds in timings.items()}
+
+
+# The events tables and user query from before the normalized schema
+_BLOB_SCHEMA = """
+    CREATE TABLE events (
+        id TEXT PRIMARY KEY,
+        creator_id TEXT NOT NULL,
+        data TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE TABLE event_participants (
+        event_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        PRIMARY KEY (event_id, user_id),
+        FOREIGN KEY (event_id) REFERENCES events(id)
+    );
+"""
+_BLOB_USER_EVENTS = """
+    SELECT DISTINCT e.data FROM events e
+    LEFT JOIN event_participants ep ON e.id = ep.event_id
+    WHERE e.creator_id = ? OR ep.user_id = ?
+    ORDER BY e.updated_at DESC
+"""
+
+
+async def copy_to_blobs(db: Database, event_ids: List[str], path: Path, batch: int) -> aiosqlite.Connection:
+    """Write every event to a database in the JSON document layout."""
+    blobs = await aiosqlite.connect(path)
+    await blobs.executescript(_BLOB_SCHEMA)
+    for start in range(0, len(event_ids), batch):
+        events = await db.get_events(event_ids[start:start + batch])
+        await blobs.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", [
+            (
+                event.id, event.creator_id, event.model_dump_json(), event.status.value,
+                event.created_at.isoformat(), event.updated_at.isoformat(),
+            )
+            for event in events
+        ])
+        await blobs.executemany("INSERT INTO event_participants VALUES (?, ?)", [
+            (event.id, participant.user_id) for event in events for participant in event.participants
+        ])
+    await blobs.commit()
+    return blobs
+
+
+async def get_user_events_blob(blobs: aiosqlite.Connection, user_id: str) -> List[Event]:
+    """``get_user_events`` as it read the JSON document layout."""
+    async with blobs.execute(_BLOB_USER_EVENTS, (user_id, user_id)) as cursor:
+        return [Event.model_validate_json(row[0]) for row in await cursor.fetchall()]
+
+
+async def run(scale: Dict[str, int], samples: int, seed: int, db_path: Path) -> Dict:
+    """Build the data set at ``db_path`` and return the benchmark report."""
+    rng = random.Random(seed)
+    db = Database(db_path)
+    await db.connect()
+    try:
+        load = await populate(db, rng, scale)
+
+        async with db._reader() as conn:
+            async with conn.execute("SELECT id FROM users") as cursor:
+                user_ids = [row[0] for row in await cursor.fetchall()]
+            async with conn.execute("SELECT id FROM events") as cursor:
+                event_ids = [row[0] for row in await cursor.fetchall()]
+        owner = (await db.get_current_user()).id
+        blobs = await copy_to_blobs(
+            db, event_ids, db_path.with_name(f"{db_path.stem}-blobs.db"), scale["batch_size"],
+        )
+
+        async def an_event():
+            event = await db.get_event(rng.choice(event_ids))
+            event.add_agent_note(event.participants[0].agent_id, "negotiation", "Benchmark note")
+            event.status = rng.choice(list(EventStatus))
+            return (event,)
+
+        async def a_user():
+            db.cache.clear()
+            return (rng.choice(user_ids),)
+
+        async def a_cached_user():
+            user_id = rng.choice(user_ids)
+            await db.get_user_events(user_id)
+            return (user_id,)
+
+        async def the_owner():
+            db.cache.clear()
+            return (owner,)
+
+        try:
+            operations = {
+                "save_event": await _sample(samples, an_event, db.save_event),
+                "get_user_events": await _sample(samples, a_user, db.get_user_events),
+                "get_user_events_cache_hit": await _sample(samples, a_cached_user, db.get_user_events),
+                "get_user_events_cache_off": await _sample_uncached(db, samples, a_user, db.get_user_events),
+                "get_user_events_blob": await _sample(
+                    samples, a_user, lambda user_id: get_user_events_blob(blobs, user_id),
+                ),
+                "get_all_friends": await _sample(max(1, samples // 4), the_owner, db.get_all_friends),
+                "get_schedule": await _sample(samples, a_user, db.get_schedule),
+            }
+        finally:
+            await blobs.close()
+    finally:
+        await db.close()
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": seed,
+        "scale": scale,
+        "load": load,
+        "operations": {name: _summarize(timings) for name, timings in operations.items()},
+    }
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Print per-operation changes against a baseline; return the regressions."""
+    regressions = []
+    width = max([18] + [len(name) for name in report["operations"]])
+    print(f"{'operation':<{width}} {'p50 ms':>16} {'p99 ms':>16}")
+    for name, current in report["operations"].items():
+        before = baseline.get("operations", {}).get(name)
+        if before is None:
+            print(f"{name:<{width}} {'(new)':>16}")
+            continue
+        cells = []
+        for key in ("p50_ms", "p99_ms"):
+            ratio = current[key] / before[key] if before[key] else 1.0
+            cells.append(f"{before[key]:.2f}→{current[key]:.2f}")
+            if ratio > 1 + max_regression:
+                regressions.append(f"{name} {key[:3]} {ratio:.2f}x slower")
+        print(f"{name:<{width}} {cells[0]:>16} {cells[1]:>16}")
+    if report.get("scale") != baseline.get("scale"):
+        print("warning: baseline was recorded at a different scale")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--friends", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--participants", type=int, default=4, help="participants per event")
+    parser.add_argument("--proposals", type=int, default=2, help="proposals per event")
+    parser.add_argument("--notes", type=int, default=8, help="agent notes per event")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="run at a tenth of the scale")
+    parser.add_argument("--db", type=Path, help="keep the generated database at this path")
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="baseline report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="fail when p50/p99 grow by more than this fraction")
+    args = parser.parse_args()
+
+    scale = {
+        "users": args.users,
+        "friends": args.friends,
+        "events": args.events,
+        "participants": args.participants,
+        "proposals": args.proposals,
+        "notes": args.notes,
+        "batch_size": args.batch_size,
+    }
+    if args.quick:
+        for key in ("users", "friends", "events"):
+            scale[key] = max(args.participants + 1, scale[key] // 10)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = args.db or Path(tmpdir) / "bench.db"
+        report = asyncio.run(run(scale, args.samples, args.seed, db_path))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print("\n".join(["", "Regressions:"] + regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Synthetic Yo-tei models for the benchmarks.
+
+Every generator takes a ``random.Random`` so runs are reproducible.
+"""
+
+import random
+from typing import List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, date, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from yotei.models.event import (
+    Event,
+    EventType,
+    DateRange,
+    Location,
+    Proposal,
+    ParticipantStatus,
+)
+from yotei.models.friend import FriendRelationship, RelationshipType
+from yotei.models.schedule import Schedule, TimeSlot
+from yotei.models.user import AvailabilityBlock, BlackoutDate
+
+
+def make_event(
+    rng: random.Random,
+    participants: int = 6,
+    proposals: int = 3,
+    notes: int = 50,
+    user_ids: Optional[List[str]] = None,
+) -> Event:
+    """An event at the size a long negotiation reaches.
+
+    With ``user_ids``, the creator and participants are drawn from that pool.
+    """
+    if user_ids:
+        creator_id, *members = rng.sample(user_ids, participants + 1)
+    else:
+        creator_id, members = "YT-CREATOR", [f"YT-USER-{i:04d}" for i in range(participants)]
+    start = datetime(2025, 6, 1, 18) + timedelta(days=rng.randrange(60))
+    event = Event(
+        creator_id=creator_id,
+        title=f"Dinner #{rng.randrange(10_000)}",
+        description="Catch-up dinner somewhere with vegetarian options and room for eight.",
+        event_type=EventType.DINNER,
+        date_range=DateRange(start=start, end=start + timedelta(hours=3)),
+        location=Location(name="Nopa", address="560 Divisadero St", city="San Francisco"),
+        budget_per_person=60.0,
+    )
+    for i, user_id in enumerate(members):
+        event.participants.append(ParticipantStatus(
+            user_id=user_id,
+            user_name=f"Friend {i}",
+            agent_id=f"AGENT-{user_id[3:]}",
+            enthusiasm_level=rng.randint(1, 5),
+            constraints_shared=["vegetarian"] if i % 3 == 0 else [],
+        ))
+    for i in range(proposals):
+        proposal = Proposal(
+            proposer_agent_id="AGENT-CREATOR",
+            date_range=DateRange(start=start + timedelta(days=i), end=start + timedelta(days=i, hours=3)),
+            activity_suggestion="Dinner then drinks",
+            estimated_cost_per_person=55.0 + i,
+            reasoning="Most people are free on weekday evenings and prefer the Mission.",
+        )
+        proposal.responses = {p.agent_id: rng.choice(["accept", "modify", "decline"]) for p in event.participants}
+        event.add_proposal(proposal)
+    for i in range(notes):
+        event.add_agent_note(
+            event.participants[i % participants].agent_id,
+            rng.choice(["negotiation", "constraint", "decision"]),
+            f"Round {i}: prefers later start, flexible on location within 5 miles.",
+            private=i % 4 == 0,
+        )
+    return event
+
+
+def make_friend(rng: random.Random, index: int) -> FriendRelationship:
+    """A friend with private notes filled in."""
+    return FriendRelationship(
+        friend_id=f"YT-FRND-{index:05d}",
+        friend_name=f"Friend {index}",
+        friend_code=f"YT-FRND-{index:05d}",
+        relationship_type=rng.choice(list(RelationshipType)),
+        private_notes="Prefers quiet places. Don't schedule before 10am.",
+        sensitivities=["money topics"],
+        mutual_friends=[f"YT-FRND-{rng.randrange(10_000):05d}" for _ in range(8)],
+        last_hangout=datetime(2025, 5, 1) + timedelta(days=rng.randrange(30)),
+    )
+
+
+def make_schedule(rng: random.Random) -> Schedule:
+    """A schedule with weekly blocks and a month of one-off busy slots."""
+    schedule = Schedule(
+        user_id="YT-USER-0001",
+        default_availability=[
+            AvailabilityBlock(day_of_week=d, start_hour=18, end_hour=22) for d in range(5)
+        ] + [
+            AvailabilityBlock(day_of_week=d, start_hour=10, end_hour=22) for d in (5, 6)
+        ],
+        blackout_dates=[BlackoutDate(start_date=date(2025, 7, 1), end_date=date(2025, 7, 7), reason="Trip")],
+    )
+    for day in range(30):
+        start = datetime(2025, 6, 1, 19) + timedelta(days=day)
+        schedule.specific_busy[start.date().isoformat()] = [
+            TimeSlot(start=start, end=start + timedelta(hours=rng.randint(1, 3)))
+        ]
+    return schedule
+
+
+def make_shared_windows(
+    rng: random.Random,
+    start: date,
+    days: int,
+    timezone: str = "America/Los_Angeles",
+) -> List[Tuple[datetime, datetime]]:
+    """One evening a week that a whole group keeps free, as UTC datetimes.
+
+    The evening runs 18:00-21:00 in ``timezone``, on a random day of each
+    week. Passed to ``make_calendar`` so that common-slot searches find
+    something at any group size.
+    """
+    zone = ZoneInfo(timezone)
+    windows = []
+    for week_start in range(0, days, 7):
+        day = start + timedelta(days=week_start + rng.randrange(min(7, days - week_start)))
+        evening = datetime.combine(day, datetime.min.time()).replace(hour=18, tzinfo=zone)
+        windows.append((
+            evening.astimezone(dt_timezone.utc),
+            (evening + timedelta(hours=3)).astimezone(dt_timezone.utc),
+        ))
+    return windows
+
+
+def make_calendar(
+    rng: random.Random,
+    user_id: str,
+    start: date,
+    days: int,
+    timezone: str = "America/Los_Angeles",
+    shared: Sequence[Tuple[datetime, datetime]] = (),
+) -> Schedule:
+    """A varied personal calendar over a horizon.
+
+    Recurring evening and weekend blocks that differ per person, a blackout
+    roughly every two months, up to three busy slots on most days and the
+    occasional day of explicit availability. Times sit on the 15-minute grid.
+    Each of the ``shared`` UTC windows is explicitly available, and no
+    blackout covers its date.
+    """
+    zone = ZoneInfo(timezone)
+    shared_local = [
+        (begin.astimezone(zone).replace(tzinfo=None), end.astimezone(zone).replace(tzinfo=None))
+        for begin, end in shared
+    ]
+    shared_dates = {begin.date() for begin, _ in shared_local}
+
+    blocks = []
+    for weekday in range(7):
+        if rng.random() < 0.15:
+            continue
+        if weekday < 5:
+            blocks.append(AvailabilityBlock(
+                day_of_week=weekday, start_hour=rng.randint(16, 19), end_hour=rng.randint(21, 23),
+            ))
+        else:
+            blocks.append(AvailabilityBlock(
+                day_of_week=weekday, start_hour=rng.randint(8, 12), end_hour=rng.randint(19, 23),
+            ))
+
+    blackouts = []
+    for _ in range(max(1, days // 60)):
+        first = start + timedelta(days=rng.randrange(days))
+        last = first + timedelta(days=rng.randint(0, 4))
+        if not any(first <= day <= last for day in shared_dates):
+            blackouts.append(BlackoutDate(start_date=first, end_date=last))
+
+    schedule = Schedule(
+        user_id=user_id,
+        timezone=timezone,
+        default_availability=blocks,
+        blackout_dates=blackouts,
+    )
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        midnight = datetime.combine(day, datetime.min.time())
+        busy = []
+        for _ in range(rng.choice((0, 1, 1, 2, 2, 3))):
+            begin = midnight + timedelta(minutes=15 * rng.randrange(8 * 4, 23 * 4))
+            busy.append(TimeSlot(start=begin, end=begin + timedelta(minutes=15 * rng.randint(2, 12))))
+        if busy:
+            schedule.specific_busy[day.isoformat()] = busy
+        if rng.random() < 0.02:
+            schedule.specific_availability[day.isoformat()] = [
+                TimeSlot(start=midnight + timedelta(hours=10), end=midnight + timedelta(hours=20))
+            ]
+    for begin, end in shared_local:
+        schedule.specific_availability[begin.date().isoformat()] = [TimeSlot(start=begin, end=end)]
+    return schedule
@@ -3,7 +3,9 @@
 from setuptools import setup, find_packages
 
 with open("requirements.txt") as f:
-    requirements = f.read().splitlines()
+    # Without comments, so every pin (tzdata included) reaches install_requires
+    requirements = [line.split("#")[0].strip() for line in f]
+    requirements = [line for line in requirements if line]
 
 setup(
     name="yotei",
@@ -12,6 +14,12 @@ setup(
     author="Yoshi Kondo",
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        # Alternative row codecs (DatabaseConfig.codec)
+        "msgpack": ["msgpack>=1.0"],
+        # Bitmap scheduling engine (SchedulerConfig.engine)
+        "numpy": ["numpy>=1.24"],
+    },
     entry_points={
         "console_scripts": [
             "yotei=yotei.cli:main",
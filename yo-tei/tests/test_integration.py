@@ -1,12 +1,15 @@
 """Integration tests for Yo-tei."""
 
 import asyncio
+import json
 import pytest
-from datetime import date, timedelta
+import pytest_asyncio
+from datetime import date, datetime, timedelta
 
 from yotei.models.user import User
 from yotei.models.friend import FriendRelationship, RelationshipType
-from yotei.models.event import Event, EventType
+from yotei.models.event import Event, EventType, EventStatus, Proposal, DateRange, Location
+from yotei.models.schedule import Schedule
 from yotei.db.local import Database
 from yotei.config.settings import Settings
 from yotei.agent.core import Agent
@@ -18,7 +21,7 @@ import tempfile
 class TestDatabase:
     """Tests for database operations."""
 
-    @pytest.fixture
+    @pytest_asyncio.fixture
     async def db(self):
         """Create a temporary database for testing."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -73,6 +76,702 @@ class TestDatabase:
         assert retrieved.title == "Test Event"
         assert len(retrieved.participants) == 1
 
+    @pytest.mark.asyncio
+    async def test_event_round_trip_with_proposals(self, db):
+        event = Event(creator_id="YT-TEST-1234", title="Dinner", event_type=EventType.DINNER)
+        event.add_participant("YT-P1", "Participant 1", "AGENT-1")
+        event.add_participant("YT-P2", "Participant 2", "AGENT-2")
+        proposal = Proposal(proposer_agent_id="AGENT-1", reasoning="Everyone is free")
+        proposal.responses["AGENT-1"] = "accept"
+        proposal.responses["AGENT-2"] = "modify"
+        event.add_proposal(proposal)
+        event.add_agent_note("AGENT-1", "negotiation", "Starting", private=False)
+
+        await db.save_event(event)
+        retrieved = await db.get_event(event.id)
+
+        assert [p.user_id for p in retrieved.participants] == ["YT-P1", "YT-P2"]
+        assert retrieved.current_proposal_id == proposal.id
+        assert retrieved.proposals[0].responses == {"AGENT-1": "accept", "AGENT-2": "modify"}
+        assert retrieved.agent_notes[0].content == "Starting"
+
+    @pytest.mark.asyncio
+    async def test_loaded_event_matches_validated_copy(self, db):
+        # Loads rebuild models without validating them, so every field has
+        # to come back exactly as validation would produce it
+        start = datetime(2025, 6, 1, 18)
+        event = Event(
+            creator_id="YT-TEST-1234",
+            title="Trip",
+            event_type=EventType.TRIP,
+            date_range=DateRange(start=start, end=start + timedelta(days=2)),
+            location=Location(name="Cabin", city="Tahoe", latitude=39.1),
+            budget_per_person=120.0,
+            pending_nudges={"YT-P1": ["budget"]},
+        )
+        event.add_participant("YT-P1", "Participant 1", "AGENT-1")
+        event.participants[0].constraints_shared = ["budget:$50-100"]
+        event.participants[0].last_response_at = start
+        proposal = Proposal(
+            proposer_agent_id="AGENT-1",
+            date_range=event.date_range,
+            location=event.location,
+            modifications_requested=["later start"],
+        )
+        proposal.responses["AGENT-1"] = "accept"
+        event.add_proposal(proposal)
+        event.add_agent_note("AGENT-1", "negotiation", "Starting", private=False)
+
+        await db.save_event(event)
+        db.cache.clear()
+        retrieved = await db.get_event(event.id)
+
+        assert retrieved.model_dump() == Event.model_validate(retrieved.model_dump()).model_dump()
+        assert retrieved.model_dump(exclude={"updated_at"}) == event.model_dump(exclude={"updated_at"})
+        assert retrieved.location is not retrieved.proposals[0].location
+        assert retrieved.proposals[0].unlogged_responses() == []
+
+    @pytest.mark.asyncio
+    async def test_get_user_events_filters_status(self, db):
+        planning = Event(creator_id="YT-OTHER", title="Planning")
+        planning.add_participant("YT-ME", "Me", "AGENT-ME")
+        confirmed = Event(creator_id="YT-ME", title="Confirmed", status=EventStatus.CONFIRMED)
+        await db.save_event(planning)
+        await db.save_event(confirmed)
+
+        events = await db.get_user_events("YT-ME", status=EventStatus.PLANNING.value)
+        assert [e.title for e in events] == ["Planning"]
+        assert len(await db.get_user_events("YT-ME")) == 2
+
+    @pytest.mark.asyncio
+    async def test_bulk_save_events_and_friends(self, db):
+        events = [Event(creator_id="YT-ME", title=f"Event {i}") for i in range(20)]
+        for i, event in enumerate(events):
+            event.add_participant(f"YT-P{i}", f"Participant {i}", f"AGENT-{i}")
+        await db.save_events(events)
+
+        friends = [
+            FriendRelationship(friend_id=f"YT-F{i}", friend_name=f"Friend {i}", friend_code=f"YT-F{i}")
+            for i in range(10)
+        ]
+        await db.save_friends("YT-ME", friends)
+
+        assert len(await db.get_user_events("YT-ME")) == 20
+        assert (await db.get_event(events[3].id)).participants[0].user_id == "YT-P3"
+        assert await db.get_friends_count("YT-ME") == 10
+
+        # Bulk loading keeps the requested order and skips unknown ids
+        await db.delete_event(events[5].id)
+        wanted = [events[7].id, events[5].id, "EVT-MISSING", events[2].id]
+        loaded = await db.get_events(wanted)
+        assert [e.title for e in loaded] == ["Event 7", "Event 2"]
+        assert loaded[0].participants[0].user_id == "YT-P7"
+
+    @pytest.mark.asyncio
+    async def test_transaction_rolls_back_on_error(self, db):
+        user = User(name="Kept")
+        await db.save_user(user)
+
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await db.save_event(Event(creator_id=user.id, title="Discarded"))
+                await db.save_user(User(name="Discarded"))
+                raise RuntimeError("boom")
+
+        assert await db.get_user_events(user.id) == []
+        assert (await db.get_current_user()).name == "Kept"
+
+    @pytest.mark.asyncio
+    async def test_tasks_started_in_transaction_join_it(self, db):
+        first, second = User(name="First"), User(name="Second")
+
+        # Child tasks share the transaction instead of waiting for its lock
+        async with db.transaction():
+            await asyncio.wait_for(asyncio.gather(db.save_user(first), db.save_user(second)), 2)
+        assert (await db.get_user(second.id)).name == "Second"
+
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await asyncio.wait_for(asyncio.gather(
+                    db.save_user(User(name="Discarded")), db.save_event(Event(creator_id=first.id, title="Gone")),
+                ), 2)
+                raise RuntimeError("boom")
+        assert await db.get_user_events(first.id) == []
+
+        # A task that outlives its transaction commits on its own
+        async with db.transaction():
+            late = asyncio.create_task(asyncio.sleep(0.01))
+        await late
+        await asyncio.wait_for(asyncio.create_task(db.save_user(User(name="Later"))), 2)
+
+    @pytest.mark.asyncio
+    async def test_find_events_searches_text_and_public_notes(self, db):
+        ski = Event(creator_id="YT-ME", title="Ski trip to Tahoe", description="Bring chains")
+        ski.add_agent_note("AGENT-1", "suggestion", "Cabin near Heavenly", private=False)
+        ski.add_agent_note("AGENT-1", "concern", "Secret budget worry", private=True)
+        dinner = Event(creator_id="YT-ME", title="Dinner", status=EventStatus.CONFIRMED)
+        await db.save_events([ski, dinner])
+
+        assert [e.id for e in await db.find_events("ski tah")] == [ski.id]
+        assert [e.id for e in await db.find_events("chains")] == [ski.id]
+        assert [e.id for e in await db.find_events("heavenly")] == [ski.id]
+        assert await db.find_events("budget") == []
+        assert await db.find_events("dinner", status=EventStatus.PLANNING.value) == []
+        assert await db.find_events("dinner", user_id="YT-SOMEONE-ELSE") == []
+
+        ski.title = "Snowboard weekend"
+        await db.save_event(ski)
+        assert await db.find_events("tahoe") == []
+        assert (await db.get_event_by_title("YT-ME", "SNOWBOARD WEEKEND")).id == ski.id
+
+        cafe = Event(creator_id="YT-ME", title="Café Ünter den Linden")
+        await db.save_event(cafe)
+        assert (await db.get_event_by_title("YT-ME", "CAFÉ ÜNTER DEN LINDEN")).id == cafe.id
+        assert await db.get_event_by_title("YT-ME", "Snowboard") is None
+
+    @pytest.mark.asyncio
+    async def test_event_log_appends_notes_and_responses(self, db):
+        from yotei.db.local import EVENT_NOTE_TAIL
+
+        event = Event(creator_id="YT-ME", title="Long negotiation")
+        proposal = Proposal(proposer_agent_id="AGENT-1")
+        event.add_proposal(proposal)
+        proposal.responses["AGENT-2"] = "modify"
+        await db.save_event(event)
+
+        for i in range(EVENT_NOTE_TAIL + 10):
+            event.add_agent_note("AGENT-1", "negotiation", f"Round {i}", private=False)
+        proposal.responses["AGENT-2"] = "accept"
+        await db.save_event_log(event)
+        assert event.unlogged_notes() == []
+        assert proposal.unlogged_responses() == []
+
+        retrieved = await db.get_event(event.id)
+        assert len(retrieved.agent_notes) == EVENT_NOTE_TAIL
+        assert retrieved.agent_notes[-1].content == f"Round {EVENT_NOTE_TAIL + 9}"
+        assert retrieved.proposals[0].responses == {"AGENT-2": "accept"}
+
+        older = await db.get_event_notes(event.id, before_seq=retrieved.agent_notes[0].seq)
+        assert [n.content for n in older] == [f"Round {i}" for i in range(10)]
+
+        # Re-saving a loaded event does not duplicate its history
+        retrieved.add_agent_note("AGENT-1", "decision", "Done", private=False)
+        await db.save_event(retrieved)
+        notes = await db.get_event_notes(event.id, limit=1000)
+        assert len(notes) == EVENT_NOTE_TAIL + 11
+        assert [n.seq for n in notes] == sorted({n.seq for n in notes})
+
+    @pytest.mark.asyncio
+    async def test_event_load_reads_one_snapshot(self, db, monkeypatch):
+        event = Event(creator_id="YT-ME", title="Before")
+        event.add_participant("YT-ME", "Me", "AGENT-ME")
+        await db.save_event(event)
+
+        load_events = db._load_events
+        changed = event.model_copy(deep=True)
+        changed.title = "After"
+        changed.add_participant("YT-FRIEND", "Friend", "AGENT-FRIEND")
+
+        async def load_after_a_write(cursor, rows):
+            # Committed between reading the event row and its participants
+            await db.save_event(changed)
+            return await load_events(cursor, rows)
+
+        monkeypatch.setattr(db, "_load_events", load_after_a_write)
+        loaded = await db.get_event(event.id)
+        assert loaded.title == "Before"
+        assert [p.user_id for p in loaded.participants] == ["YT-ME"]
+
+        monkeypatch.undo()
+        loaded = await db.get_event(event.id)
+        assert loaded.title == "After"
+        assert len(loaded.participants) == 2
+
+    @pytest.mark.asyncio
+    async def test_removed_response_stays_removed(self, db):
+        event = Event(creator_id="YT-ME", title="Changed minds")
+        proposal = Proposal(proposer_agent_id="AGENT-1", responses={"AGENT-2": "accept", "AGENT-3": "modify"})
+        event.add_proposal(proposal)
+        await db.save_event(event)
+
+        del proposal.responses["AGENT-2"]
+        assert proposal.unlogged_responses() == [("AGENT-2", None)]
+        await db.save_event_log(event)
+        assert proposal.unlogged_responses() == []
+        retrieved = await db.get_event(event.id)
+        assert retrieved.proposals[0].responses == {"AGENT-3": "modify"}
+
+        # Answering again after a retraction counts
+        retrieved.proposals[0].responses["AGENT-2"] = "decline"
+        await db.save_event(retrieved)
+        assert (await db.get_event(event.id)).proposals[0].responses == {"AGENT-3": "modify", "AGENT-2": "decline"}
+
+        # A rolled-back retraction is written by the next save
+        del retrieved.proposals[0].responses["AGENT-3"]
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await db.save_event_log(retrieved)
+                raise RuntimeError("abort")
+        assert retrieved.proposals[0].unlogged_responses() == [("AGENT-3", None)]
+        await db.save_event_log(retrieved)
+        assert (await db.get_event(event.id)).proposals[0].responses == {"AGENT-2": "decline"}
+
+    @pytest.mark.asyncio
+    async def test_event_log_appends_from_two_connections(self, db):
+        event = Event(creator_id="YT-ME", title="Busy")
+        await db.save_event(event)
+        other = Database(db.db_path)
+        await other.connect()
+        try:
+            theirs = await other.get_event(event.id)
+
+            # The second writer picks its seq only once the first has committed
+            async with db.transaction():
+                event.add_agent_note("AGENT-1", "negotiation", "Mine", private=False)
+                await db.save_event_log(event)
+                theirs.add_agent_note("AGENT-2", "negotiation", "Theirs", private=False)
+                append = asyncio.create_task(other.save_event_log(theirs))
+                await asyncio.sleep(0.2)
+            await append
+        finally:
+            await other.close()
+
+        notes = (await db.get_event(event.id)).agent_notes
+        assert [(note.seq, note.content) for note in notes] == [(1, "Mine"), (2, "Theirs")]
+
+    @pytest.mark.asyncio
+    async def test_event_log_rewritten_after_rollback(self, db, monkeypatch):
+        events = [Event(creator_id="YT-ME", title=f"Event {i}") for i in range(3)]
+        for event in events:
+            event.add_agent_note("AGENT-1", "negotiation", f"About {event.title}", private=False)
+            proposal = Proposal(proposer_agent_id="AGENT-1")
+            proposal.responses["AGENT-2"] = "accept"
+            event.add_proposal(proposal)
+
+        append_event_log = db._append_event_log
+
+        async def failing_append(cursor, batch):
+            await append_event_log(cursor, batch)
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(db, "_append_event_log", failing_append)
+        with pytest.raises(RuntimeError):
+            await db.save_events(events)
+        assert all(event.agent_notes[0].seq is None for event in events)
+        assert all(event.proposals[0].unlogged_responses() for event in events)
+
+        monkeypatch.undo()
+        await db.save_events(events)
+        for event in events:
+            notes = await db.get_event_notes(event.id)
+            assert [n.content for n in notes] == [f"About {event.title}"]
+            retrieved = await db.get_event(event.id)
+            assert retrieved.proposals[0].responses == {"AGENT-2": "accept"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("codec", ["msgpack"])
+    async def test_mixed_row_formats(self, db, codec):
+        pytest.importorskip(codec)
+        from yotei.config.settings import DatabaseConfig
+
+        old_user = User(name="Written as JSON")
+        await db.save_user(old_user)
+
+        other = Database(db.db_path, DatabaseConfig(codec=codec))
+        await other.connect()
+        new_user = User(name="Written with " + codec)
+        friend = FriendRelationship(friend_id="YT-FRIEND", friend_name="Friend", friend_code="YT-FRIEND")
+        await other.save_user(new_user)
+        await other.save_friend(new_user.id, friend)
+        await other.save_schedule(Schedule(user_id=new_user.id))
+
+        assert (await other.get_user(old_user.id)).name == "Written as JSON"
+        assert (await other.get_friend(new_user.id, "YT-FRIEND")).model_dump() == friend.model_dump()
+        await other.close()
+
+        # The JSON-configured connection still reads rows the other codec wrote
+        assert (await db.get_user(new_user.id)).name == "Written with " + codec
+        assert (await db.get_schedule(new_user.id)).user_id == new_user.id
+
+    @pytest.mark.parametrize("codec", ["json", "msgpack"])
+    def test_codec_round_trips_datetimes_and_enums(self, codec):
+        pytest.importorskip(codec)
+        from yotei.db.codecs import get_codec
+        from yotei.models.event import DateRange
+
+        codec = get_codec(codec)
+        event = Event(
+            creator_id="YT-ME",
+            title="Tahoe",
+            event_type=EventType.TRIP,
+            status=EventStatus.CONFIRMED,
+            date_range=DateRange(start=datetime(2026, 1, 9, 18, 30, 15, 250), end=datetime(2026, 1, 11, 20)),
+        )
+        event.add_participant("YT-P1", "Abby", "AGENT-1")
+        proposal = Proposal(proposer_agent_id="AGENT-1", date_range=event.date_range)
+        proposal.responses["AGENT-1"] = "accept"
+        event.add_proposal(proposal)
+        event.add_agent_note("AGENT-1", "decision", "Booked", private=False)
+        user = User(name="Abby")
+
+        for model in (event, user):
+            decoded = codec.decode(type(model), codec.encode(model))
+            assert decoded == model
+        decoded = codec.decode(Event, codec.encode(event))
+        assert decoded.event_type is EventType.TRIP and decoded.status is EventStatus.CONFIRMED
+        assert decoded.date_range.start == datetime(2026, 1, 9, 18, 30, 15, 250)
+        assert decoded.agent_notes[0].timestamp == event.agent_notes[0].timestamp
+
+    def test_incomplete_codec_cannot_be_created(self):
+        from yotei.db.codecs import Codec
+
+        class EncodeOnly(Codec):
+            name = "encode-only"
+
+            def encode(self, model):
+                return model.model_dump_json()
+
+        with pytest.raises(TypeError):
+            EncodeOnly()
+
+    @pytest.mark.asyncio
+    async def test_archive_moves_old_finished_events(self, db):
+        from yotei.models.event import ParticipantStatus
+
+        done = Event(creator_id="YT-ME", title="Old dinner", status=EventStatus.COMPLETED)
+        done.participants.append(ParticipantStatus(user_id="YT-FRIEND", user_name="Friend", agent_id="AGENT-2"))
+        for i in range(60):
+            done.add_agent_note("AGENT-1", "negotiation", f"Round {i}", private=False)
+        active = Event(creator_id="YT-ME", title="Next dinner")
+        await db.save_events([done, active])
+
+        assert await db.archive_events(30) == 0
+        later = datetime.utcnow() + timedelta(days=31)
+        assert await db.archive_events(30, now=later) == 1
+
+        assert await db.get_event(done.id) is None
+        assert await db.get_event(active.id) is not None
+        assert await db.find_events("Round") == []
+
+        archived = await db.get_archived_event(done.id)
+        assert archived.title == "Old dinner"
+        assert len(archived.agent_notes) == 60
+        assert [e.id for e in await db.get_archived_events("YT-FRIEND")] == [done.id]
+
+    @pytest.mark.asyncio
+    async def test_compact_converts_to_incremental_vacuum(self, db):
+        async with db.transaction(), db._connection.cursor() as cursor:
+            await cursor.execute("PRAGMA auto_vacuum = NONE")
+        await db._connection.execute("VACUUM")
+
+        await db.save_events([
+            Event(creator_id="YT-ME", title=f"Trip {i}", description="x" * 2000, status=EventStatus.CANCELLED)
+            for i in range(200)
+        ])
+        stats = await db.compact(older_than_days=-1)
+
+        assert stats["archived"] == 200
+        assert stats["pages_after"] < stats["pages_before"]
+        async with db._connection.execute("PRAGMA auto_vacuum") as cursor:
+            assert (await cursor.fetchone())[0] == 2
+
+    @pytest.mark.asyncio
+    async def test_compact_refuses_to_run_inside_transaction(self, db):
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await db.compact()
+        await db.save_user(User(name="Still writable"))
+
+    @pytest.mark.asyncio
+    async def test_model_cache_reuses_unchanged_rows(self, db):
+        friend = FriendRelationship(friend_id="YT-F1", friend_name="Friend", friend_code="YT-F1")
+        await db.save_friend("YT-ME", friend)
+        event = Event(creator_id="YT-ME", title="Dinner")
+        await db.save_event(event)
+
+        first = await db.get_all_friends("YT-ME")
+        first_event = await db.get_event(event.id)
+        misses = db.cache_stats()["misses"]
+        assert (await db.get_all_friends("YT-ME"))[0] == first[0]
+        assert (await db.get_user_events("YT-ME"))[0] == first_event
+        assert db.cache_stats()["misses"] == misses
+        assert db.cache_stats()["hits"] >= 2
+
+        friend.private_notes = "Updated"
+        await db.save_friend("YT-ME", friend)
+        assert (await db.get_all_friends("YT-ME"))[0].private_notes == "Updated"
+
+    @pytest.mark.asyncio
+    async def test_model_cache_hands_out_copies(self, db):
+        event = Event(creator_id="YT-ME", title="Dinner")
+        event.add_participant("YT-P1", "Abby", "AGENT-1")
+        proposal = Proposal(proposer_agent_id="AGENT-1")
+        proposal.responses["AGENT-1"] = "accept"
+        event.add_proposal(proposal)
+        await db.save_event(event)
+        schedule = Schedule(user_id="YT-ME")
+        await db.save_schedule(schedule)
+
+        # Changes that are never saved stay with the caller, hit or miss
+        for _ in range(2):
+            fetched = await db.get_event(event.id)
+            fetched.title = "Phantom"
+            fetched.participants[0].user_name = "Phantom"
+            fetched.proposals[0].responses["AGENT-1"] = "decline"
+            fetched.add_agent_note("AGENT-1", "concern", "Never saved")
+            mine = await db.get_schedule("YT-ME")
+            mine.timezone = "Europe/London"
+
+        again = await db.get_event(event.id)
+        assert again.title == "Dinner" and again.participants[0].user_name == "Abby"
+        assert again.proposals[0].responses == {"AGENT-1": "accept"} and again.agent_notes == []
+        assert (await db.get_schedule("YT-ME")).timezone == "America/Los_Angeles"
+        assert db.cache_stats()["hits"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_model_cache_sees_writes_from_other_connections(self, db):
+        user = User(name="Before")
+        await db.save_user(user)
+        assert (await db.get_user(user.id)).name == "Before"
+
+        other = Database(db.db_path)
+        await other.connect()
+        await other.save_user(User(id=user.id, name="After"))
+        await other.close()
+
+        assert (await db.get_user(user.id)).name == "After"
+
+    @pytest.mark.asyncio
+    async def test_iter_event_summaries_matches_get_summary(self, db):
+        from yotei.models.event import DateRange, Location
+
+        events = [Event(creator_id="YT-ME", title=f"Event {i}") for i in range(7)]
+        for event in events:
+            event.add_participant("YT-P1", "Abby", "AGENT-1")
+            event.add_participant("YT-P2", "Ben", "AGENT-2")
+        events[0].location = Location(name="Cafe")
+        events[0].date_range = DateRange(start=datetime(2026, 5, 1, 18), end=datetime(2026, 5, 1, 20))
+        for event in events:
+            await db.save_event(event)
+
+        summaries = [s async for s in db.iter_event_summaries("YT-ME", page_size=3)]
+        expected = [(await db.get_event(e.id)).get_summary() for e in events]
+        by_id = lambda summary: summary["id"]
+        without_cursor = [{k: v for k, v in s.items() if k != "cursor"} for s in summaries]
+        assert sorted(without_cursor, key=by_id) == sorted(expected, key=by_id)
+
+        cursor = summaries[2]["cursor"]
+        resumed = [s["id"] async for s in db.iter_event_summaries("YT-ME", after=cursor, page_size=2)]
+        assert resumed == [s["id"] for s in summaries[3:]]
+        assert [s async for s in db.iter_event_summaries("YT-ME", status="confirmed")] == []
+
+        # The cursor keeps its place after the event it came from moves or goes
+        moved = await db.get_event(summaries[2]["id"])
+        moved.title = "Moved"
+        moved.updated_at = datetime.utcnow()
+        await db.save_event(moved)
+        resumed = [s["id"] async for s in db.iter_event_summaries("YT-ME", after=cursor, page_size=2)]
+        assert resumed == [s["id"] for s in summaries[3:]]
+        await db.delete_event(moved.id)
+        resumed = [s["id"] async for s in db.iter_event_summaries("YT-ME", after=cursor, page_size=2)]
+        assert resumed == [s["id"] for s in summaries[3:]]
+        with pytest.raises(ValueError):
+            [s async for s in db.iter_event_summaries("YT-ME", after=summaries[2]["id"])]
+
+    @pytest.mark.asyncio
+    async def test_summary_pages_scan_the_index_without_sorting(self, db):
+        from yotei.db.local import _summary_page_query
+
+        # Every page must read in index order; a temp b-tree means all of the
+        # user's events are collected and sorted again for each page
+        for status in (None, "planning"):
+            for position in (None, ("2026-05-01T18:00:00", "EV-1")):
+                query, params = _summary_page_query("YT-ME", status, position, 50)
+                async with db._reader() as conn, conn.execute("EXPLAIN QUERY PLAN " + query, params) as cursor:
+                    plan = " | ".join(row[-1] for row in await cursor.fetchall())
+                assert "idx_events_updated_id" in plan
+                assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    async def test_event_load_reads_child_rows_in_index_order(self, db, monkeypatch):
+        import aiosqlite
+
+        event = Event(creator_id="YT-ME", title="Dinner")
+        event.add_participant("YT-ME", "Me", "AGENT-ME")
+        event.add_proposal(Proposal(proposer_agent_id="AGENT-ME", responses={"AGENT-ME": "accept"}))
+        event.add_agent_note("AGENT-ME", "negotiation", "Starting")
+        await db.save_event(event)
+        db.cache.clear()
+
+        queries = []
+        execute = aiosqlite.Cursor.execute
+
+        async def recording_execute(cursor, sql, parameters=None):
+            queries.append((sql, parameters))
+            return await execute(cursor, sql, parameters)
+
+        monkeypatch.setattr(aiosqlite.Cursor, "execute", recording_execute)
+        await db.get_event(event.id)
+        monkeypatch.undo()
+
+        # Child rows must come back in load order straight from an index; a
+        # temp b-tree means every load sorts them again
+        plans = []
+        for sql, parameters in queries:
+            async with db._reader() as conn, conn.execute("EXPLAIN QUERY PLAN " + sql, parameters) as cursor:
+                plans.append(" | ".join(row[-1] for row in await cursor.fetchall()))
+        assert len(plans) == 5
+        assert not [plan for plan in plans if "TEMP B-TREE" in plan]
+        assert any("event_log USING COVERING INDEX" in plan for plan in plans)
+
+    @pytest.mark.asyncio
+    async def test_summary_participants_keep_their_order(self, db):
+        event = Event(creator_id="YT-ME", title="Dinner")
+        for name in ("Zoe", "Abby", "Mia", "Ben"):
+            event.add_participant(f"YT-{name}", name, f"AGENT-{name}")
+        await db.save_event(event)
+        [summary] = [s async for s in db.iter_event_summaries("YT-ME")]
+        assert summary["participants"] == ["Zoe", "Abby", "Mia", "Ben"]
+
+    @pytest.mark.asyncio
+    async def test_iter_friends_pages_in_id_order(self, db):
+        friends = [
+            FriendRelationship(friend_id=f"YT-F{i:02d}", friend_name=f"Friend {i}", friend_code=f"YT-F{i:02d}")
+            for i in range(5)
+        ]
+        await db.save_friends("YT-ME", list(reversed(friends)))
+
+        ids = [f.friend_id async for f in db.iter_friends("YT-ME", page_size=2)]
+        assert ids == [f.friend_id for f in friends]
+        assert [f.friend_id async for f in db.iter_friends("YT-ME", after="YT-F02")] == ["YT-F03", "YT-F04"]
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_wait_for_open_transaction(self, db):
+        event = Event(creator_id="YT-ME", title="Committed")
+        await db.save_event(event)
+        write_started = asyncio.Event()
+        release_write = asyncio.Event()
+
+        async def slow_write():
+            async with db.transaction():
+                await db.save_event(Event(creator_id="YT-ME", title="Uncommitted"))
+                write_started.set()
+                await release_write.wait()
+
+        writer = asyncio.create_task(slow_write())
+        await write_started.wait()
+        events = await asyncio.wait_for(db.get_user_events("YT-ME"), timeout=5)
+        release_write.set()
+        await writer
+
+        assert [e.title for e in events] == ["Committed"]
+        assert len(await db.get_user_events("YT-ME")) == 2
+
+    @pytest.mark.asyncio
+    async def test_connect_skips_ddl_when_schema_is_current(self, db):
+        from yotei.db.migrations import SCHEMA_VERSION, get_schema_version
+
+        assert await get_schema_version(db._connection) == SCHEMA_VERSION
+        async with db.transaction(), db._connection.cursor() as cursor:
+            await cursor.execute("DROP TABLE group_dynamics")
+
+        other = Database(db.db_path)
+        await other.connect()
+        async with other._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'group_dynamics'"
+        ) as cursor:
+            recreated = await cursor.fetchone()
+        await other.close()
+
+        assert recreated is None
+
+    @pytest.mark.asyncio
+    async def test_connect_upgrades_unversioned_database(self, db):
+        from yotei.db.migrations import SCHEMA_VERSION
+
+        user = User(name="Kept")
+        await db.save_user(user)
+        async with db.transaction(), db._connection.cursor() as cursor:
+            await cursor.execute("PRAGMA user_version = 0")
+
+        other = Database(db.db_path)
+        await other.connect()
+        async with other._connection.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        kept = await other.get_user(user.id)
+        await other.close()
+
+        assert version == SCHEMA_VERSION
+        assert kept.name == "Kept"
+
+    @pytest.mark.asyncio
+    async def test_connect_refuses_newer_schema(self, db):
+        async with db.transaction(), db._connection.cursor() as cursor:
+            await cursor.execute("PRAGMA user_version = 999")
+
+        with pytest.raises(RuntimeError):
+            await Database(db.db_path).connect()
+
+    @pytest.mark.asyncio
+    async def test_migrates_legacy_event_blobs(self):
+        import sqlite3
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "legacy.db"
+            event = Event(creator_id="YT-TEST-1234", title="Old Event", description="Taco night")
+            event.add_participant("YT-P1", "Participant 1", "AGENT-1")
+            event.add_participant("YT-P2", "Participant 2", "AGENT-2")
+            proposal = Proposal(proposer_agent_id="AGENT-1", activity_suggestion="Tacos")
+            proposal.responses = {"AGENT-2": "modify", "AGENT-1": "accept"}
+            event.add_proposal(proposal)
+            event.add_agent_note("AGENT-1", "suggestion", "Try the taco place", private=False)
+            event.add_agent_note("AGENT-2", "concern", "Too spicy")
+
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE events (
+                    id TEXT PRIMARY KEY, creator_id TEXT NOT NULL, data TEXT NOT NULL,
+                    status TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE TABLE event_participants (event_id TEXT NOT NULL, user_id TEXT NOT NULL)")
+            conn.execute(
+                "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                (event.id, event.creator_id, event.model_dump_json(), event.status.value,
+                 event.created_at.isoformat(), event.updated_at.isoformat()),
+            )
+            conn.execute("INSERT INTO event_participants VALUES (?, ?)", (event.id, "YT-P1"))
+            user = User(name="Old User")
+            conn.execute(
+                "CREATE TABLE users (id TEXT PRIMARY KEY, data TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+            conn.execute(
+                "INSERT INTO users VALUES (?, ?, ?, ?)",
+                (user.id, user.model_dump_json(), user.created_at.isoformat(), user.created_at.isoformat()),
+            )
+            conn.commit()
+            conn.close()
+
+            db = Database(db_path)
+            await db.connect()
+            events = await db.get_user_events("YT-P1")
+            found = await db.find_events("taco")
+            notes = await db.get_event_notes(event.id)
+            old_user = await db.get_user(user.id)
+            await db.close()
+
+        assert [e.title for e in events] == ["Old Event"]
+        migrated = events[0]
+        assert [p.user_name for p in migrated.participants] == ["Participant 1", "Participant 2"]
+        assert migrated.proposals[0].activity_suggestion == "Tacos"
+        assert migrated.proposals[0].responses == {"AGENT-2": "modify", "AGENT-1": "accept"}
+        assert migrated.current_proposal_id == proposal.id
+        assert [(n.seq, n.content, n.private) for n in notes] == [
+            (1, "Try the taco place", False), (2, "Too spicy", True),
+        ]
+        assert [e.id for e in found] == [event.id]
+        assert old_user.name == "Old User"
+
 
 class TestScheduler:
     """Tests for scheduling logic."""
@@ -118,6 +817,327 @@ class TestScheduler:
         assert len(slots) > 0
 
 
+    def test_bitmap_engine_matches_reference(self):
+        pytest.importorskip("numpy")
+        import random
+        from yotei.models.user import AvailabilityBlock, BlackoutDate
+        from yotei.models.schedule import Schedule, TimeSlot
+
+        rng = random.Random(11)
+        start = date(2025, 3, 1)
+        midnight = lambda day: datetime.combine(day, datetime.min.time())
+
+        def random_schedule(user_id):
+            schedule = Schedule(
+                user_id=user_id,
+                default_availability=[
+                    AvailabilityBlock(day_of_week=d, start_hour=rng.randint(6, 12), end_hour=rng.randint(14, 23))
+                    for d in range(7) if rng.random() < 0.8
+                ],
+                blackout_dates=[BlackoutDate(start_date=start + timedelta(days=20), end_date=start + timedelta(days=22))],
+            )
+            for _ in range(30):
+                day = start + timedelta(days=rng.randrange(60))
+                begin = midnight(day) + timedelta(minutes=15 * rng.randrange(96))
+                schedule.specific_busy.setdefault(day.isoformat(), []).append(
+                    TimeSlot(start=begin, end=begin + timedelta(minutes=15 * rng.randint(1, 12)))
+                )
+            day = start + timedelta(days=rng.randrange(60))
+            schedule.specific_availability[day.isoformat()] = [
+                TimeSlot(start=midnight(day) + timedelta(hours=9), end=midnight(day) + timedelta(hours=21, minutes=45))
+            ]
+            return schedule
+
+        reference, bitmap = Scheduler(), Scheduler(engine="bitmap")
+        for i in range(8):
+            schedule = random_schedule(f"U{i}")
+            reference.add_schedule(schedule.user_id, schedule)
+            bitmap.add_schedule(schedule.user_id, schedule)
+
+        for min_duration in (0.25, 1.5, 2.5):
+            expected = reference.find_common_slots(EventType.HANGOUT, start, start + timedelta(days=59), min_duration)
+            assert expected
+            assert bitmap.find_common_slots(EventType.HANGOUT, start, start + timedelta(days=59), min_duration) == expected
+            assert list(bitmap.iter_common_slots(EventType.HANGOUT, start, start + timedelta(days=59), min_duration)) == list(
+                reference.iter_common_slots(EventType.HANGOUT, start, start + timedelta(days=59), min_duration)
+            )
+
+        # Grids are cached per schedule and range, and rebuilt after an edit
+        from yotei.agent.scheduler import compile_bitmap
+        edited = bitmap.schedules["U0"]
+        grid = compile_bitmap(edited, start, 60)
+        assert compile_bitmap(edited, start, 60) is grid
+        edited.specific_busy.clear()
+        edited.default_availability[0] = AvailabilityBlock(
+            day_of_week=edited.default_availability[0].day_of_week, start_hour=0, end_hour=23
+        )
+        edited.invalidate()
+        assert compile_bitmap(edited, start, 60) is not grid
+        assert bitmap.find_common_slots(EventType.HANGOUT, start, start + timedelta(days=59), 1.5) == (
+            reference.find_common_slots(EventType.HANGOUT, start, start + timedelta(days=59), 1.5)
+        )
+
+        with pytest.raises(ValueError):
+            Scheduler(engine="abacus")
+
+
+    def test_streaming_search_stops_early(self, monkeypatch):
+        from yotei.models.user import AvailabilityBlock
+        from yotei.models.schedule import Schedule, CompiledSchedule
+
+        scheduler = Scheduler()
+        for user_id, start_hour in (("U1", 9), ("U2", 12)):
+            scheduler.add_schedule(user_id, Schedule(
+                user_id=user_id,
+                default_availability=[
+                    AvailabilityBlock(day_of_week=d, start_hour=start_hour, end_hour=22) for d in range(7)
+                ],
+            ))
+
+        start = date(2025, 3, 3)
+        end = start + timedelta(days=59)
+        full = scheduler.find_common_slots(EventType.DINNER, start, end)
+        assert scheduler.first_common_slots(EventType.DINNER, start, end, 3) == full[:3]
+        assert list(scheduler.iter_common_slots(EventType.DINNER, start, end)) == sorted(
+            full, key=lambda slot: slot.start_min
+        )
+
+        calls = []
+        availability = CompiledSchedule.availability
+        monkeypatch.setattr(
+            CompiledSchedule, "availability",
+            lambda self, day: calls.append(day) or availability(self, day),
+        )
+        slot = scheduler.get_next_available_slot(EventType.HANGOUT)
+        assert slot is not None
+        # Only the first day of the 30-day window was evaluated, once per participant
+        assert len(calls) == 2
+
+
+    def test_quorum_fallback(self):
+        from yotei.models.user import AvailabilityBlock
+        from yotei.models.schedule import Schedule
+
+        scheduler = Scheduler()
+        hours = {"U1": (17, 22), "U2": (18, 23), "U3": (17, 21), "U4": (9, 12)}
+        for user_id, (start_hour, end_hour) in hours.items():
+            scheduler.add_schedule(user_id, Schedule(
+                user_id=user_id,
+                default_availability=[
+                    AvailabilityBlock(day_of_week=d, start_hour=start_hour, end_hour=end_hour) for d in range(7)
+                ],
+            ))
+
+        start = date(2025, 3, 3)
+        end = start + timedelta(days=6)
+        assert scheduler.find_common_slots(EventType.DINNER, start, end) == []
+
+        # Three of four is the default quorum; U4 is always the one missing
+        slots = scheduler.find_quorum_slots(EventType.DINNER, start, end, limit=5)
+        assert len(slots) == 5
+        assert all(slot.missing == ("U4",) and slot.hour == 18 for slot in slots)
+        assert [slot.start_min for slot in slots] == sorted(slot.start_min for slot in slots)
+
+        # Reserved time counts as busy: U1's first evening is already booked
+        from yotei.models.intervals import IntervalSet
+        organizer = scheduler.schedules["U1"].compiled()
+        first = slots[0]
+        reserved = {"U1": IntervalSet([(organizer.to_utc(first.start_min), organizer.to_utc(first.end_min))])}
+        kept = scheduler.find_quorum_slots(EventType.DINNER, start, end, limit=5, reserved=reserved)
+        assert not any(slot.overlaps(first) for slot in kept)
+        assert [slot.start_min for slot in kept[:4]] == [slot.start_min for slot in slots[1:]]
+
+        # Three people can still meet two at a time
+        del scheduler.schedules["U4"]
+        scheduler.schedules["U3"].default_availability = [
+            AvailabilityBlock(day_of_week=d, start_hour=9, end_hour=12) for d in range(7)
+        ]
+        assert scheduler.find_common_slots(EventType.DINNER, start, end) == []
+        pairs = scheduler.find_quorum_slots(EventType.DINNER, start, end, limit=3)
+        assert len(pairs) == 3 and all(slot.missing == ("U3",) for slot in pairs)
+
+
+    def test_trip_spans_midnight(self):
+        from yotei.models.user import AvailabilityBlock
+        from yotei.models.schedule import Schedule
+
+        engines = ["reference"]
+        try:
+            import numpy  # noqa: F401
+            engines.append("bitmap")
+        except ImportError:
+            pass
+
+        for engine in engines:
+            scheduler = Scheduler(engine=engine)
+            for user_id in ("U1", "U2"):
+                scheduler.add_schedule(user_id, Schedule(
+                    user_id=user_id,
+                    default_availability=[
+                        AvailabilityBlock(day_of_week=4, start_hour=18, end_hour=24),
+                        AvailabilityBlock(day_of_week=5, start_hour=0, end_hour=24),
+                        AvailabilityBlock(day_of_week=6, start_hour=0, end_hour=20),
+                    ],
+                ))
+
+            start = date(2025, 3, 3)  # A Monday
+            slots = scheduler.find_common_slots(EventType.TRIP, start, start + timedelta(days=13))
+            assert [(slot.start, slot.end) for slot in slots] == [
+                (datetime(2025, 3, 7, 18), datetime(2025, 3, 9, 20)),
+                (datetime(2025, 3, 14, 18), datetime(2025, 3, 16, 20)),
+            ]
+            assert scheduler.first_common_slots(EventType.TRIP, start, start + timedelta(days=13), 1) == slots[:1]
+
+            # A window of exactly one day still has to cross midnight
+            for schedule in scheduler.schedules.values():
+                schedule.default_availability = schedule.default_availability[:2]
+                schedule.default_availability[1].end_hour = 18
+            day = [(datetime(2025, 3, 7, 18), datetime(2025, 3, 8, 18))]
+            slots = scheduler.find_common_slots(EventType.TRIP, start, start + timedelta(days=6), min_duration=24)
+            assert [(slot.start, slot.end) for slot in slots] == day
+            slots = scheduler.iter_common_slots(EventType.TRIP, start, start + timedelta(days=6), min_duration=24)
+            assert [(slot.start, slot.end) for slot in slots] == day
+
+
+    def test_batch_scheduler_never_double_books(self):
+        from yotei.agent.scheduler import BatchScheduler
+        from yotei.models.user import AvailabilityBlock
+        from yotei.models.intervals import IntervalSet
+        from yotei.models.schedule import Schedule
+
+        # Everyone is free only on Saturday evenings
+        schedules = {
+            user_id: Schedule(
+                user_id=user_id,
+                default_availability=[AvailabilityBlock(day_of_week=5, start_hour=17, end_hour=23)],
+            )
+            for user_id in ("U1", "U2", "U3", "U4")
+        }
+        events = []
+        for i, members in enumerate((["U1", "U2"], ["U2", "U3"], ["U1", "U2", "U3"], ["U4"])):
+            event = Event(creator_id=members[0], title=f"Dinner {i}", event_type=EventType.DINNER)
+            for user_id in members:
+                event.add_participant(user_id, user_id, f"AGENT-{user_id}")
+            events.append(event)
+
+        start = date(2025, 3, 3)
+        batch = BatchScheduler(schedules)
+        slots = batch.assign(events, start, start + timedelta(days=13))
+
+        assert all(slot is not None and slot.duration_hours == 2.5 for slot in slots.values())
+        # The biggest event is placed first, at the preferred dinner time
+        assert slots[events[2].id].start == datetime(2025, 3, 8, 18)
+        for user_id in schedules:
+            booked = [slots[e.id] for e in events if user_id in {p.user_id for p in e.participants}]
+            assert not any(a.overlaps(b) for i, a in enumerate(booked) for b in booked[i + 1:])
+        # U4 shares no event with anyone, so takes the same evening
+        assert slots[events[3].id].start == datetime(2025, 3, 8, 18)
+
+        # Three evenings' worth of U2 events no longer fit in one weekend
+        late = Event(creator_id="U2", title="Late", event_type=EventType.DINNER)
+        late.add_participant("U2", "U2", "AGENT-U2")
+        assert batch.reserve(late, start, start + timedelta(days=6)) is None
+
+        # A time proposed in an earlier run is held for its participants
+        from yotei.models.event import DateRange, Proposal
+        fresh = BatchScheduler(schedules)
+        proposed = Event(creator_id="U4", title="Proposed", event_type=EventType.DINNER)
+        proposed.add_participant("U4", "U4", "AGENT-U4")
+        assert fresh.book(proposed) is None
+        proposed.add_proposal(Proposal(
+            proposer_agent_id="AGENT-U4",
+            date_range=DateRange(start=datetime(2025, 3, 8, 18), end=datetime(2025, 3, 8, 20, 30)),
+        ))
+        assert fresh.book(proposed).start == datetime(2025, 3, 8, 18)
+        assert fresh.reserve(events[3], start, start + timedelta(days=6)).start == datetime(2025, 3, 8, 20, 30)
+
+        # Booking after coordination swaps the reserved slot for the proposed time
+        proposed.add_proposal(Proposal(
+            proposer_agent_id="AGENT-U4",
+            date_range=DateRange(start=datetime(2025, 3, 15, 18), end=datetime(2025, 3, 15, 20, 30)),
+        ))
+        fresh.book(proposed)
+        assert fresh.reserve(events[3], start, start + timedelta(days=6)).start == datetime(2025, 3, 8, 18)
+        fresh.release(events[3])
+        fresh.release(proposed)
+        assert fresh.reserved == {"U4": IntervalSet()}
+
+
+    def test_rank_slots(self, monkeypatch):
+        from yotei.agent import scheduler as scheduler_module
+        from yotei.models.schedule import MinuteSlot, TimeSlot
+
+        saturday_dinner = TimeSlot(start=datetime(2025, 3, 8, 18), end=datetime(2025, 3, 8, 21))
+        slots = [
+            TimeSlot(start=datetime(2025, 3, 5, 7), end=datetime(2025, 3, 5, 9)),
+            saturday_dinner,
+            TimeSlot(start=datetime(2025, 3, 6, 18, 30), end=datetime(2025, 3, 6, 21)),
+            TimeSlot(start=datetime(2025, 3, 9, 12), end=datetime(2025, 3, 9, 17)),
+        ]
+        preferences = {"U1": {"budget_conscious": True}, "U2": {"early_bird": True, "night_owl": True}}
+
+        scheduler = Scheduler()
+        ranked = scheduler.rank_slots(slots, EventType.DINNER, preferences)
+        assert [score for _, score in ranked] == [125.0, 120.0, 115.0, 80.0]
+        assert ranked[0][0] is saturday_dinner
+        assert scheduler.rank_slots(slots, EventType.DINNER, preferences, top_k=2) == ranked[:2]
+
+        # The scalar fallback scores exactly like the vectorized path
+        monkeypatch.setattr(scheduler_module, "np", None)
+        compact = [MinuteSlot.coerce(slot) for slot in slots]
+        assert [score for _, score in scheduler.rank_slots(compact, EventType.DINNER, preferences)] == [
+            score for _, score in ranked
+        ]
+
+
+    def test_check_conflicts_bulk(self):
+        import random
+        from yotei.models.user import AvailabilityBlock
+        from yotei.models.schedule import MinuteSlot, TimeSlot, day_minutes
+
+        scheduler = Scheduler()
+        for user_id, start_hour, timezone in (
+            ("U1", 9, "America/Los_Angeles"), ("U2", 15, "America/Los_Angeles"), ("U3", 18, "America/New_York"),
+        ):
+            schedule = Schedule(
+                user_id=user_id,
+                timezone=timezone,
+                default_availability=[
+                    AvailabilityBlock(day_of_week=d, start_hour=start_hour, end_hour=23) for d in range(7)
+                ],
+            )
+            schedule.specific_busy["2025-03-05"] = [
+                TimeSlot(start=datetime(2025, 3, 5, 19), end=datetime(2025, 3, 5, 20))
+            ]
+            scheduler.add_schedule(user_id, schedule)
+
+        rng = random.Random(5)
+        first = day_minutes(date(2025, 3, 3))
+        slots = []
+        for _ in range(200):
+            begin = first + 15 * rng.randrange(7 * 96)
+            slots.append(MinuteSlot(begin, begin + 15 * rng.randint(1, 12)))
+
+        matrix = scheduler.check_conflicts_bulk(slots)
+        assert list(matrix) == ["U1", "U2", "U3"]
+        for i, slot in enumerate(slots):
+            assert {user_id: row[i] for user_id, row in matrix.items()} == scheduler.check_conflicts(slot)
+
+        # U3's 18:00 in New York is 15:00 here
+        evening = TimeSlot(start=datetime(2025, 3, 4, 15, 30), end=datetime(2025, 3, 4, 17))
+        assert scheduler.check_conflicts_bulk([evening]) == {"U1": [False], "U2": [False], "U3": [False]}
+        busy = TimeSlot(start=datetime(2025, 3, 5, 19, 30), end=datetime(2025, 3, 5, 20))
+        assert scheduler.check_conflicts(busy) == {"U1": True, "U2": True, "U3": False}
+
+        # Aware slots are converted to the organizer's wall-clock time
+        from zoneinfo import ZoneInfo
+        new_york = ZoneInfo("America/New_York")
+        aware = TimeSlot(start=datetime(2025, 3, 5, 22, 30, tzinfo=new_york), end=datetime(2025, 3, 5, 23, tzinfo=new_york))
+        assert scheduler.check_conflicts(aware) == {"U1": True, "U2": True, "U3": False}
+        [(ranked, _)] = scheduler.rank_slots([aware], EventType.DINNER, {})
+        assert ranked is aware
+
+
 class TestAgentCoordination:
     """Tests for agent coordination."""
 
@@ -128,6 +1148,272 @@ class TestAgentCoordination:
         agent = Agent("YT-TEST-1234", "AGENT-TEST")
         assert agent.user_id == "YT-TEST-1234"
 
+    @staticmethod
+    def _offline_agent(monkeypatch, hours, offered):
+        """An agent for U1 whose group keeps ``hours`` daily and whose proposals take the first slot offered."""
+        from yotei.models.user import AvailabilityBlock
+
+        schedules = {
+            user_id: Schedule(
+                user_id=user_id,
+                default_availability=[
+                    AvailabilityBlock(day_of_week=d, start_hour=start_hour, end_hour=end_hour) for d in range(7)
+                ],
+            )
+            for user_id, (start_hour, end_hour) in hours.items()
+        }
+        agent = Agent("U1", "AGENT-U1")
+
+        async def get_user():
+            return User(name="U1")
+
+        async def get_friend_context(friend_ids):
+            return {}
+
+        async def get_participant_schedules(events):
+            return {p.user_id: schedules[p.user_id] for event in events for p in event.participants}
+
+        async def create_proposal(event, available_slots, **kwargs):
+            from yotei.models.event import DateRange
+
+            offered.append(list(available_slots))
+            slot = available_slots[0]
+            return Proposal(proposer_agent_id="AGENT-U1", date_range=DateRange(start=slot.start, end=slot.end))
+
+        async def no_responses(*args):
+            pass
+
+        monkeypatch.setattr(agent, "get_user", get_user)
+        monkeypatch.setattr(agent, "get_friend_context", get_friend_context)
+        monkeypatch.setattr(agent, "get_participant_schedules", get_participant_schedules)
+        monkeypatch.setattr(agent.social_intel, "create_proposal", create_proposal)
+        monkeypatch.setattr(agent, "_simulate_agent_responses", no_responses)
+        return agent
+
+    @staticmethod
+    def _event(title, members, event_type=EventType.DINNER):
+        event = Event(creator_id=members[0], title=title, event_type=event_type)
+        for user_id in members:
+            event.add_participant(user_id, user_id, f"AGENT-{user_id}")
+        return event
+
+    @pytest.mark.asyncio
+    async def test_small_group_falls_back_to_quorum(self, monkeypatch):
+        offered = []
+        agent = self._offline_agent(monkeypatch, {"U1": (17, 22), "U2": (18, 23), "U3": (9, 12)}, offered)
+
+        # No evening suits all three, so two of three is offered
+        result = await agent.coordinate_event(self._event("Dinner", ["U1", "U2", "U3"]))
+        assert result["success"]
+        assert offered[-1] and all(slot.missing == ("U3",) for slot in offered[-1])
+
+    @pytest.mark.asyncio
+    async def test_trip_without_quorum_widens_search(self, monkeypatch):
+        offered = []
+        agent = self._offline_agent(monkeypatch, {"U1": (0, 24), "U2": (0, 24)}, offered)
+        trip = self._event("Trip", ["U1", "U2"], EventType.TRIP)
+        start, end = agent.scheduler.suggest_date_range(EventType.TRIP)
+
+        # Quorum slots never last a day, so a trip skips straight to the wider window
+        agent.scheduler.schedules = await agent.get_participant_schedules([trip])
+        assert agent.scheduler.find_quorum_slots(EventType.TRIP, start, end) == []
+        await agent.coordinate_event(trip, [])
+        assert offered[-1] and offered[-1][0].start.date() > end
+
+    @pytest.mark.asyncio
+    async def test_widened_search_keeps_batch_reservations(self, monkeypatch):
+        from yotei.agent import core
+        from yotei.agent.core import AgentRunner
+        from yotei.models.user import BlackoutDate
+
+        offered = []
+        agent = self._offline_agent(monkeypatch, {"U1": (0, 24), "U2": (0, 24)}, offered)
+        trips = [self._event(title, ["U1", "U2"], EventType.TRIP) for title in ("Trip A", "Trip B")]
+        start, end = agent.scheduler.suggest_date_range(EventType.TRIP)
+
+        async def create_proposal(event, available_slots, **kwargs):
+            from yotei.models.event import DateRange
+
+            # Like the real proposals, a two-day trip from the first slot's start
+            slot = available_slots[0]
+            return Proposal(
+                proposer_agent_id="AGENT-U1",
+                date_range=DateRange(start=slot.start, end=slot.start + timedelta(days=2)),
+            )
+
+        monkeypatch.setattr(agent.social_intel, "create_proposal", create_proposal)
+        for schedule in (await agent.get_participant_schedules(trips[:1])).values():
+            schedule.add_blackout(BlackoutDate(start_date=start, end_date=end))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = Database(Path(tmpdir) / "test.db")
+            await db.connect()
+
+            async def get_db():
+                return db
+
+            monkeypatch.setattr(core, "get_db", get_db)
+            await db.save_events(trips)
+            runner = AgentRunner("U1", "AGENT-U1")
+            runner.agent = agent
+            results = await runner.coordinate_pending()
+            await db.close()
+
+        # Both trips fall through to the wider window, and the second avoids the first
+        assert [result["success"] for _, result in results] == [True, True]
+        (a_start, a_end), (b_start, b_end) = [
+            (event.proposals[-1].date_range.start, event.proposals[-1].date_range.end) for event, _ in results
+        ]
+        assert min(a_start, b_start) > datetime.combine(end, datetime.min.time())
+        assert a_end <= b_start or b_end <= a_start
+
+
+
+class FakeWebSocket:
+    """Records what the relay sends; ``stall`` holds every send until set."""
+
+    def __init__(self, stall: asyncio.Event = None):
+        self.frames = []
+        self.stall = stall
+        self.close_code = None
+
+    @property
+    def sent(self):
+        return [json.loads(frame) for frame in self.frames]
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stall is not None:
+            await self.stall.wait()
+        self.frames.append(text)
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+class TestRelayServer:
+    """Tests for relay fan-out."""
+
+    @staticmethod
+    def _message(i):
+        from yotei.relay.protocol import AgentMessage, MessageType
+
+        return AgentMessage(
+            type=MessageType.EVENT_UPDATE,
+            sender_agent_id="AGENT-X",
+            recipient_agent_id="broadcast",
+            payload={"i": i},
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("policy", ["drop_oldest", "disconnect", "block"])
+    async def test_slow_client_overflow(self, policy):
+        pytest.importorskip("uvicorn")
+        from yotei.relay.server import RelayServer
+
+        relay = RelayServer(send_queue_size=3, overflow_policy=policy)
+        stall = asyncio.Event()
+        fast = await relay.connect("fast", FakeWebSocket())
+        slow = await relay.connect("slow", FakeWebSocket(stall))
+        await asyncio.sleep(0)
+
+        async def burst():
+            for i in range(10):
+                await relay.broadcast(self._message(i))
+                await asyncio.sleep(0)  # Let writers run, as between received messages
+
+        sender = asyncio.create_task(burst())
+        await asyncio.sleep(0.05)
+        # The fast agent is never held up by the stalled one, except by choice
+        assert sender.done() == (policy != "block")
+        delivered = [m["payload"]["i"] for m in fast.websocket.sent if "payload" in m]
+        if policy == "block":
+            assert delivered == list(range(len(delivered))) and len(delivered) < 10
+        else:
+            assert delivered == list(range(10))
+
+        stall.set()
+        await asyncio.wait_for(sender, 1)
+        await asyncio.sleep(0.01)
+        received = [m["payload"]["i"] for m in slow.websocket.sent if "payload" in m]
+        stats = slow.stats()
+        assert stats["max_queued"] == 3
+        if policy == "drop_oldest":
+            # The first message was already being written when the socket stalled
+            assert stats["dropped"] == 6 and received == [0, 7, 8, 9]
+        elif policy == "disconnect":
+            assert slow.websocket.close_code == 1013 and received == []
+        else:
+            assert stats["dropped"] == 0 and received == list(range(10))
+        assert relay.get_queue_stats()["slow"] == stats
+
+        for agent_id in list(relay.connections):
+            await relay.disconnect(agent_id)
+        assert fast.closed and fast.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_once(self, monkeypatch):
+        pytest.importorskip("uvicorn")
+        from yotei.relay import server
+
+        relay = server.RelayServer()
+        agents = [await relay.connect(f"AGENT-{i}", FakeWebSocket()) for i in range(5)]
+        relay.subscribe_to_event("AGENT-1", "EVT-1")
+        relay.subscribe_to_event("AGENT-2", "EVT-1")
+        await asyncio.sleep(0.01)
+
+        encoded = []
+        encode_frame = server.encode_frame
+        monkeypatch.setattr(server, "encode_frame", lambda data: encoded.append(data) or encode_frame(data))
+
+        # Every recipient gets the very same frame, decoding to the wire form
+        message = self._message(1)
+        await relay.broadcast(message, exclude={"AGENT-0"})
+        await asyncio.sleep(0.01)
+        frames = [agent.websocket.frames[-1] for agent in agents[1:]]
+        assert all(frame is frames[0] for frame in frames)
+        assert json.loads(frames[0]) == message.to_wire()
+        assert len(agents[0].websocket.frames) == 4  # Hellos for the others only
+
+        await relay.broadcast_to_event("EVT-1", self._message(2))
+        await asyncio.sleep(0.01)
+        assert agents[1].websocket.frames[-1] is agents[2].websocket.frames[-1]
+        assert len(encoded) == 2
+
+        for agent_id in list(relay.connections):
+            await relay.disconnect(agent_id)
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replaces_connection(self):
+        pytest.importorskip("uvicorn")
+        from yotei.relay.server import RelayServer
+
+        relay = RelayServer()
+        first = await relay.connect("AGENT-1", FakeWebSocket())
+        relay.subscribe_to_event("AGENT-1", "EVT-1")
+        second = await relay.connect("AGENT-1", FakeWebSocket())
+
+        # The old connection is closed, not leaked
+        assert first.closed and first.websocket.close_code == 4000
+        assert relay.connections["AGENT-1"] is second
+
+        # The old receive loop ending leaves the new connection in place
+        await relay.disconnect("AGENT-1", first)
+        assert relay.connections["AGENT-1"] is second
+        assert relay.event_subscriptions["EVT-1"] == {"AGENT-1"}
+        assert second.subscribed_events == {"EVT-1"}
+
+        await relay.disconnect("AGENT-1", second)
+        assert not relay.connections and second.closed
+
+    def test_rejects_unknown_policy(self):
+        pytest.importorskip("uvicorn")
+        from yotei.relay.server import AgentConnection
+
+        with pytest.raises(ValueError):
+            AgentConnection("AGENT-X", FakeWebSocket(), overflow_policy="shrug")
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -6,7 +6,10 @@ from datetime import datetime, date, timedelta
 from yotei.models.user import User, AvailabilityBlock, BudgetRange, generate_friend_code
 from yotei.models.friend import FriendRelationship, RelationshipType, SocialGraph
 from yotei.models.event import Event, EventType, EventStatus, Proposal
-from yotei.models.schedule import Schedule, TimeSlot, find_common_availability
+from yotei.models.schedule import (
+    Schedule, TimeSlot, MinuteSlot, find_common_availability, find_quorum_slots,
+)
+from yotei.models.intervals import IntervalSet
 
 
 class TestUser:
@@ -192,6 +195,234 @@ class TestSchedule:
         assert slot.start.hour == 14
         assert slot.end.hour == 18
 
+    def test_busy_slots_split_availability(self):
+        saturday = date.today()
+        while saturday.weekday() != 5:
+            saturday += timedelta(days=1)
+        at = lambda hour: datetime.combine(saturday, datetime.min.time()) + timedelta(hours=hour)
+
+        schedule = Schedule(
+            user_id="TEST",
+            default_availability=[AvailabilityBlock(day_of_week=5, start_hour=10, end_hour=20)],
+            specific_busy={saturday.isoformat(): [
+                TimeSlot(start=at(15), end=at(16)),
+                TimeSlot(start=at(12), end=at(13)),
+                TimeSlot(start=at(19), end=at(21)),
+            ]},
+        )
+
+        slots = schedule.get_availability_for_date(saturday)
+        assert [(s.start.hour, s.end.hour) for s in slots] == [(10, 12), (13, 15), (16, 19)]
+
+    def test_compiled_schedule_tracks_changes(self):
+        from yotei.models.user import BlackoutDate
+
+        saturday = date.today()
+        while saturday.weekday() != 5:
+            saturday += timedelta(days=1)
+        at = lambda hour: datetime.combine(saturday, datetime.min.time()) + timedelta(hours=hour)
+
+        schedule = Schedule(
+            user_id="TEST",
+            default_availability=[AvailabilityBlock(day_of_week=5, start_hour=10, end_hour=20)],
+        )
+        compiled = schedule.compiled()
+        assert schedule.compiled() is compiled
+
+        schedule.add_busy(TimeSlot(start=at(12), end=at(14)))
+        assert len(schedule.get_availability_for_date(saturday)) == 2
+
+        schedule.default_availability = [AvailabilityBlock(day_of_week=5, start_hour=16, end_hour=18)]
+        assert [(s.start.hour, s.end.hour) for s in schedule.get_availability_for_date(saturday)] == [(16, 18)]
+
+        schedule.add_blackout(BlackoutDate(start_date=saturday, end_date=saturday + timedelta(days=1)))
+        assert schedule.get_availability_for_date(saturday) == []
+        assert schedule.get_availability_range(saturday, saturday + timedelta(days=7)).keys() == {
+            (saturday + timedelta(days=7)).isoformat()
+        }
+
+        # Edits made in place take effect once the schedule is invalidated
+        compiled = schedule.compiled()
+        schedule.blackout_dates[0].start_date = saturday + timedelta(days=1)
+        schedule.default_availability[0] = AvailabilityBlock(day_of_week=5, start_hour=13, end_hour=17)
+        assert schedule.compiled() is compiled
+        schedule.invalidate()
+        assert [(s.start.hour, s.end.hour) for s in schedule.get_availability_for_date(saturday)] == [(14, 17)]
+        assert list(schedule.compiled().weekdays[5]) == [(13 * 60, 17 * 60)]
+
+        schedule.default_availability[0].end_hour = 15
+        schedule.specific_busy[saturday.isoformat()][0].end = at(13)
+        schedule.invalidate()
+        assert [(s.start.hour, s.end.hour) for s in schedule.get_availability_for_date(saturday)] == [(13, 15)]
+
+        # Changes to another schedule do not rebuild this one
+        compiled = schedule.compiled()
+        other = Schedule(user_id="OTHER")
+        other.add_blackout(BlackoutDate(start_date=saturday, end_date=saturday))
+        other.invalidate()
+        assert schedule.compiled() is compiled
+
+        # Busy slots are converted only for the dates looked up
+        schedule.add_busy(TimeSlot(start=at(24 * 7 + 12), end=at(24 * 7 + 13)))
+        compiled = schedule.compiled()
+        assert compiled.busy == {}
+        schedule.get_availability_for_date(saturday)
+        assert compiled.busy.keys() == {saturday.isoformat()}
+
+    def test_bitmap_wall_minutes_match_to_minutes(self):
+        pytest.importorskip("numpy")
+        from yotei.agent.scheduler import _wall_minutes
+        from yotei.models.schedule import to_minutes
+
+        moments = [datetime(1969, 12, 31, 23, 59), datetime(2025, 3, 9, 2, 30, 1), datetime(2025, 3, 8, 18, 0, 0, 5)]
+        for round_up in (False, True):
+            assert _wall_minutes(moments, len(moments), round_up).tolist() == [
+                to_minutes(moment, round_up=round_up) for moment in moments
+            ]
+
+
+    def test_time_zones(self):
+        every_day = lambda start, end: [
+            AvailabilityBlock(day_of_week=d, start_hour=start, end_hour=end) for d in range(7)
+        ]
+        new_york = Schedule(user_id="NY", timezone="America/New_York", default_availability=every_day(18, 23))
+        los_angeles = Schedule(user_id="LA", default_availability=every_day(14, 19))
+
+        # 14:00-19:00 in Los Angeles is 17:00-22:00 in New York; slots are
+        # in the first schedule's wall-clock time
+        friday = date(2025, 3, 7)
+        slots = find_common_availability([new_york, los_angeles], friday, friday, 1.0)
+        assert [(s.start, s.end) for s in slots] == [(datetime(2025, 3, 7, 18), datetime(2025, 3, 7, 22))]
+        slots = find_common_availability([los_angeles, new_york], friday, friday, 1.0)
+        assert [(s.start, s.end) for s in slots] == [(datetime(2025, 3, 7, 15), datetime(2025, 3, 7, 19))]
+
+        # The day clocks spring forward is 23 hours long
+        all_day = Schedule(user_id="A", default_availability=every_day(0, 24))
+        dst = date(2025, 3, 9)
+        [(start, end)] = all_day.compiled().availability(dst)
+        assert end - start == 23 * 60
+        assert find_common_availability([all_day], dst, dst, 23.5) == []
+        assert all_day.get_availability_for_date(dst) == [
+            TimeSlot(start=datetime(2025, 3, 9), end=datetime(2025, 3, 10))
+        ]
+
+        with pytest.raises(ValueError):
+            Schedule(user_id="X", timezone="Mars/Olympus_Mons")
+
+
+class TestMinuteSlot:
+    """Tests for the compact slot type."""
+
+    def test_reads_like_timeslot(self):
+        slot = TimeSlot(start=datetime(2025, 3, 8, 18, 30), end=datetime(2025, 3, 8, 21))
+        compact = MinuteSlot.coerce(slot)
+
+        assert compact.start == slot.start and compact.end == slot.end
+        assert compact.weekday == slot.start.weekday() == 5
+        assert compact.hour == 18
+        assert compact.duration_hours == slot.duration_hours
+        assert compact.to_shareable() == slot.to_shareable()
+        assert compact.to_timeslot() == slot
+        assert compact.contains(datetime(2025, 3, 8, 20, 59))
+        assert not compact.contains(datetime(2025, 3, 8, 21))
+
+    def test_coerce_converts_aware_datetimes(self):
+        from datetime import timezone
+        from zoneinfo import ZoneInfo
+
+        slot = TimeSlot(
+            start=datetime(2025, 3, 8, 18, tzinfo=timezone.utc), end=datetime(2025, 3, 8, 20, tzinfo=timezone.utc)
+        )
+        assert MinuteSlot.coerce(slot).start == datetime(2025, 3, 8, 18)
+        compact = MinuteSlot.coerce(slot, ZoneInfo("America/New_York"))
+        assert (compact.start, compact.end) == (datetime(2025, 3, 8, 13), datetime(2025, 3, 8, 15))
+
+    def test_coerce_rounds_outwards(self):
+        slot = TimeSlot(start=datetime(2025, 3, 8, 18, 0, 30), end=datetime(2025, 3, 8, 19, 0, 30))
+        compact = MinuteSlot.coerce(slot)
+        assert compact.start == datetime(2025, 3, 8, 18, 0)
+        assert compact.end == datetime(2025, 3, 8, 19, 1)
+
+
+class TestQuorumSlots:
+    """Tests for the k-of-n availability sweep."""
+
+    @staticmethod
+    def _schedules(hours):
+        return [
+            Schedule(
+                user_id=user_id,
+                default_availability=[AvailabilityBlock(day_of_week=5, start_hour=start, end_hour=end)],
+            )
+            for user_id, (start, end) in hours.items()
+        ]
+
+    def test_names_who_is_missing(self):
+        saturday = date(2025, 3, 8)
+        schedules = self._schedules({"A": (9, 17), "B": (10, 18), "C": (12, 20), "D": (19, 22)})
+
+        slots = find_quorum_slots(schedules, 3, saturday, saturday, 2.0)
+        assert [(s.start.hour, s.end.hour, s.missing) for s in slots] == [(12, 17, ("D",))]
+
+        # Everyone-free windows match the plain search
+        everyone = find_quorum_slots(schedules[:3], 3, saturday, saturday, 2.0)
+        assert [(s.start, s.end) for s in everyone] == [
+            (s.start, s.end) for s in find_common_availability(schedules[:3], saturday, saturday, 2.0)
+        ]
+        assert all(s.missing == () for s in everyone)
+
+        # D is never free alongside the other three
+        assert find_quorum_slots(schedules, 4, saturday, saturday, 0.25) == []
+
+    def test_rejects_bad_quorum(self):
+        schedules = self._schedules({"A": (9, 17)})
+        with pytest.raises(ValueError):
+            find_quorum_slots(schedules, 0, date(2025, 3, 8), date(2025, 3, 8))
+        with pytest.raises(ValueError):
+            find_quorum_slots(schedules, 2, date(2025, 3, 8), date(2025, 3, 8))
+
+
+class TestIntervalSet:
+    """Tests for IntervalSet."""
+
+    def test_normalizes_input(self):
+        intervals = IntervalSet([(5, 7), (1, 3), (3, 4), (6, 9), (10, 10)])
+        assert list(intervals) == [(1, 4), (5, 9)]
+
+    def test_algebra(self):
+        a = IntervalSet([(0, 10), (20, 30)])
+        b = IntervalSet([(5, 25), (28, 40)])
+
+        assert list(a | b) == [(0, 40)]
+        assert list(a & b) == [(5, 10), (20, 25), (28, 30)]
+        assert list(a - b) == [(0, 5), (25, 28)]
+        assert list(b - a) == [(10, 20), (30, 40)]
+
+    def test_matches_pointwise_sets(self):
+        import random
+
+        rng = random.Random(3)
+        points = lambda s: {x for start, end in s for x in range(start, end)}
+        for _ in range(200):
+            a, b = (
+                IntervalSet(
+                    (start, start + rng.randint(0, 8))
+                    for start in (rng.randint(0, 50) for _ in range(rng.randint(0, 6)))
+                )
+                for _ in range(2)
+            )
+            assert points(a | b) == points(a) | points(b)
+            assert points(a & b) == points(a) & points(b)
+            assert points(a - b) == points(a) - points(b)
+
+    def test_covers(self):
+        intervals = IntervalSet([(0, 10), (20, 30)])
+        assert intervals.covers(2, 10)
+        assert intervals.covers(20, 25)
+        assert not intervals.covers(8, 12)
+        assert not intervals.covers(15, 16)
+        assert not IntervalSet().covers(0, 1)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
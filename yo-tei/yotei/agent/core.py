@@ -2,16 +2,17 @@
 
 import asyncio
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 
 from ..models.user import User
 from ..models.friend import FriendRelationship
 from ..models.event import Event, Proposal, EventStatus, AgentNote, ParticipantStatus
-from ..models.schedule import Schedule, TimeSlot
+from ..models.intervals import IntervalSet
+from ..models.schedule import MinuteSlot, Schedule, TimeSlot
 from ..db.local import get_db
 from ..config.settings import get_settings
-from .social_intel import SocialIntelligence
-from .scheduler import Scheduler, create_scheduler_from_event
+from .social_intel import SocialIntelligence, MAX_SLOT_OPTIONS
+from .scheduler import BatchScheduler, Scheduler, create_scheduler_from_event
 
 
 class Agent:
@@ -21,7 +22,8 @@ class Agent:
         self.user_id = user_id
         self.agent_id = agent_id
         self.social_intel = SocialIntelligence()
-        self.scheduler = Scheduler()
+        self.scheduler = Scheduler(engine=get_settings().scheduler.engine)
+        self._default_schedules: Dict[str, Schedule] = {}  # Reused so they compile once
 
     async def get_user(self) -> Optional[User]:
         """Get the agent's user."""
@@ -49,8 +51,40 @@ class Agent:
 
         return context
 
-    async def coordinate_event(self, event: Event) -> dict:
-        """Main coordination flow for an event."""
+    async def get_participant_schedules(self, events: List[Event]) -> Dict[str, Schedule]:
+        """Schedules for everyone taking part in the events, the user's own first."""
+        db = await get_db()
+        schedules = {}
+        user_schedule = await db.get_schedule(self.user_id)
+        if user_schedule:
+            schedules[self.user_id] = user_schedule
+
+        # For other participants, use default schedules (in production, would query their agents)
+        for event in events:
+            for participant in event.participants:
+                if participant.user_id == self.user_id or participant.user_id in schedules:
+                    continue
+                schedule = self._default_schedules.get(participant.user_id)
+                if schedule is None:
+                    # Create a default schedule (weekend + evenings)
+                    schedule = self._create_default_schedule(participant.user_id)
+                    self._default_schedules[participant.user_id] = schedule
+                schedules[participant.user_id] = schedule
+        return schedules
+
+    async def coordinate_event(
+        self,
+        event: Event,
+        available_slots: Optional[List[MinuteSlot]] = None,
+        reserved: Optional[Dict[str, IntervalSet]] = None,
+    ) -> dict:
+        """Main coordination flow for an event.
+
+        ``available_slots`` skips the availability search, e.g. when a
+        ``BatchScheduler`` has already reserved a slot for the event.
+        ``reserved`` is time already booked per user, such as the batch's
+        reservations, which the fallback search keeps clear of.
+        """
 
         user = await self.get_user()
         if not user:
@@ -63,28 +97,18 @@ class Agent:
         # Build user preferences
         user_preferences = user.to_shareable_dict()
 
-        # Get user's schedule
-        db = await get_db()
-        user_schedule = await db.get_schedule(self.user_id)
-
-        # Set up scheduler with user's schedule
-        if user_schedule:
-            self.scheduler.add_schedule(self.user_id, user_schedule)
+        # Set up scheduler with this event's participants only
+        self.scheduler.schedules = await self.get_participant_schedules([event])
 
-        # For other participants, create default schedules (in production, would query their agents)
-        for participant in event.participants:
-            if participant.user_id != self.user_id:
-                # Create a default schedule (weekend + evenings)
-                default_schedule = self._create_default_schedule(participant.user_id)
-                self.scheduler.add_schedule(participant.user_id, default_schedule)
-
-        # Find common availability
+        # Find common availability; the proposal only offers the first few
         start_date, end_date = self.scheduler.suggest_date_range(event.event_type)
-        available_slots = self.scheduler.find_common_slots(
-            event.event_type,
-            start_date,
-            end_date,
-        )
+        if available_slots is None:
+            available_slots = self.scheduler.first_common_slots(
+                event.event_type,
+                start_date,
+                end_date,
+                MAX_SLOT_OPTIONS,
+            )
 
         # Log coordination start
         event.add_agent_note(
@@ -98,15 +122,32 @@ class Agent:
             event.add_agent_note(
                 self.agent_id,
                 "concern",
-                "No common availability found in the next 30 days. Expanding search...",
+                "No time suits everyone in this window. Looking for times most of the group can make...",
                 private=False
             )
-            # Try with extended range
-            end_date = start_date + timedelta(days=60)
-            available_slots = self.scheduler.find_common_slots(
+            # One pass over the same window, naming who would miss each slot
+            available_slots = self.scheduler.find_quorum_slots(
                 event.event_type,
                 start_date,
                 end_date,
+                limit=MAX_SLOT_OPTIONS,
+                reserved=reserved,
+            )
+
+        if not available_slots:
+            event.add_agent_note(
+                self.agent_id,
+                "concern",
+                "Still no time found. Expanding the search to later dates...",
+                private=False
+            )
+            # Try a window as long again, skipping the days already searched
+            available_slots = self.scheduler.first_common_slots(
+                event.event_type,
+                end_date + timedelta(days=1),
+                end_date + (end_date - start_date),
+                MAX_SLOT_OPTIONS,
+                reserved=reserved,
             )
 
         # Build private notes for social intelligence
@@ -289,24 +330,67 @@ class AgentRunner:
     def __init__(self, user_id: str, agent_id: str):
         self.agent = Agent(user_id, agent_id)
         self.running = False
+        self.save_batch_size = 50  # coordinated events written per transaction
 
     async def start(self):
         """Start the agent runner."""
         self.running = True
         while self.running:
-            await self._check_pending_events()
+            await self.coordinate_pending()
             await asyncio.sleep(60)  # Check every minute
 
     async def stop(self):
         """Stop the agent runner."""
         self.running = False
 
-    async def _check_pending_events(self):
-        """Check for events needing coordination."""
+    async def coordinate_pending(self) -> List[Tuple[Event, dict]]:
+        """Coordinate every event still being planned.
+
+        Returns each event with its ``coordinate_event`` result. Events that
+        got a proposal without consensus move to ``PROPOSED``.
+        """
+        # Slots are assigned jointly, so one person is never booked into two
+        # events; reservations carry over from one batch to the next
+        batch = BatchScheduler(engine=self.agent.scheduler.engine)
+
+        # Times proposed or confirmed in earlier runs stay taken
+        for status in (EventStatus.PROPOSED, EventStatus.CONFIRMED):
+            async for events in self._event_batches(status):
+                batch.schedules.update(await self.agent.get_participant_schedules(events))
+                for event in events:
+                    batch.book(event)
+
+        results = []
+        async for events in self._event_batches(EventStatus.PLANNING):
+            results.extend(await self._coordinate_batch(events, batch))
+        return results
+
+    async def _event_batches(self, status: EventStatus) -> AsyncIterator[List[Event]]:
+        """The user's events with ``status``, loaded ``save_batch_size`` at a time."""
         db = await get_db()
-        events = await db.get_active_events(self.agent.user_id)
-
+        event_ids = []
+        async for summary in db.iter_event_summaries(self.agent.user_id, status=status.value):
+            event_ids.append(summary["id"])
+            if len(event_ids) >= self.save_batch_size:
+                yield await db.get_events(event_ids)
+                event_ids = []
+        if event_ids:
+            yield await db.get_events(event_ids)
+
+    async def _coordinate_batch(self, events: List[Event], batch: BatchScheduler) -> List[Tuple[Event, dict]]:
+        """Reserve slots for the events together, then coordinate and save each."""
+        db = await get_db()
+        batch.schedules.update(await self.agent.get_participant_schedules(events))
+        slots = batch.assign(events)
+        results = []
         for event in events:
-            if event.status == EventStatus.PLANNING:
-                await self.agent.coordinate_event(event)
-                await db.save_event(event)
+            slot = slots.get(event.id)
+            result = await self.agent.coordinate_event(event, [slot] if slot else [], batch.reserved)
+            if result.get("success") and not result.get("consensus"):
+                event.status = EventStatus.PROPOSED
+            # The proposal need not keep the reserved slot, so hold whatever
+            # time it actually names, or nothing if coordination failed
+            batch.book(event)
+            results.append((event, result))
+        await db.save_events(events)
+        return results
@@ -1,9 +1,32 @@
 """Scheduling logic for Yo-tei agents."""
 
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional, Tuple
-from ..models.schedule import Schedule, TimeSlot, find_common_availability
-from ..models.event import Event, EventType
+import heapq
+import math
+from datetime import date, datetime, timedelta
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+from ..models.schedule import (
+    EPOCH,
+    CompiledSchedule,
+    MINUTES_PER_DAY,
+    MinuteSlot,
+    Schedule,
+    TimeSlot,
+    common_minute_slots,
+    QuorumSlot,
+    day_minutes,
+    iter_common_minute_slots,
+    iter_quorum_slots,
+    merge_spans,
+)
+from ..models.event import Event, EventStatus, EventType
+from ..models.intervals import IntervalSet
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only the bitmap engine needs it
+    np = None
 
 
 # Typical durations for different event types (in hours)
@@ -31,11 +54,343 @@ EVENT_PREFERRED_TIMES = {
 }
 
 
-class Scheduler:
-    """Schedule coordination for events."""
+class GroupPreferences:
+    """How many participants hold each preference that affects slot scores.
+
+    Built once per ranking so scoring doesn't walk every participant's
+    preferences for every slot.
+    """
+
+    __slots__ = ("budget_conscious", "early_birds", "night_owls")
+
+    def __init__(self, preferences: Dict[str, dict]):
+        prefs = list(preferences.values())
+        self.budget_conscious = sum(1 for p in prefs if p.get("budget_conscious"))
+        self.early_birds = sum(1 for p in prefs if p.get("early_bird"))
+        self.night_owls = sum(1 for p in prefs if p.get("night_owl"))
+
+
+# A scoring rule maps (start hour, weekday, duration in minutes, group) to
+# points. Rules must be branch-free (comparisons combined with & | and
+# arithmetic) so the same rule scores one slot or a NumPy array of slots.
+ScoringRule = Callable[..., "float | np.ndarray"]
+
+
+def _weekend_rule(hour, weekday, minutes, group):
+    """Prefer weekends for social events."""
+    return 10 * (weekday >= 5)
+
+
+def _time_of_day_rule(hour, weekday, minutes, group):
+    """Prefer not too early, not too late."""
+    return 5 * ((hour >= 10) & (hour <= 19)) - 10 * ((hour < 9) | (hour > 21))
+
+
+def _long_slot_rule(hour, weekday, minutes, group):
+    """Prefer longer slots (more flexibility)."""
+    return 5 * (minutes >= 4 * 60)
+
+
+def _group_habits_rule(hour, weekday, minutes, group):
+    """Dinner tends to be pricier; early birds and night owls have their hours."""
+    return (
+        -5 * group.budget_conscious * (hour >= 18)
+        - 10 * group.early_birds * (hour >= 20)
+        - 10 * group.night_owls * (hour <= 10)
+    )
+
+
+def hour_bonus(first: int, last: int, points: float = 15) -> ScoringRule:
+    """A rule awarding ``points`` to slots starting between two hours, inclusive."""
+    def rule(hour, weekday, minutes, group):
+        return points * ((hour >= first) & (hour <= last))
+    return rule
+
+
+# Rules applied to every slot, then the extra rules for each event type
+BASE_SCORING_RULES: List[ScoringRule] = [
+    _weekend_rule,
+    _time_of_day_rule,
+    _long_slot_rule,
+    _group_habits_rule,
+]
+
+EVENT_SCORING_RULES: Dict[EventType, List[ScoringRule]] = {
+    EventType.DINNER: [hour_bonus(18, 20)],
+    EventType.OUTDOOR: [hour_bonus(10, 14)],
+    EventType.GAME_NIGHT: [hour_bonus(19, 20)],
+}
+
+
+# Resolution of the bitmap engine
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Days the streaming bitmap engine vectorizes at once
+BITMAP_WINDOW_DAYS = 14
+
+# Share of the group a fallback slot needs when no slot suits everyone
+QUORUM_FRACTION = 0.75
+
+
+# Range grids each schedule's bitmap form keeps for reuse
+BITMAP_GRID_CACHE = 32
 
-    def __init__(self):
+
+def _column(minutes: int, day_start: int, round_up: bool) -> int:
+    """Bitmap column of an epoch minute within the day starting at ``day_start``."""
+    offset = minutes - day_start
+    index = -(-offset // SLOT_MINUTES) if round_up else offset // SLOT_MINUTES
+    return min(max(index, 0), SLOTS_PER_DAY)
+
+
+def _to_columns(minutes: "np.ndarray", day_starts: "np.ndarray", round_up: bool) -> "np.ndarray":
+    """Vectorized ``_column``."""
+    offsets = minutes - day_starts
+    index = -(-offsets // SLOT_MINUTES) if round_up else offsets // SLOT_MINUTES
+    return np.clip(index, 0, SLOTS_PER_DAY)
+
+
+def _wall_minutes(moments: Iterable[datetime], count: int, round_up: bool) -> "np.ndarray":
+    """Vectorized ``to_minutes`` for naive datetimes.
+
+    Reads the date and time fields directly, which is several times faster
+    than subtracting datetimes or ``np.array(..., "datetime64")``.
+    """
+    epoch = EPOCH.toordinal()
+    if round_up:
+        minutes = (
+            (moment.toordinal() - epoch) * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+            + (moment.second > 0 or moment.microsecond > 0)
+            for moment in moments
+        )
+    else:
+        minutes = (
+            (moment.toordinal() - epoch) * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+            for moment in moments
+        )
+    return np.fromiter(minutes, dtype=np.int64, count=count)
+
+
+def _day_runs(slots_by_date: Dict[str, List[TimeSlot]], inward: bool) -> "np.ndarray":
+    """Per-date wall-clock slots as ``(day number, first column, end column)`` rows.
+
+    Columns are rounded inwards (free time) or outwards (busy time); day
+    numbers count from ``EPOCH``.
+    """
+    counts = list(map(len, slots_by_date.values()))
+    slots = list(chain.from_iterable(slots_by_date.values()))
+    if not slots:
+        return np.zeros((0, 3), dtype=np.int64)
+
+    day_numbers = np.repeat(
+        np.array([(date.fromisoformat(date_str) - EPOCH.date()).days for date_str in slots_by_date], dtype=np.int64),
+        counts,
+    )
+    day_starts = day_numbers * MINUTES_PER_DAY
+    starts = _wall_minutes((slot.start for slot in slots), len(slots), round_up=inward)
+    ends = _wall_minutes((slot.end for slot in slots), len(slots), round_up=not inward)
+
+    first = _to_columns(starts, day_starts, inward)
+    last = _to_columns(ends, day_starts, not inward)
+    keep = first < last
+    return np.stack([day_numbers[keep], first[keep], last[keep]], axis=1)
+
+
+def _paint(runs: "np.ndarray", first_day: int, days: int) -> "np.ndarray":
+    """A ``(days, SLOTS_PER_DAY)`` grid with the given column runs set."""
+    counts = np.zeros((days, SLOTS_PER_DAY + 1), dtype=np.int32)
+    rows = runs[:, 0] - first_day
+    np.add.at(counts, (rows, runs[:, 1]), 1)
+    np.add.at(counts, (rows, runs[:, 2]), -1)
+    return np.cumsum(counts[:, :-1], axis=1) > 0
+
+
+class BitmapSchedule:
+    """A schedule in the bitmap engine's terms, built once per change.
+
+    The weekday template is a ``(7, SLOTS_PER_DAY)`` grid, and busy and
+    explicit slots are arrays of ``(day number, first column, end column)``
+    in the schedule's wall-clock time, so the grid for any range is a few
+    whole-array operations. Recently used range grids are kept. Use
+    ``bitmap_schedule()`` rather than constructing this directly.
+    """
+
+    __slots__ = ("template", "busy", "specific", "specific_days", "blackouts", "_grids")
+
+    def __init__(self, schedule: Schedule, compiled: CompiledSchedule):
+        self.template = np.zeros((7, SLOTS_PER_DAY), dtype=bool)
+        for weekday, intervals in enumerate(compiled.weekdays):
+            for start, end in intervals:
+                self.template[weekday, _column(start, 0, True):_column(end, 0, False)] = True
+
+        # Read from the schedule's own wall-clock slots rather than the
+        # compiled UTC intervals, which would need converting back
+        self.busy = _day_runs(schedule.specific_busy, inward=False)
+        self.specific = _day_runs(schedule.specific_availability, inward=True)
+        # Explicit availability replaces the whole day, even when it is empty
+        self.specific_days = np.array(
+            [(date.fromisoformat(date_str) - EPOCH.date()).days for date_str in schedule.specific_availability],
+            dtype=np.int64,
+        )
+        self.blackouts = [
+            ((first - EPOCH.date()).days, (after_last - EPOCH.date()).days)
+            for first, after_last in compiled.blackouts
+        ]
+        self._grids: Dict[Tuple[date, int], "np.ndarray"] = {}
+
+    def grid(self, start_date: date, days: int) -> "np.ndarray":
+        """Read-only availability grid for ``days`` days from ``start_date``."""
+        key = (start_date, days)
+        grid = self._grids.get(key)
+        if grid is None:
+            grid = self._build(start_date, days)
+            grid.flags.writeable = False
+            if len(self._grids) >= BITMAP_GRID_CACHE:
+                del self._grids[next(iter(self._grids))]
+            self._grids[key] = grid
+        return grid
+
+    def _build(self, start_date: date, days: int) -> "np.ndarray":
+        first = (start_date - EPOCH.date()).days
+        grid = self.template[(np.arange(days) + start_date.weekday()) % 7]
+
+        busy = self.busy[(self.busy[:, 0] >= first) & (self.busy[:, 0] < first + days)]
+        if len(busy):
+            grid &= ~_paint(busy, first, days)
+
+        in_range = (self.specific_days >= first) & (self.specific_days < first + days)
+        if in_range.any():
+            grid[self.specific_days[in_range] - first] = False
+            free = self.specific[(self.specific[:, 0] >= first) & (self.specific[:, 0] < first + days)]
+            if len(free):
+                grid |= _paint(free, first, days)
+
+        for first_day, after_last_day in self.blackouts:
+            grid[max(first_day - first, 0):max(after_last_day - first, 0)] = False
+        return grid
+
+
+def bitmap_schedule(schedule: Schedule) -> BitmapSchedule:
+    """The bitmap form of a schedule, cached alongside its compiled form."""
+    compiled = schedule.compiled()
+    if compiled.bitmap is None:
+        compiled.bitmap = BitmapSchedule(schedule, compiled)
+    return compiled.bitmap
+
+
+def compile_bitmap(schedule: Schedule, start_date: date, days: int) -> "np.ndarray":
+    """A schedule's ``(days, SLOTS_PER_DAY)`` boolean availability grid.
+
+    The weekday templates are tiled across the range, then busy slots,
+    explicit availability (which replaces the whole day) and blackouts are
+    applied to the days they touch. Columns are the schedule's own
+    wall-clock time, so slots are placed as written even in an hour skipped
+    by a daylight-saving change. Free time is rounded inwards and busy time
+    outwards to the 15-minute grid. The grid is cached and read-only; copy
+    it to edit.
+    """
+    return bitmap_schedule(schedule).grid(start_date, days)
+
+
+def bitmap_common_availability(
+    schedules: List[Schedule],
+    start_date: date,
+    end_date: date,
+    min_duration_hours: float = 2.0
+) -> List[MinuteSlot]:
+    """Bitmap engine for ``common_minute_slots``.
+
+    ANDs every participant's cached grid, then finds runs of free slots
+    in all days at once. Same results as the reference engine for
+    schedules on the 15-minute grid, except that durations are wall-clock
+    on days when the clocks change. The grid is wall-clock time, so groups
+    spanning several time zones are handed to the reference engine.
+    """
+    if not schedules or end_date < start_date:
+        return []
+    if len({schedule.timezone for schedule in schedules}) > 1:
+        return common_minute_slots(schedules, start_date, end_date, min_duration_hours)
+
+    days = (end_date - start_date).days + 1
+    common = compile_bitmap(schedules[0], start_date, days).copy()
+    for schedule in schedules[1:]:
+        np.logical_and(common, compile_bitmap(schedule, start_date, days), out=common)
+        if not common.any():
+            return []
+
+    # Pad every day with a busy slot on both sides so each run has a rising
+    # and a falling edge; argwhere pairs them up in row-major order
+    padded = np.zeros((days, SLOTS_PER_DAY + 2), dtype=np.int8)
+    padded[:, 1:-1] = common
+    edges = np.diff(padded, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)[:, 1]
+
+    min_slots = math.ceil(min_duration_hours * 60 / SLOT_MINUTES - 1e-9)
+    keep = ends - starts[:, 1] >= max(min_slots, 1)
+
+    day_starts = day_minutes(start_date) + starts[keep, 0] * MINUTES_PER_DAY
+    run_starts = (day_starts + starts[keep, 1] * SLOT_MINUTES).tolist()
+    run_ends = (day_starts + ends[keep] * SLOT_MINUTES).tolist()
+    return [MinuteSlot(start, end) for start, end in zip(run_starts, run_ends)]
+
+
+def iter_bitmap_common_availability(
+    schedules: List[Schedule],
+    start_date: date,
+    end_date: date,
+    min_duration_hours: float = 2.0
+) -> Iterator[MinuteSlot]:
+    """Streaming bitmap engine: runs ``bitmap_common_availability`` a window of days at a time."""
+    window = timedelta(days=BITMAP_WINDOW_DAYS)
+    current = start_date
+    while current <= end_date:
+        last = min(current + window - timedelta(days=1), end_date)
+        yield from bitmap_common_availability(schedules, current, last, min_duration_hours)
+        current = last + timedelta(days=1)
+
+
+# Interchangeable implementations of common_minute_slots
+ENGINES: Dict[str, Callable[..., List[MinuteSlot]]] = {
+    "reference": common_minute_slots,
+    "bitmap": bitmap_common_availability,
+}
+
+# The same engines as generators yielding slots in chronological order
+ENGINE_ITERATORS: Dict[str, Callable[..., Iterator[MinuteSlot]]] = {
+    "reference": iter_common_minute_slots,
+    "bitmap": iter_bitmap_common_availability,
+}
+
+
+class Scheduler:
+    """Schedule coordination for events.
+
+    ``engine`` picks how common availability is computed: ``"reference"``
+    walks the range day by day with interval sets, ``"bitmap"`` vectorizes
+    it with NumPy and suits large groups and long horizons. The bitmap
+    engine is opt-in: it must convert every busy slot in the range before
+    its first search, so the first search after a schedule changes is
+    slower than with the reference engine, which converts only the dates
+    it reaches.
+    """
+
+    def __init__(self, engine: str = "reference"):
         self.schedules: Dict[str, Schedule] = {}
+        self.engine = engine
+
+    @property
+    def engine(self) -> str:
+        return self._engine
+
+    @engine.setter
+    def engine(self, name: str) -> None:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown scheduling engine: {name!r}")
+        if name == "bitmap" and np is None:
+            raise RuntimeError("The bitmap scheduling engine needs numpy: pip install numpy")
+        self._engine = name
 
     def add_schedule(self, user_id: str, schedule: Schedule):
         """Add a participant's schedule."""
@@ -47,8 +402,12 @@ class Scheduler:
         start_date: date,
         end_date: date,
         min_duration: Optional[float] = None,
-    ) -> List[TimeSlot]:
-        """Find time slots that work for all participants."""
+    ) -> List[MinuteSlot]:
+        """Find time slots that work for all participants.
+
+        Returns compact ``MinuteSlot``s; they read like ``TimeSlot``s and
+        convert with ``to_timeslot()``.
+        """
 
         if not self.schedules:
             return []
@@ -59,82 +418,207 @@ class Scheduler:
 
         # Find common availability
         schedules_list = list(self.schedules.values())
-        common_slots = find_common_availability(
-            schedules_list,
+        if min_duration >= 24:
+            # Windows of a day or more come from joining slots across midnight
+            common_slots = self.iter_common_slots(event_type, start_date, end_date, min_duration)
+        else:
+            common_slots = ENGINES[self.engine](
+                schedules_list,
+                start_date,
+                end_date,
+                min_duration,
+            )
+        return self._prefer_event_times(common_slots, event_type)
+
+    def iter_common_slots(
+        self,
+        event_type: EventType,
+        start_date: date,
+        end_date: date,
+        min_duration: Optional[float] = None,
+        reserved: Optional[Dict[str, IntervalSet]] = None,
+    ) -> Iterator[MinuteSlot]:
+        """Yield every common slot in chronological order, computed lazily.
+
+        Unlike ``find_common_slots`` no time-of-day preference is applied;
+        callers that stop early only pay for the days they consume.
+        Durations of a day or more are found by joining slots across midnight.
+        Time in ``reserved``, such as ``BatchScheduler.reserved``, counts as busy.
+        """
+        if not self.schedules:
+            return iter(())
+        if min_duration is None:
+            min_duration = EVENT_DURATIONS.get(event_type, 2)
+        if min_duration >= 24:
+            # The engines work per calendar day; find every free stretch and join them
+            slots = merge_spans(
+                ENGINE_ITERATORS[self.engine](list(self.schedules.values()), start_date, end_date, 0),
+                min_duration,
+            )
+        else:
+            slots = ENGINE_ITERATORS[self.engine](
+                list(self.schedules.values()),
+                start_date,
+                end_date,
+                min_duration,
+            )
+        if reserved:
+            slots = self._clear_of(slots, reserved, min_duration)
+        return slots
+
+    def first_common_slots(
+        self,
+        event_type: EventType,
+        start_date: date,
+        end_date: date,
+        limit: int,
+        min_duration: Optional[float] = None,
+        reserved: Optional[Dict[str, IntervalSet]] = None,
+    ) -> List[MinuteSlot]:
+        """The first ``limit`` slots ``find_common_slots`` would return.
+
+        Stops searching as soon as ``limit`` slots at the event type's
+        preferred time of day have been found. Time in ``reserved`` counts
+        as busy, as in ``iter_common_slots``.
+        """
+        slots = self.iter_common_slots(event_type, start_date, end_date, min_duration, reserved)
+        return self._prefer_event_times(slots, event_type, limit)
+
+    def find_quorum_slots(
+        self,
+        event_type: EventType,
+        start_date: date,
+        end_date: date,
+        k: Optional[int] = None,
+        limit: Optional[int] = None,
+        min_duration: Optional[float] = None,
+        reserved: Optional[Dict[str, IntervalSet]] = None,
+    ) -> List[QuorumSlot]:
+        """Find slots at least ``k`` participants can make, fewest missing first.
+
+        ``k`` defaults to ``QUORUM_FRACTION`` of the group, but always leaves
+        room for at least one absence so it never just repeats the unanimous
+        search. Each slot names who is missing. Time in ``reserved``, such as
+        ``BatchScheduler.reserved``, counts as busy.
+
+        The sweep works one calendar day at a time, so durations of a day or
+        more (trips) find nothing here; callers widen the unanimous search
+        for those instead.
+        """
+        if not self.schedules:
+            return []
+        if k is None:
+            group = len(self.schedules)
+            k = max(1, min(group - 1, math.ceil(QUORUM_FRACTION * group)))
+        if min_duration is None:
+            min_duration = EVENT_DURATIONS.get(event_type, 2)
+        if min_duration >= 24:
+            return []
+
+        slots = iter_quorum_slots(
+            list(self.schedules.values()),
+            k,
             start_date,
             end_date,
             min_duration,
+            reserved,
         )
+        slots = self._prefer_event_times(slots, event_type)
+        slots.sort(key=lambda slot: (len(slot.missing), slot.start_min))
+        return slots if limit is None else slots[:limit]
+
+    def _clear_of(
+        self,
+        slots: Iterable[MinuteSlot],
+        reserved: Dict[str, IntervalSet],
+        min_duration: float,
+    ) -> Iterator[MinuteSlot]:
+        """The parts of ``slots`` no participant has reserved, still ``min_duration`` long."""
+        organizer = next(iter(self.schedules.values())).compiled()
+        taken = IntervalSet()
+        for user_id in self.schedules:
+            taken |= reserved.get(user_id, IntervalSet())
+        min_minutes = math.ceil(min_duration * 60 - 1e-9)
+        for slot in slots:
+            free = IntervalSet(
+                [(organizer.to_utc(slot.start_min), organizer.to_utc(slot.end_min))],
+                normalized=True,
+            )
+            for start, end in (free - taken).at_least(min_minutes):
+                yield MinuteSlot(organizer.to_local(start), organizer.to_local(end))
 
-        # Filter by preferred times for event type
-        if event_type in EVENT_PREFERRED_TIMES:
-            pref_start, pref_end = EVENT_PREFERRED_TIMES[event_type]
-            filtered = []
-            for slot in common_slots:
-                slot_hour = slot.start.hour
-                if pref_start <= slot_hour < pref_end:
-                    filtered.append(slot)
-            if filtered:  # Only use filtered if we have results
-                common_slots = filtered
+    def _organizer_zone(self) -> Optional[ZoneInfo]:
+        """Time zone of the first schedule, whose wall-clock time slots are in."""
+        if not self.schedules:
+            return None
+        return next(iter(self.schedules.values())).compiled().zone
 
-        return common_slots
+    def _prefer_event_times(
+        self,
+        slots: Iterable[MinuteSlot],
+        event_type: EventType,
+        limit: Optional[int] = None,
+    ) -> List[MinuteSlot]:
+        """Keep slots starting at the event type's preferred hours, if there are any."""
+        if event_type not in EVENT_PREFERRED_TIMES:
+            return list(slots if limit is None else islice(slots, limit))
+
+        pref_start, pref_end = EVENT_PREFERRED_TIMES[event_type]
+        preferred, others = [], []
+        for slot in slots:
+            if pref_start <= slot.hour < pref_end:
+                preferred.append(slot)
+                if limit is not None and len(preferred) >= limit:
+                    break
+            elif limit is None or len(others) < limit:
+                others.append(slot)
+
+        # Only use filtered if we have results
+        return preferred or others
 
     def rank_slots(
         self,
-        slots: List[TimeSlot],
+        slots: List[Union[MinuteSlot, TimeSlot]],
         event_type: EventType,
         preferences: Dict[str, dict],
-    ) -> List[Tuple[TimeSlot, float]]:
-        """Rank time slots by desirability."""
+        top_k: Optional[int] = None,
+    ) -> List[Tuple[Union[MinuteSlot, TimeSlot], float]]:
+        """Rank time slots by desirability, best first.
+
+        Scores come from ``BASE_SCORING_RULES`` plus the event type's
+        ``EVENT_SCORING_RULES``, evaluated over whole arrays of slots when
+        NumPy is installed. ``top_k`` keeps only the best few, selected
+        with a heap instead of sorting everything. Equal scores keep their
+        input order.
+        """
+        if not slots:
+            return []
 
-        ranked = []
+        group = GroupPreferences(preferences)
+        rules = BASE_SCORING_RULES + EVENT_SCORING_RULES.get(event_type, [])
+        zone = self._organizer_zone()
+        compact = [MinuteSlot.coerce(slot, zone) for slot in slots]
+
+        if np is not None:
+            starts = np.fromiter((slot.start_min for slot in compact), dtype=np.int64, count=len(compact))
+            ends = np.fromiter((slot.end_min for slot in compact), dtype=np.int64, count=len(compact))
+            days, minute_of_day = np.divmod(starts, MINUTES_PER_DAY)
+            hour, weekday, minutes = minute_of_day // 60, (days + EPOCH.weekday()) % 7, ends - starts
+            scores = np.full(len(compact), 100.0)
+            for rule in rules:
+                scores += rule(hour, weekday, minutes, group)
+            scores = scores.tolist()
+        else:
+            scores = [
+                100.0 + sum(rule(c.hour, c.weekday, c.duration_minutes, group) for rule in rules)
+                for c in compact
+            ]
 
-        for slot in slots:
-            score = 100.0  # Start with perfect score
-
-            # Prefer weekends for social events
-            if slot.start.weekday() >= 5:
-                score += 10
-
-            # Prefer not too early, not too late
-            hour = slot.start.hour
-            if 10 <= hour <= 19:
-                score += 5
-            elif hour < 9 or hour > 21:
-                score -= 10
-
-            # Prefer longer slots (more flexibility)
-            if slot.duration_hours >= 4:
-                score += 5
-
-            # Event-specific preferences
-            if event_type == EventType.DINNER:
-                if 18 <= hour <= 20:
-                    score += 15
-            elif event_type == EventType.OUTDOOR:
-                if 10 <= hour <= 14:
-                    score += 15
-            elif event_type == EventType.GAME_NIGHT:
-                if 19 <= hour <= 20:
-                    score += 15
-
-            # Check against participant preferences
-            for user_id, prefs in preferences.items():
-                # Budget timing preference (e.g., lunch vs dinner prices)
-                if prefs.get("budget_conscious") and hour >= 18:
-                    score -= 5  # Dinner tends to be pricier
-
-                # Early bird vs night owl
-                if prefs.get("early_bird") and hour >= 20:
-                    score -= 10
-                elif prefs.get("night_owl") and hour <= 10:
-                    score -= 10
-
-            ranked.append((slot, score))
-
-        # Sort by score descending
-        ranked.sort(key=lambda x: x[1], reverse=True)
-        return ranked
+        if top_k is None:
+            order = sorted(range(len(slots)), key=scores.__getitem__, reverse=True)
+        else:
+            order = heapq.nlargest(top_k, range(len(slots)), key=scores.__getitem__)
+        return [(slots[i], scores[i]) for i in order]
 
     def suggest_date_range(
         self,
@@ -165,37 +649,80 @@ class Scheduler:
         """Get the next available slot for all participants."""
 
         start_date, end_date = self.suggest_date_range(event_type)
-        slots = self.find_common_slots(event_type, start_date, end_date, min_duration)
+        slots = self.first_common_slots(event_type, start_date, end_date, 1, min_duration)
 
         if slots:
-            # Return the first (soonest) slot
-            return min(slots, key=lambda s: s.start)
+            # Slots come in chronological order, so this is the soonest
+            return slots[0].to_timeslot()
         return None
 
     def check_conflicts(
         self,
-        proposed_slot: TimeSlot,
+        proposed_slot: Union[MinuteSlot, TimeSlot],
     ) -> Dict[str, bool]:
         """Check which participants have conflicts with a proposed time."""
+        return {
+            user_id: row[0]
+            for user_id, row in self.check_conflicts_bulk([proposed_slot]).items()
+        }
 
+    def check_conflicts_bulk(
+        self,
+        proposed_slots: Iterable[Union[MinuteSlot, TimeSlot]],
+    ) -> Dict[str, List[bool]]:
+        """Check many proposed times at once.
+
+        Returns a participants × candidates matrix: for each participant, a
+        list with one flag per slot, True where they have a conflict. Each
+        participant's free time on every date the slots touch is built into
+        one interval set up front, then every slot is answered with a
+        binary search.
+        """
+        if not self.schedules:
+            return {}
+
+        # Slots are in the organizer's wall-clock time; compare in UTC
+        organizer = next(iter(self.schedules.values())).compiled()
+        candidates = []
+        for slot in proposed_slots:
+            compact = MinuteSlot.coerce(slot, organizer.zone)
+            candidates.append((organizer.to_utc(compact.start_min), organizer.to_utc(compact.end_min)))
+
+        # Only the local dates the candidates touch are indexed; participants
+        # in the same time zone share the list
+        spans = IntervalSet(candidates)
+        dates_by_zone: Dict[str, List[date]] = {}
         conflicts = {}
         for user_id, schedule in self.schedules.items():
-            available_slots = schedule.get_availability_for_date(proposed_slot.start.date())
-            has_availability = any(
-                slot.start <= proposed_slot.start and slot.end >= proposed_slot.end
-                for slot in available_slots
+            compiled = schedule.compiled()
+            dates = dates_by_zone.get(compiled.zone.key)
+            if dates is None:
+                touched = set()
+                for start, end in spans:
+                    day, last = compiled.local_date(start), compiled.local_date(end - 1)
+                    while day <= last:
+                        touched.add(day)
+                        day += timedelta(days=1)
+                dates = dates_by_zone[compiled.zone.key] = sorted(touched)
+
+            index = IntervalSet(
+                interval for day in dates for interval in compiled.availability(day)
             )
-            conflicts[user_id] = not has_availability
+            conflicts[user_id] = [not index.covers(start, end) for start, end in candidates]
 
         return conflicts
 
     def find_alternatives(
         self,
-        original_slot: TimeSlot,
+        original_slot: Union[MinuteSlot, TimeSlot],
         event_type: EventType,
         days_to_search: int = 14,
-    ) -> List[TimeSlot]:
-        """Find alternative slots close to the original proposed time."""
+        limit: Optional[int] = None,
+    ) -> List[MinuteSlot]:
+        """Find alternative slots close to the original proposed time.
+
+        With ``limit``, the search stops once that many slots are found.
+        """
 
         # Search around the original date
         original_date = original_slot.start.date()
@@ -206,7 +733,138 @@ class Scheduler:
         if start_date < date.today():
             start_date = date.today() + timedelta(days=1)
 
-        return self.find_common_slots(event_type, start_date, end_date)
+        if limit is None:
+            return self.find_common_slots(event_type, start_date, end_date)
+        return self.first_common_slots(event_type, start_date, end_date, limit)
+
+
+class BatchScheduler:
+    """Assigns slots to many events at once without double-booking anyone.
+
+    Events are placed greedily, the most constrained first: more
+    participants, then longer durations. Each chosen slot is reserved for
+    every participant before the next event is searched. All events share
+    one set of schedules, so each is compiled once per batch rather than
+    once per event.
+    """
+
+    def __init__(self, schedules: Optional[Dict[str, Schedule]] = None, engine: str = "reference"):
+        self.schedules: Dict[str, Schedule] = schedules if schedules is not None else {}
+        self.engine = Scheduler(engine).engine  # Validates the name
+        self.reserved: Dict[str, IntervalSet] = {}  # user_id -> UTC minutes already taken
+        self._bookings: Dict[str, Dict[str, Tuple[int, int]]] = {}  # user_id -> event_id -> UTC minutes
+
+    def assign(
+        self,
+        events: Iterable[Event],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[str, Optional[MinuteSlot]]:
+        """Reserve a slot for each event; maps event ids to slots, or None where nothing fits."""
+        order = sorted(
+            events,
+            key=lambda event: (-len(event.participants), -EVENT_DURATIONS.get(event.event_type, 2)),
+        )
+        return {event.id: self.reserve(event, start_date, end_date) for event in order}
+
+    def reserve(
+        self,
+        event: Event,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Optional[MinuteSlot]:
+        """Find the event's best slot clear of earlier reservations and reserve it.
+
+        The returned slot is exactly the event's typical duration, in the
+        creator's wall-clock time. The range defaults to
+        ``Scheduler.suggest_date_range``. Any earlier reservation for the
+        event is released first.
+        """
+        self.release(event)
+        user_ids = self._participants(event)
+        if not user_ids:
+            return None
+
+        scheduler = Scheduler(self.engine)
+        for user_id in user_ids:
+            scheduler.add_schedule(user_id, self.schedules[user_id])
+        if start_date is None or end_date is None:
+            start_date, end_date = scheduler.suggest_date_range(event.event_type)
+
+        duration = math.ceil(EVENT_DURATIONS.get(event.event_type, 2) * 60)
+        organizer = self.schedules[user_ids[0]].compiled()
+        taken = IntervalSet()
+        for user_id in user_ids:
+            taken |= self.reserved.get(user_id, IntervalSet())
+
+        preferred_start = EVENT_PREFERRED_TIMES.get(event.event_type, (0, 24))[0] * 60
+
+        def free_slots() -> Iterator[MinuteSlot]:
+            for slot in scheduler.iter_common_slots(event.event_type, start_date, end_date):
+                free = IntervalSet(
+                    [(organizer.to_utc(slot.start_min), organizer.to_utc(slot.end_min))],
+                    normalized=True,
+                )
+                for start, end in (free - taken).at_least(duration):
+                    start, end = organizer.to_local(start), organizer.to_local(end)
+                    # Start at the preferred hour when the window opens earlier
+                    preferred = start - start % MINUTES_PER_DAY + preferred_start
+                    if start < preferred and preferred + duration <= end:
+                        start = preferred
+                    yield MinuteSlot(start, end)
+
+        best = scheduler._prefer_event_times(free_slots(), event.event_type, limit=1)
+        if not best:
+            return None
+
+        start = organizer.to_utc(best[0].start_min)
+        self._hold(event.id, user_ids, start, start + duration)
+        return MinuteSlot(best[0].start_min, organizer.to_local(start + duration))
+
+    def book(self, event: Event) -> Optional[MinuteSlot]:
+        """Reserve the time an event already holds, e.g. from an earlier run.
+
+        That is its confirmed time, or else its current proposal's. Anything
+        reserved for the event before is released first, so booking again
+        after coordination swaps a reserved slot for the time actually
+        proposed. Returns the booked slot in the creator's wall-clock time,
+        or None when the event holds no time.
+        """
+        self.release(event)
+        held = event.date_range if event.status == EventStatus.CONFIRMED else None
+        if held is None:
+            current = next((p for p in event.proposals if p.id == event.current_proposal_id), None)
+            held = current.date_range if current is not None else None
+        user_ids = self._participants(event)
+        if held is None or not user_ids:
+            return None
+
+        organizer = self.schedules[user_ids[0]].compiled()
+        slot = MinuteSlot.coerce(held, organizer.zone)
+        self._hold(event.id, user_ids, organizer.to_utc(slot.start_min), organizer.to_utc(slot.end_min))
+        return slot
+
+    def release(self, event: Event) -> None:
+        """Free the time reserved or booked for an event."""
+        for user_id in self._participants(event):
+            booked = self._bookings.get(user_id, {})
+            if booked.pop(event.id, None) is not None:
+                # Rebuilt rather than subtracted, in case other events overlap
+                self.reserved[user_id] = IntervalSet(booked.values())
+
+    def _participants(self, event: Event) -> List[str]:
+        """Participants with a known schedule, the creator's first so slots are in their time zone."""
+        return sorted(
+            {p.user_id for p in event.participants} & self.schedules.keys(),
+            key=lambda user_id: (user_id != event.creator_id, user_id),
+        )
+
+    def _hold(self, event_id: str, user_ids: List[str], start: int, end: int) -> None:
+        """Mark UTC minutes ``[start, end)`` as taken by the event for each user."""
+        booking = IntervalSet([(start, end)], normalized=True)
+        for user_id in user_ids:
+            self._bookings.setdefault(user_id, {})[event_id] = (start, end)
+            self.reserved[user_id] = self.reserved.get(user_id, IntervalSet()) | booking
 
 
 def create_scheduler_from_event(event: Event) -> Scheduler:
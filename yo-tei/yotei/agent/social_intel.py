@@ -1,18 +1,21 @@
 """DeepSeek-powered social intelligence for Yo-tei."""
 
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 import httpx
 
 from ..config.settings import get_settings
 from ..models.event import Event, Proposal, Location, DateRange
 from ..models.friend import FriendRelationship
-from ..models.schedule import TimeSlot
+from ..models.schedule import MinuteSlot, TimeSlot
 
 
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
 
+# Candidate time slots offered to the model in a proposal prompt
+MAX_SLOT_OPTIONS = 10
+
 # Social reasoning system prompt
 SOCIAL_SYSTEM_PROMPT = """You are a social coordination agent for event planning. Your role is to:
 
@@ -177,14 +180,19 @@ class SocialIntelligence:
         user_name: str,
         user_preferences: dict,
         private_notes: dict,
-        available_slots: List[TimeSlot],
+        available_slots: List[Union[MinuteSlot, TimeSlot]],
     ) -> Proposal:
         """Create an event proposal using social intelligence."""
 
-        # Format available slots
+        # Format available slots, naming anyone a quorum slot leaves out
+        names = {p.user_id: p.user_name for p in event.participants}
         slots_text = "\n".join([
             f"- {slot.start.strftime('%A %b %d, %Y %I:%M %p')} to {slot.end.strftime('%I:%M %p')}"
-            for slot in available_slots[:10]  # Limit to 10 options
+            + (
+                f" (without {', '.join(names.get(user_id, user_id) for user_id in slot.missing)})"
+                if getattr(slot, "missing", None) else ""
+            )
+            for slot in available_slots[:MAX_SLOT_OPTIONS]
         ]) or "No common availability found - need to negotiate"
 
         # Format participants
@@ -8,6 +8,8 @@ Usage:
     yotei plan "<title>"    # Plan an event
     yotei events            # List events
     yotei status "<title>"  # Check event status
+    yotei search <query>    # Search events
+    yotei db compact        # Archive finished events, reclaim space
 """
 
 import asyncio
@@ -41,9 +43,11 @@ console = Console()
 friend_app = typer.Typer(help="Manage friends")
 schedule_app = typer.Typer(help="Manage your schedule")
 agent_app = typer.Typer(help="Agent operations")
+db_app = typer.Typer(help="Maintain the local database")
 app.add_typer(friend_app, name="friend")
 app.add_typer(schedule_app, name="schedule")
 app.add_typer(agent_app, name="agent")
+app.add_typer(db_app, name="db")
 
 
 def run_async(coro):
@@ -303,15 +307,15 @@ def friends():
             await close_db()
             raise typer.Exit(1)
 
-        friend_list = await db.get_all_friends(user.id)
-        await close_db()
+        friend_count = await db.get_friends_count(user.id)
 
-        if not friend_list:
+        if not friend_count:
+            await close_db()
             console.print("\n[yellow]No friends yet![/yellow]")
             console.print("Add friends with: [cyan]yotei friend add <code>[/cyan]\n")
             return
 
-        tier_info = f"{len(friend_list)}/5 free" if user.tier == SubscriptionTier.FREE else "Pro - unlimited"
+        tier_info = f"{friend_count}/5 free" if user.tier == SubscriptionTier.FREE else "Pro - unlimited"
 
         table = Table(title=f"Core Circle ({tier_info})")
         table.add_column("#", style="dim")
@@ -320,16 +324,17 @@ def friends():
         table.add_column("Agent", style="yellow")
         table.add_column("Last Hangout", style="dim")
 
-        for i, friend in enumerate(friend_list, 1):
+        async for friend in db.iter_friends(user.id):
             last_hangout = friend.last_hangout.strftime("%b %d") if friend.last_hangout else "-"
             agent_status = "[green]online[/green]" if friend.agent_online else "[dim]offline[/dim]"
             table.add_row(
-                str(i),
+                str(table.row_count + 1),
                 friend.friend_name,
                 friend.relationship_type.value,
                 agent_status,
                 last_hangout
             )
+        await close_db()
 
         console.print()
         console.print(table)
@@ -440,6 +445,36 @@ def plan(title: str, event_type: str = "hangout"):
     run_async(create_plan())
 
 
+def _events_table(title: str) -> Table:
+    """Build the empty event listing table shared by `events` and `search`."""
+    table = Table(title=title)
+    table.add_column("Title", style="cyan")
+    table.add_column("Type", style="green")
+    table.add_column("Participants")
+    table.add_column("Date")
+    table.add_column("Status", style="yellow")
+    return table
+
+
+def _add_event_row(table: Table, summary: dict):
+    """Add one `Event.get_summary()` dict to an events table."""
+    status_color = {
+        "planning": "yellow",
+        "proposed": "blue",
+        "confirmed": "green",
+        "completed": "dim",
+        "cancelled": "red",
+    }.get(summary["status"], "white")
+
+    table.add_row(
+        summary["title"],
+        summary["type"],
+        ", ".join(summary["participants"][:3]) + ("..." if len(summary["participants"]) > 3 else ""),
+        summary["date"],
+        f"[{status_color}]{summary['status']}[/{status_color}]"
+    )
+
+
 @app.command()
 def events():
     """List all your events."""
@@ -452,44 +487,51 @@ def events():
             await close_db()
             raise typer.Exit(1)
 
-        event_list = await db.get_user_events(user.id)
+        table = _events_table("Your Events")
+        async for summary in db.iter_event_summaries(user.id):
+            _add_event_row(table, summary)
         await close_db()
 
-        if not event_list:
+        if not table.row_count:
             console.print("\n[yellow]No events yet![/yellow]")
             console.print("Plan one with: [cyan]yotei plan \"Event name\"[/cyan]\n")
             return
 
-        table = Table(title="Your Events")
-        table.add_column("Title", style="cyan")
-        table.add_column("Type", style="green")
-        table.add_column("Participants")
-        table.add_column("Date")
-        table.add_column("Status", style="yellow")
+        console.print()
+        console.print(table)
+        console.print()
 
-        for event in event_list:
-            summary = event.get_summary()
-            status_color = {
-                "planning": "yellow",
-                "proposed": "blue",
-                "confirmed": "green",
-                "completed": "dim",
-                "cancelled": "red",
-            }.get(summary["status"], "white")
+    run_async(list_events())
 
-            table.add_row(
-                summary["title"],
-                summary["type"],
-                ", ".join(summary["participants"][:3]) + ("..." if len(summary["participants"]) > 3 else ""),
-                summary["date"],
-                f"[{status_color}]{summary['status']}[/{status_color}]"
-            )
+
+@app.command()
+def search(query: str, status: Optional[str] = None, limit: int = 20):
+    """Search your events by title, description and agent activity."""
+    async def search_events():
+        db = await get_db()
+        user = await db.get_current_user()
+
+        if not user:
+            console.print("[red]Not initialized. Run 'yotei init' first.[/red]")
+            await close_db()
+            raise typer.Exit(1)
+
+        event_list = await db.find_events(query, status=status, limit=limit, user_id=user.id)
+        await close_db()
+
+        if not event_list:
+            console.print(f"\n[yellow]No events matching '{query}'[/yellow]\n")
+            return
+
+        table = _events_table(f"Events matching '{query}'")
+        for event in event_list:
+            _add_event_row(table, event.get_summary())
 
         console.print()
         console.print(table)
         console.print()
 
-    run_async(list_events())
+    run_async(search_events())
 
 
 @app.command()
@@ -504,13 +546,20 @@ def status(title: str):
             await close_db()
             raise typer.Exit(1)
 
-        events_list = await db.get_user_events(user.id)
-        event = next((e for e in events_list if e.title.lower() == title.lower()), None)
+        event = await db.get_event_by_title(user.id, title)
+        matches = [] if event else await db.find_events(title, limit=10, user_id=user.id)
         await close_db()
 
-        if not event:
+        if not event and not matches:
             console.print(f"[yellow]No event found with title '{title}'[/yellow]")
             return
+        if not event:
+            # Search hits are only candidates; let the user say which one
+            console.print(f"\n[yellow]No event is titled '{title}'. Did you mean:[/yellow]")
+            for i, match in enumerate(matches, 1):
+                console.print(f"  {i}. {match.title} [dim]({match.status.value})[/dim]")
+            choice = Prompt.ask("Pick one", choices=[str(i) for i in range(1, len(matches) + 1)])
+            event = matches[int(choice) - 1]
 
         # Display status
         status_emoji = {
@@ -618,7 +667,7 @@ def schedule_set():
 
         schedule = await db.get_schedule(user.id)
         if not schedule:
-            schedule = Schedule(user_id=user.id)
+            schedule = Schedule(user_id=user.id, timezone=user.timezone)
 
         schedule.default_availability = blocks
         await db.save_schedule(schedule)
@@ -689,7 +738,7 @@ def agent_status():
 def agent_coordinate():
     """Manually trigger agent coordination for pending events."""
     async def coordinate():
-        from .agent.core import Agent
+        from .agent.core import AgentRunner
 
         db = await get_db()
         user = await db.get_current_user()
@@ -699,35 +748,47 @@ def agent_coordinate():
             await close_db()
             raise typer.Exit(1)
 
-        events_list = await db.get_user_events(user.id)
-        pending_events = [e for e in events_list if e.status == EventStatus.PLANNING]
+        # Same batch path as the background agent, so events don't double-book anyone
+        with console.status("Coordinating events..."):
+            results = await AgentRunner(user.id, user.agent_id).coordinate_pending()
+        await close_db()
 
-        if not pending_events:
+        if not results:
             console.print("\n[yellow]No events need coordination.[/yellow]\n")
-            await close_db()
             return
 
-        console.print(f"\n[cyan]Coordinating {len(pending_events)} event(s)...[/cyan]\n")
-
-        agent = Agent(user.id, user.agent_id)
-
-        for event in pending_events:
-            console.print(f"  • {event.title}...")
-            result = await agent.coordinate_event(event)
+        console.print(f"\n[cyan]Coordinated {len(results)} event(s):[/cyan]\n")
+        for event, result in results:
+            console.print(f"  • {event.title}")
             if result.get("consensus"):
                 console.print(f"    [green]Consensus reached![/green]")
-                event.status = EventStatus.CONFIRMED
-            else:
+            elif result.get("success"):
                 console.print(f"    [yellow]Proposal sent, waiting for responses[/yellow]")
-                event.status = EventStatus.PROPOSED
-            await db.save_event(event)
+            else:
+                console.print(f"    [red]Coordination failed: {result.get('error')}[/red]")
 
-        await close_db()
         console.print("\n[green]Coordination complete.[/green]\n")
 
     run_async(coordinate())
 
 
+@db_app.command("compact")
+def db_compact(days: Optional[int] = typer.Option(None, help="Archive finished events older than this")):
+    """Archive completed/cancelled events and reclaim free space."""
+    async def compact():
+        db = await get_db()
+        older_than = days if days is not None else db.config.archive_after_days
+
+        with console.status("Compacting database..."):
+            stats = await db.compact(older_than)
+        await close_db()
+
+        console.print(f"\n[green]Archived {stats['archived']} event(s) older than {older_than} days.[/green]")
+        console.print(f"[dim]Pages: {stats['pages_before']} → {stats['pages_after']}[/dim]\n")
+
+    run_async(compact())
+
+
 @app.command()
 def upgrade():
     """Upgrade to Pro for unlimited friends."""
@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Literal
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
@@ -33,6 +33,26 @@ class RelayConfig(BaseModel):
     url: str = "ws://localhost:8765"
     reconnect_interval: int = 5  # seconds
     heartbeat_interval: int = 30  # seconds
+    send_queue_size: int = 256  # outbound messages buffered per connected agent
+    overflow_policy: Literal["drop_oldest", "disconnect", "block"] = "drop_oldest"  # when that buffer is full
+
+
+class DatabaseConfig(BaseModel):
+    """Local SQLite storage configuration."""
+    journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    mmap_size: int = 256 * 1024 * 1024  # bytes, 0 disables memory-mapped I/O
+    cache_size: int = -16000  # pages, or KiB when negative
+    busy_timeout: int = 5000  # milliseconds
+    read_pool_size: int = 2  # read-only connections alongside the writer
+    model_cache_size: int = 4096  # decoded models kept in memory, 0 disables
+    codec: Literal["json", "msgpack"] = "json"  # format for newly written document rows
+    archive_after_days: int = 90  # finished events older than this move to events_archive
+
+
+class SchedulerConfig(BaseModel):
+    """Availability search configuration."""
+    engine: Literal["reference", "bitmap"] = "reference"  # bitmap needs numpy; faster warm, slower cold
 
 
 class StripeConfig(BaseModel):
@@ -52,6 +72,8 @@ class Settings(BaseModel):
     deepseek: DeepSeekConfig = Field(default_factory=DeepSeekConfig)
     relay: RelayConfig = Field(default_factory=RelayConfig)
     stripe: StripeConfig = Field(default_factory=StripeConfig)
+    database: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    scheduler: SchedulerConfig = Field(default_factory=SchedulerConfig)
 
     # App settings
     timezone: str = "America/Los_Angeles"
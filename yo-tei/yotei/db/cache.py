@@ -0,0 +1,143 @@
+"""Identity map for decoded Yo-tei models."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+# How copy_model treats each type it meets, worked out once per type
+_SHARED, _MODEL, _LIST, _DICT, _SET = range(5)
+_KINDS: Dict[type, int] = {}
+
+# BaseModel's slots, set directly rather than through object.__setattr__
+_set_dict = BaseModel.__dict__["__dict__"].__set__
+_set_fields_set = BaseModel.__pydantic_fields_set__.__set__
+_set_extra = BaseModel.__pydantic_extra__.__set__
+_set_private = BaseModel.__pydantic_private__.__set__
+
+
+def _kind(cls: type) -> int:
+    kind = _KINDS.get(cls)
+    if kind is None:
+        if issubclass(cls, BaseModel):
+            kind = _MODEL
+        elif issubclass(cls, list):
+            kind = _LIST
+        elif issubclass(cls, dict):
+            kind = _DICT
+        elif issubclass(cls, set):
+            kind = _SET
+        else:
+            kind = _SHARED
+        _KINDS[cls] = kind
+    return kind
+
+
+def restore_model(model_cls: type, fields: dict, private: Optional[dict] = None) -> Any:
+    """Build a model from field values that need no validation.
+
+    ``fields`` must hold every field, already of the right type; the model
+    takes ownership of the dict. ``private`` sets private attributes, which
+    are otherwise left unset, so it is required for models that have any.
+    """
+    model = object.__new__(model_cls)
+    _set_dict(model, fields)
+    _set_fields_set(model, set(fields))
+    _set_extra(model, None)
+    _set_private(model, private)
+    return model
+
+
+def copy_model(value: Any) -> Any:
+    """Copy a model and everything mutable inside it, without revalidating.
+
+    Several times faster than ``model_copy(deep=True)``: immutable values
+    (strings, numbers, datetimes, enums) are shared, and private attributes
+    other than containers, such as a schedule's compiled form, are shared
+    too. Types are classified once, since ``isinstance`` against a pydantic
+    model class runs Python code.
+    """
+    kind = _kind(type(value))
+    if kind == _MODEL:
+        copied = object.__new__(type(value))
+        _set_dict(copied, {
+            name: item if _KINDS.get(type(item)) == _SHARED else copy_model(item)
+            for name, item in value.__dict__.items()
+        })
+        _set_fields_set(copied, set(value.__pydantic_fields_set__))
+        _set_extra(copied, value.__pydantic_extra__)
+        private = value.__pydantic_private__
+        _set_private(copied, private and {
+            name: item if _KINDS.get(type(item)) == _SHARED else copy_model(item)
+            for name, item in private.items()
+        })
+        return copied
+    if kind == _LIST:
+        return [item if _KINDS.get(type(item)) == _SHARED else copy_model(item) for item in value]
+    if kind == _DICT:
+        return {
+            key: item if _KINDS.get(type(item)) == _SHARED else copy_model(item)
+            for key, item in value.items()
+        }
+    if kind == _SET:
+        return set(value)
+    return value
+
+
+class ModelCache:
+    """LRU map of decoded rows, validated by row version.
+
+    Entries are keyed by ``(kind, key)`` and remember the ``updated_at`` value
+    of the row they were decoded from. A lookup only hits when the caller
+    presents the same version, so rows changed by another process are decoded
+    again. Values are stored and handed back as they are: callers cache
+    immutable data, or a model that nobody else holds and that they copy on
+    the way out, so mutating a model without saving it changes nothing for
+    later readers.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[str, Any]]" = OrderedDict()
+
+    def get(self, kind: str, key: Hashable, version: str) -> Optional[Any]:
+        """Return the cached value if it was decoded from this version."""
+        entry = self._entries.get((kind, key))
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((kind, key))
+        self.hits += 1
+        return entry[1]
+
+    def put(self, kind: str, key: Hashable, version: str, value: Any) -> None:
+        """Cache a decoded value, evicting the least recently used entry."""
+        if self.maxsize <= 0:
+            return
+        self._entries[(kind, key)] = (version, value)
+        self._entries.move_to_end((kind, key))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, kind: str, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or every entry of a kind when no key is given."""
+        if key is not None:
+            self._entries.pop((kind, key), None)
+            return
+        for cached_kind, cached_key in [k for k in self._entries if k[0] == kind]:
+            del self._entries[(cached_kind, cached_key)]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
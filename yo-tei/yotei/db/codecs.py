@@ -0,0 +1,78 @@
+"""Row codecs for models stored as whole documents.
+
+Users, friends, schedules and archived events are stored as one encoded
+model per row, next to a ``format`` column naming the codec that wrote it.
+Rows are always decoded with their own codec, so changing
+``DatabaseConfig.codec`` only affects rows written afterwards.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class Codec(ABC):
+    """Encodes pydantic models to a storable value and back."""
+
+    name = ""
+
+    @abstractmethod
+    def encode(self, model: BaseModel) -> Union[str, bytes]:
+        """Encode a model for storage."""
+
+    @abstractmethod
+    def decode(self, model_cls: Type[M], data: Union[str, bytes]) -> M:
+        """Rebuild a model of ``model_cls`` from stored data."""
+
+
+class JsonCodec(Codec):
+    """Pydantic's own JSON, stored as text. Always available."""
+
+    name = "json"
+
+    def encode(self, model: BaseModel) -> str:
+        return model.model_dump_json()
+
+    def decode(self, model_cls: Type[M], data: Union[str, bytes]) -> M:
+        return model_cls.model_validate_json(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack bytes of the model's JSON-mode dump."""
+
+    name = "msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise RuntimeError("The msgpack codec needs the msgpack package: pip install msgpack")
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+
+    def encode(self, model: BaseModel) -> bytes:
+        return self._packb(model.model_dump(mode="json"))
+
+    def decode(self, model_cls: Type[M], data: Union[str, bytes]) -> M:
+        return model_cls.model_validate(self._unpackb(data))
+
+
+CODECS: Dict[str, Callable[[], Codec]] = {
+    JsonCodec.name: JsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+
+_instances: Dict[str, Codec] = {}
+
+
+def get_codec(name: str) -> Codec:
+    """Return the shared codec instance for a format tag."""
+    codec = _instances.get(name)
+    if codec is None:
+        if name not in CODECS:
+            raise ValueError(f"Unknown storage format: {name!r}")
+        codec = _instances[name] = CODECS[name]()
+    return codec
@@ -1,15 +1,271 @@
 """SQLite database operations for Yo-tei."""
 
+import re
 import json
+import base64
+import binascii
+import zlib
+import asyncio
+import gc
 import aiosqlite
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict, Tuple, AsyncIterator, Callable
+from datetime import datetime, timedelta
 
 from ..models.user import User
-from ..models.friend import FriendRelationship, SocialGraph
-from ..models.event import Event
+from ..models.friend import FriendRelationship
+from ..models.event import (
+    Event,
+    EventType,
+    EventStatus,
+    DateRange,
+    Location,
+    Proposal,
+    AgentNote,
+    ParticipantStatus,
+)
 from ..models.schedule import Schedule
+from ..config.settings import DatabaseConfig, get_settings
+from .cache import ModelCache, copy_model, restore_model
+from .codecs import get_codec
+from .migrations import migrate
+
+
+# Number of most recent agent notes loaded with each event
+EVENT_NOTE_TAIL = 50
+
+# Core event columns, in the order ``Database._load_events`` expects them
+_EVENT_COLUMNS = """
+    id, creator_id, title, description, event_type, status, start_at, end_at,
+    location, budget_per_person, current_proposal_id, consensus_reached,
+    pending_nudges, created_at, updated_at
+"""
+
+# Page size for the keyset-paginated iterators
+DEFAULT_PAGE_SIZE = 200
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+# Statuses an event never leaves, and so may be archived
+ARCHIVABLE_STATUSES = (EventStatus.COMPLETED.value, EventStatus.CANCELLED.value)
+
+# zlib level for archived payloads; archiving is rare, reads are on demand
+ARCHIVE_COMPRESSION_LEVEL = 9
+
+# Transactions the running code is inside of. Tasks copy their parent's
+# context when created, so tasks started inside a transaction join it.
+_open_transactions: ContextVar[frozenset] = ContextVar("yotei_open_transactions", default=frozenset())
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    """Serialize an optional datetime column."""
+    return value.isoformat() if value else None
+
+
+def _summary_cursor(updated_at: str, event_id: str) -> str:
+    """Opaque keyset position of an event summary."""
+    return base64.urlsafe_b64encode(json.dumps([updated_at, event_id]).encode()).decode()
+
+
+def _parse_summary_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of ``_summary_cursor``."""
+    try:
+        updated_at, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError(f"Invalid event cursor: {cursor!r}")
+    return str(updated_at), str(event_id)
+
+
+def _summary_page_query(
+    user_id: str,
+    status: Optional[str],
+    position: Optional[Tuple[str, str]],
+    page_size: int,
+) -> Tuple[str, list]:
+    """SQL and parameters for one page of ``iter_event_summaries``.
+
+    The page walks ``idx_events_updated_id`` backwards from ``position``
+    and checks each event's membership as it goes, so it reads only as far
+    as the page needs instead of collecting and sorting all of the user's
+    events again for every page.
+    """
+    # Participants come as [position, name] pairs: aggregate order is not
+    # guaranteed, so callers sort them
+    query = """
+        SELECT e.id, e.title, e.event_type, e.status, e.start_at,
+               json_extract(e.location, '$.name'), e.consensus_reached, e.updated_at,
+               (SELECT json_group_array(json_array(position, user_name))
+                FROM event_participants p WHERE p.event_id = e.id)
+        FROM events e INDEXED BY idx_events_updated_id
+        WHERE (e.creator_id = ? OR EXISTS (
+            SELECT 1 FROM event_participants m WHERE m.event_id = e.id AND m.user_id = ?
+        ))
+    """
+    params: list = [user_id, user_id]
+    if status:
+        query += " AND e.status = ?"
+        params.append(status)
+    if position is not None:
+        query += " AND (e.updated_at, e.id) < (?, ?)"
+        params.extend(position)
+    query += " ORDER BY e.updated_at DESC, e.id DESC LIMIT ?"
+    params.append(page_size)
+    return query, params
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """Parse an optional datetime column."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query of quoted prefix terms."""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+@contextmanager
+def _gc_paused():
+    """Hold off cyclic garbage collection while a batch of models is built.
+
+    Building keeps every object it allocates, so collections that tens of
+    thousands of allocations would trigger midway only rescan live objects.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _agent_note(row: tuple) -> AgentNote:
+    """Build an AgentNote from a row.
+
+    The row starts (seq, timestamp, agent_id, note_type, content, private);
+    any columns after those are ignored.
+    """
+    return restore_model(AgentNote, {
+        "timestamp": datetime.fromisoformat(row[1]),
+        "agent_id": row[2],
+        "note_type": row[3],
+        "content": row[4],
+        "private": bool(row[5]),
+        "seq": row[0],
+    })
+
+
+def _reset_seq(notes: List[AgentNote]) -> None:
+    """Forget log positions assigned in a transaction that rolled back."""
+    for note in notes:
+        note.seq = None
+
+
+def _date_range(start: Optional[str], end: Optional[str]) -> Optional[DateRange]:
+    """Rebuild a DateRange from its start/end columns."""
+    if start is None or end is None:
+        return None
+    return restore_model(DateRange, {"start": datetime.fromisoformat(start), "end": datetime.fromisoformat(end)})
+
+
+def _location(value: Optional[str], decoded: Dict[str, Location]) -> Optional[Location]:
+    """Rebuild a Location from its JSON column.
+
+    Each distinct value is validated once per load and copied from then on;
+    ``decoded`` holds the ones seen so far, since events and their proposals
+    keep coming back to the same few places.
+    """
+    if not value:
+        return None
+    location = decoded.get(value)
+    if location is None:
+        location = decoded[value] = Location.model_validate_json(value)
+    return restore_model(Location, dict(location.__dict__))
+
+
+def _json_list(value: str) -> list:
+    """Decode a JSON list column; most are empty, which skips the parser."""
+    return [] if value == "[]" else json.loads(value)
+
+
+def _json_dict(value: str) -> dict:
+    """Decode a JSON object column; most are empty, which skips the parser."""
+    return {} if value == "{}" else json.loads(value)
+
+
+# An event's child rows as read from the database: participants, responses,
+# proposals and notes, each in load order
+_EventChildren = Tuple[List[tuple], List[tuple], List[tuple], List[tuple]]
+
+
+def _build_event(row: tuple, children: _EventChildren, locations: Dict[str, Location]) -> Event:
+    """Build an event from its core row and child rows.
+
+    Every row was written by this store from a validated model, so models
+    are rebuilt with ``restore_model`` instead of being validated again:
+    validation made loading slower than decoding a JSON document. The rows
+    are only read, so cached ones can be built from any number of times.
+    """
+    participant_rows, response_rows, proposal_rows, note_rows = children
+
+    responses: Dict[str, Dict[str, str]] = {}
+    for proposal_id, agent_id, response, _ in response_rows:
+        if response is None:
+            responses.get(proposal_id, {}).pop(agent_id, None)
+        else:
+            responses.setdefault(proposal_id, {})[agent_id] = response
+
+    proposals = []
+    for p in proposal_rows:
+        logged = responses.get(p[1], {})
+        proposals.append(restore_model(Proposal, {
+            "id": p[1],
+            "proposer_agent_id": p[2],
+            "proposed_at": datetime.fromisoformat(p[3]),
+            "date_range": _date_range(p[4], p[5]),
+            "location": _location(p[6], locations),
+            "activity_suggestion": p[7],
+            "estimated_cost_per_person": p[8],
+            "reasoning": p[9],
+            "responses": logged,
+            "modifications_requested": _json_list(p[10]),
+        }, {"_logged_responses": dict(logged)}))
+
+    return restore_model(Event, {
+        "id": row[0],
+        "created_at": datetime.fromisoformat(row[13]),
+        "updated_at": datetime.fromisoformat(row[14]),
+        "creator_id": row[1],
+        "title": row[2],
+        "description": row[3],
+        "event_type": EventType(row[4]),
+        "participants": [
+            restore_model(ParticipantStatus, {
+                "user_id": p[1],
+                "user_name": p[2],
+                "agent_id": p[3],
+                "confirmed": bool(p[4]),
+                "enthusiasm_level": p[5],
+                "constraints_shared": _json_list(p[6]),
+                "agent_responded": bool(p[7]),
+                "last_response_at": _parse_iso(p[8]),
+            })
+            for p in participant_rows
+        ],
+        "status": EventStatus(row[5]),
+        "date_range": _date_range(row[6], row[7]),
+        "location": _location(row[8], locations),
+        "budget_per_person": row[9],
+        "proposals": proposals,
+        "current_proposal_id": row[10],
+        "consensus_reached": bool(row[11]),
+        "agent_notes": [_agent_note(n) for n in note_rows],
+        "pending_nudges": _json_dict(row[12]),
+    })
 
 
 def get_db_path() -> Path:
@@ -20,174 +276,306 @@ def get_db_path() -> Path:
 
 
 class Database:
-    """SQLite database for Yo-tei local storage."""
+    """SQLite database for Yo-tei local storage.
+
+    Holds one writer connection plus a small pool of read-only connections.
+    With WAL journaling, readers see the last committed state and never wait
+    on an open write transaction.
+    """
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, config: Optional[DatabaseConfig] = None):
         self.db_path = db_path or get_db_path()
+        self.config = config or DatabaseConfig()
         self._connection: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self._tx: Optional[object] = None  # Token of the open transaction
+        self._on_rollback: List[Callable[[], None]] = []
+        self.cache = ModelCache(self.config.model_cache_size)
+        self.codec = get_codec(self.config.codec)
 
     async def connect(self):
         """Connect to the database."""
-        self._connection = await aiosqlite.connect(self.db_path)
-        await self._create_tables()
+        self._connection = await self._open_connection(writer=True)
+        await migrate(self, self._connection)
+
+        # An in-memory database is private to its connection, so there is
+        # nothing for extra readers to share
+        pool_size = 0 if str(self.db_path) == ":memory:" else self.config.read_pool_size
+        self._idle_readers = asyncio.Queue()
+        for _ in range(pool_size):
+            reader = await self._open_connection(writer=False)
+            self._readers.append(reader)
+            self._idle_readers.put_nowait(reader)
 
     async def close(self):
         """Close the database connection."""
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._idle_readers = None
         if self._connection:
             await self._connection.close()
             self._connection = None
 
-    async def _create_tables(self):
-        """Create database tables if they don't exist."""
-        async with self._connection.cursor() as cursor:
-            # Users table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    data TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-            """)
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the decoded-model cache."""
+        return self.cache.stats()
 
-            # Friends table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS friends (
-                    user_id TEXT NOT NULL,
-                    friend_id TEXT NOT NULL,
-                    data TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    PRIMARY KEY (user_id, friend_id)
-                )
-            """)
+    def _decode(self, model_cls, kind: str, key, version: str, data, fmt: str):
+        """Decode a document row, reusing the cached model for an unchanged version.
 
-            # Events table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS events (
-                    id TEXT PRIMARY KEY,
-                    creator_id TEXT NOT NULL,
-                    data TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-            """)
+        Each call copies once: a hit hands out a copy of the cached model, and
+        a miss returns the decoded model and caches a copy of it.
+        """
+        cached = self.cache.get(kind, key, version)
+        if cached is not None:
+            return copy_model(cached)
+        model = get_codec(fmt).decode(model_cls, data)
+        if self.cache.maxsize > 0:
+            self.cache.put(kind, key, version, copy_model(model))
+        return model
 
-            # Event participants (for querying)
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS event_participants (
-                    event_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    PRIMARY KEY (event_id, user_id),
-                    FOREIGN KEY (event_id) REFERENCES events(id)
-                )
-            """)
+    def _encode_bytes(self, model) -> bytes:
+        """Encode a model with the configured codec, as bytes."""
+        data = self.codec.encode(model)
+        return data.encode() if isinstance(data, str) else data
 
-            # Schedules table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS schedules (
-                    user_id TEXT PRIMARY KEY,
-                    data TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-            """)
+    async def _open_connection(self, writer: bool) -> aiosqlite.Connection:
+        """Open a connection with the configured pragmas applied."""
+        connection = await aiosqlite.connect(self.db_path)
+        config = self.config
+        await connection.execute(f"PRAGMA busy_timeout = {int(config.busy_timeout)}")
+        await connection.execute(f"PRAGMA cache_size = {int(config.cache_size)}")
+        await connection.execute(f"PRAGMA mmap_size = {int(config.mmap_size)}")
+        if writer:
+            # Only takes effect on a new file; older files are converted by
+            # the first ``compact``
+            await connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            await connection.execute(f"PRAGMA journal_mode = {config.journal_mode}")
+            await connection.execute(f"PRAGMA synchronous = {config.synchronous}")
+        else:
+            await connection.execute("PRAGMA query_only = ON")
+        return connection
 
-            # Group dynamics table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS group_dynamics (
-                    user_id TEXT NOT NULL,
-                    group_key TEXT NOT NULL,
-                    data TEXT NOT NULL,
-                    PRIMARY KEY (user_id, group_key)
-                )
-            """)
+    @asynccontextmanager
+    async def _reader(self, snapshot: bool = False):
+        """Borrow a connection for reading.
 
-            await self._connection.commit()
+        Falls back to the writer when there is no pool, or when the calling
+        task is inside a transaction and must see its own uncommitted writes.
+
+        With ``snapshot``, every query in the block sees the same committed
+        state, for loads spread over several statements: a pooled reader
+        runs the block in one read transaction, and the writer is held so
+        no commit lands partway through.
+        """
+        if self._in_transaction():
+            yield self._connection
+            return
+        if not self._readers:
+            if snapshot:
+                async with self._write_lock:
+                    yield self._connection
+            else:
+                yield self._connection
+            return
+
+        reader = await self._idle_readers.get()
+        try:
+            if snapshot:
+                await reader.execute("BEGIN")
+                try:
+                    yield reader
+                finally:
+                    await reader.commit()
+            else:
+                yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Group writes into a single commit.
+
+        Every ``save_*``/``delete_*`` call runs inside a transaction; when the
+        caller is already inside one, the call joins it instead of committing
+        on its own. That includes tasks started inside the block, e.g. by
+        ``asyncio.gather``. Writes are rolled back if the block raises, and
+        in-memory bookkeeping done for them (event log positions) is undone.
+        The SQLite write lock is taken when the block opens, so values read
+        inside it, like the next event log ``seq``, cannot be taken by
+        another process before they are written.
+
+            async with db.transaction():
+                await db.save_event(event)
+                await db.save_user(user)
+        """
+        if self._in_transaction():
+            yield self
+            return
+
+        async with self._write_lock:
+            self._tx = object()
+            context = _open_transactions.set(_open_transactions.get() | {self._tx})
+            try:
+                await self._connection.execute("BEGIN IMMEDIATE")
+                yield self
+            except BaseException:
+                await self._connection.rollback()
+                for undo in reversed(self._on_rollback):
+                    undo()
+                raise
+            else:
+                await self._connection.commit()
+            finally:
+                _open_transactions.reset(context)
+                self._tx = None
+                self._on_rollback = []
+
+    def _in_transaction(self) -> bool:
+        """Whether the running code is inside this database's open transaction."""
+        return self._tx is not None and self._tx in _open_transactions.get()
 
     # User operations
     async def save_user(self, user: User) -> None:
         """Save or update a user."""
         now = datetime.utcnow().isoformat()
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
             await cursor.execute("""
-                INSERT OR REPLACE INTO users (id, data, created_at, updated_at)
-                VALUES (?, ?, ?, ?)
-            """, (user.id, user.model_dump_json(), user.created_at.isoformat(), now))
-            await self._connection.commit()
+                INSERT OR REPLACE INTO users (id, data, format, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (user.id, self.codec.encode(user), self.codec.name, user.created_at.isoformat(), now))
+        self.cache.invalidate("user", user.id)
 
     async def get_user(self, user_id: str) -> Optional[User]:
         """Get a user by ID."""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT data FROM users WHERE id = ?", (user_id,))
+        async with self._reader() as conn, conn.cursor() as cursor:
+            await cursor.execute("SELECT updated_at, data, format FROM users WHERE id = ?", (user_id,))
             row = await cursor.fetchone()
             if row:
-                return User.model_validate_json(row[0])
+                return self._decode(User, "user", user_id, *row)
         return None
 
     async def get_current_user(self) -> Optional[User]:
         """Get the current (first) user - for single-user CLI."""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT data FROM users LIMIT 1")
+        async with self._reader() as conn, conn.cursor() as cursor:
+            await cursor.execute("SELECT id, updated_at, data, format FROM users LIMIT 1")
             row = await cursor.fetchone()
             if row:
-                return User.model_validate_json(row[0])
+                return self._decode(User, "user", *row)
         return None
 
     async def delete_user(self, user_id: str) -> None:
         """Delete a user and all related data."""
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
             await cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
             await cursor.execute("DELETE FROM friends WHERE user_id = ?", (user_id,))
             await cursor.execute("DELETE FROM schedules WHERE user_id = ?", (user_id,))
             await cursor.execute("DELETE FROM group_dynamics WHERE user_id = ?", (user_id,))
-            await self._connection.commit()
+        self.cache.invalidate("user", user_id)
+        self.cache.invalidate("friend")
+        self.cache.invalidate("schedule", user_id)
 
     # Friend operations
     async def save_friend(self, user_id: str, friend: FriendRelationship) -> None:
         """Save or update a friend relationship."""
         now = datetime.utcnow().isoformat()
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
             await cursor.execute("""
-                INSERT OR REPLACE INTO friends (user_id, friend_id, data, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, friend.friend_id, friend.model_dump_json(), friend.connected_at.isoformat(), now))
-            await self._connection.commit()
+                INSERT OR REPLACE INTO friends (user_id, friend_id, data, format, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                user_id, friend.friend_id, self.codec.encode(friend), self.codec.name,
+                friend.connected_at.isoformat(), now,
+            ))
+        self.cache.invalidate("friend", (user_id, friend.friend_id))
+
+    async def save_friends(self, user_id: str, friends: List[FriendRelationship]) -> None:
+        """Save or update many friend relationships in one transaction."""
+        now = datetime.utcnow().isoformat()
+        async with self.transaction(), self._connection.cursor() as cursor:
+            await cursor.executemany("""
+                INSERT OR REPLACE INTO friends (user_id, friend_id, data, format, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    user_id, friend.friend_id, self.codec.encode(friend), self.codec.name,
+                    friend.connected_at.isoformat(), now,
+                )
+                for friend in friends
+            ])
+        for friend in friends:
+            self.cache.invalidate("friend", (user_id, friend.friend_id))
 
     async def get_friend(self, user_id: str, friend_id: str) -> Optional[FriendRelationship]:
         """Get a specific friend relationship."""
-        async with self._connection.cursor() as cursor:
+        async with self._reader() as conn, conn.cursor() as cursor:
             await cursor.execute(
-                "SELECT data FROM friends WHERE user_id = ? AND friend_id = ?",
+                "SELECT updated_at, data, format FROM friends WHERE user_id = ? AND friend_id = ?",
                 (user_id, friend_id)
             )
             row = await cursor.fetchone()
             if row:
-                return FriendRelationship.model_validate_json(row[0])
+                return self._decode(FriendRelationship, "friend", (user_id, friend_id), *row)
         return None
 
     async def get_all_friends(self, user_id: str) -> List[FriendRelationship]:
         """Get all friends for a user."""
-        friends = []
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT data FROM friends WHERE user_id = ?", (user_id,))
+        async with self._reader() as conn, conn.cursor() as cursor:
+            await cursor.execute(
+                "SELECT friend_id, updated_at, data, format FROM friends WHERE user_id = ?",
+                (user_id,)
+            )
             rows = await cursor.fetchall()
-            for row in rows:
-                friends.append(FriendRelationship.model_validate_json(row[0]))
-        return friends
+        return [
+            self._decode(FriendRelationship, "friend", (user_id, friend_id), updated_at, data, fmt)
+            for friend_id, updated_at, data, fmt in rows
+        ]
 
     async def delete_friend(self, user_id: str, friend_id: str) -> None:
         """Delete a friend relationship."""
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
             await cursor.execute(
                 "DELETE FROM friends WHERE user_id = ? AND friend_id = ?",
                 (user_id, friend_id)
             )
-            await self._connection.commit()
+        self.cache.invalidate("friend", (user_id, friend_id))
+
+    async def iter_friends(
+        self,
+        user_id: str,
+        after: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> AsyncIterator[FriendRelationship]:
+        """Iterate a user's friends ordered by friend ID, one page at a time.
+
+        ``after`` is a friend ID to resume after.
+        """
+        while True:
+            query = "SELECT friend_id, updated_at, data, format FROM friends WHERE user_id = ?"
+            params: list = [user_id]
+            if after is not None:
+                query += " AND friend_id > ?"
+                params.append(after)
+            query += " ORDER BY friend_id LIMIT ?"
+            params.append(page_size)
+
+            async with self._reader() as conn, conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
+
+            for friend_id, updated_at, data, fmt in rows:
+                yield self._decode(FriendRelationship, "friend", (user_id, friend_id), updated_at, data, fmt)
+
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
 
     async def get_friends_count(self, user_id: str) -> int:
         """Get the number of friends for a user."""
-        async with self._connection.cursor() as cursor:
+        async with self._reader() as conn, conn.cursor() as cursor:
             await cursor.execute(
                 "SELECT COUNT(*) FROM friends WHERE user_id = ?",
                 (user_id,)
@@ -199,53 +587,450 @@ class Database:
     async def save_event(self, event: Event) -> None:
         """Save or update an event."""
         now = datetime.utcnow().isoformat()
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("""
-                INSERT OR REPLACE INTO events (id, creator_id, data, status, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (event.id, event.creator_id, event.model_dump_json(), event.status.value, event.created_at.isoformat(), now))
-
-            # Update participants
-            await cursor.execute("DELETE FROM event_participants WHERE event_id = ?", (event.id,))
-            for participant in event.participants:
-                await cursor.execute(
-                    "INSERT INTO event_participants (event_id, user_id) VALUES (?, ?)",
-                    (event.id, participant.user_id)
-                )
+        async with self.transaction(), self._connection.cursor() as cursor:
+            await self._write_events(cursor, [(event, now)])
 
-            await self._connection.commit()
+    async def save_events(self, events: List[Event]) -> None:
+        """Save or update many events in one transaction."""
+        now = datetime.utcnow().isoformat()
+        async with self.transaction(), self._connection.cursor() as cursor:
+            await self._write_events(cursor, [(event, now) for event in events])
+
+    async def _write_events(self, cursor: aiosqlite.Cursor, rows: List[Tuple[Event, str]]) -> None:
+        """Write events' core rows and replace their child rows.
+
+        ``rows`` pairs each event with the ``updated_at`` value to store.
+        """
+        if not rows:
+            return
+        events = [event for event, _ in rows]
+        for event in events:
+            self.cache.invalidate("event", event.id)
+
+        await cursor.executemany("""
+            INSERT INTO events (
+                id, creator_id, title, title_key, description, event_type, status,
+                start_at, end_at, location, budget_per_person,
+                current_proposal_id, consensus_reached, pending_nudges,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                creator_id = excluded.creator_id,
+                title = excluded.title,
+                title_key = excluded.title_key,
+                description = excluded.description,
+                event_type = excluded.event_type,
+                status = excluded.status,
+                start_at = excluded.start_at,
+                end_at = excluded.end_at,
+                location = excluded.location,
+                budget_per_person = excluded.budget_per_person,
+                current_proposal_id = excluded.current_proposal_id,
+                consensus_reached = excluded.consensus_reached,
+                pending_nudges = excluded.pending_nudges,
+                updated_at = excluded.updated_at
+        """, [
+            (
+                event.id,
+                event.creator_id,
+                event.title,
+                event.title.lower(),
+                event.description,
+                event.event_type.value,
+                event.status.value,
+                _iso(event.date_range.start if event.date_range else None),
+                _iso(event.date_range.end if event.date_range else None),
+                event.location.model_dump_json() if event.location else None,
+                event.budget_per_person,
+                event.current_proposal_id,
+                int(event.consensus_reached),
+                json.dumps(event.pending_nudges),
+                event.created_at.isoformat(),
+                updated_at,
+            )
+            for event, updated_at in rows
+        ])
+
+        event_ids = [(event.id,) for event in events]
+        for table in ("event_participants", "event_proposals"):
+            await cursor.executemany(f"DELETE FROM {table} WHERE event_id = ?", event_ids)
+
+        await cursor.executemany("""
+            INSERT INTO event_participants (
+                event_id, user_id, position, user_name, agent_id, confirmed,
+                enthusiasm_level, constraints_shared, agent_responded, last_response_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                event.id,
+                p.user_id,
+                position,
+                p.user_name,
+                p.agent_id,
+                int(p.confirmed),
+                p.enthusiasm_level,
+                json.dumps(p.constraints_shared),
+                int(p.agent_responded),
+                _iso(p.last_response_at),
+            )
+            for event in events
+            for position, p in enumerate(event.participants)
+        ])
+
+        await cursor.executemany("""
+            INSERT INTO event_proposals (
+                id, event_id, position, proposer_agent_id, proposed_at, start_at, end_at,
+                location, activity_suggestion, estimated_cost_per_person, reasoning,
+                modifications_requested
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                proposal.id,
+                event.id,
+                position,
+                proposal.proposer_agent_id,
+                proposal.proposed_at.isoformat(),
+                _iso(proposal.date_range.start if proposal.date_range else None),
+                _iso(proposal.date_range.end if proposal.date_range else None),
+                proposal.location.model_dump_json() if proposal.location else None,
+                proposal.activity_suggestion,
+                proposal.estimated_cost_per_person,
+                proposal.reasoning,
+                json.dumps(proposal.modifications_requested),
+            )
+            for event in events
+            for position, proposal in enumerate(event.proposals)
+        ])
+
+        await self._append_event_log(cursor, events)
+
+    async def save_event_log(self, event: Event) -> None:
+        """Append an event's new notes and responses without rewriting it.
+
+        Costs one row per new log entry plus a touch of ``updated_at``,
+        however long the event's history already is.
+        """
+        now = datetime.utcnow().isoformat()
+        async with self.transaction(), self._connection.cursor() as cursor:
+            await self._append_event_log(cursor, [event])
+            await cursor.execute("UPDATE events SET updated_at = ? WHERE id = ?", (now, event.id))
+        self.cache.invalidate("event", event.id)
+
+    async def _append_event_log(self, cursor: aiosqlite.Cursor, events: List[Event]) -> None:
+        """Write unlogged notes and proposal responses to event_log.
+
+        Notes get their ``seq`` and responses are marked logged straight away,
+        so a second save in the same transaction does not repeat them; if the
+        transaction rolls back both are reset and the next save writes them.
+        A removed response is logged as a retraction, a NULL ``response``.
+        """
+        pending = [
+            (event, event.unlogged_notes(), [
+                (proposal, proposal.unlogged_responses()) for proposal in event.proposals
+            ])
+            for event in events
+        ]
+        pending = [
+            (event, notes, responses)
+            for event, notes, responses in pending
+            if notes or any(changed for _, changed in responses)
+        ]
+        if not pending:
+            return
+
+        last_seq: Dict[str, int] = {}
+        event_ids = [event.id for event, _, _ in pending]
+        for chunk_start in range(0, len(event_ids), _IN_CHUNK):
+            chunk = event_ids[chunk_start:chunk_start + _IN_CHUNK]
+            await cursor.execute(f"""
+                SELECT event_id, MAX(seq) FROM event_log
+                WHERE event_id IN ({",".join("?" * len(chunk))})
+                GROUP BY event_id
+            """, chunk)
+            last_seq.update(await cursor.fetchall())
+
+        now = datetime.utcnow().isoformat()
+        rows = []
+        for event, notes, responses in pending:
+            seq = last_seq.get(event.id, 0)
+            for note in notes:
+                seq += 1
+                note.seq = seq
+                rows.append((
+                    event.id, seq, "note", note.timestamp.isoformat(), note.agent_id,
+                    note.note_type, note.content, int(note.private), None, None,
+                ))
+            for proposal, changed in responses:
+                for agent_id, response in changed:
+                    seq += 1
+                    rows.append((event.id, seq, "response", now, agent_id, None, None, 1, proposal.id, response))
+                logged = proposal.mark_responses_logged()
+                if changed:
+                    self._on_rollback.append(
+                        lambda proposal=proposal, logged=logged: proposal.restore_logged_responses(logged)
+                    )
+            if notes:
+                self._on_rollback.append(lambda notes=notes: _reset_seq(notes))
+
+        await cursor.executemany("""
+            INSERT INTO event_log (
+                event_id, seq, kind, timestamp, agent_id, note_type, content, private,
+                proposal_id, response
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    async def _load_events(self, cursor: aiosqlite.Cursor, rows: List[tuple]) -> List[Event]:
+        """Build events from core rows, fetching child rows in batches.
+
+        The cache keeps each event's child rows under its ``updated_at``, so
+        events that have not changed are rebuilt without reading them again.
+        Rows are immutable, which spares copying on the way in or out.
+        """
+        children: Dict[str, _EventChildren] = {}
+        missing = []
+        for row in rows:
+            cached = self.cache.get("event", row[0], row[14])
+            if cached is not None:
+                children[row[0]] = cached
+            else:
+                missing.append(row)
+
+        event_ids = [row[0] for row in missing]
+        for event_id in event_ids:
+            children[event_id] = ([], [], [], [])
+        for chunk_start in range(0, len(event_ids), _IN_CHUNK):
+            chunk = event_ids[chunk_start:chunk_start + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            await cursor.execute(f"""
+                SELECT event_id, user_id, user_name, agent_id, confirmed, enthusiasm_level,
+                       constraints_shared, agent_responded, last_response_at
+                FROM event_participants WHERE event_id IN ({marks})
+                ORDER BY event_id, position
+            """, chunk)
+            for row in await cursor.fetchall():
+                children[row[0]][0].append(row)
+            await cursor.execute(f"""
+                SELECT proposal_id, agent_id, response, event_id
+                FROM event_log WHERE event_id IN ({marks}) AND kind = 'response'
+                ORDER BY event_id, seq
+            """, chunk)
+            for row in await cursor.fetchall():
+                children[row[3]][1].append(row)
+            await cursor.execute(f"""
+                SELECT event_id, id, proposer_agent_id, proposed_at, start_at, end_at, location,
+                       activity_suggestion, estimated_cost_per_person, reasoning, modifications_requested
+                FROM event_proposals WHERE event_id IN ({marks})
+                ORDER BY event_id, position
+            """, chunk)
+            for row in await cursor.fetchall():
+                children[row[0]][2].append(row)
+            # Each event's tail starts at its EVENT_NOTE_TAIL-th newest note,
+            # found once per event; the notes are then one index range each
+            await cursor.execute(f"""
+                SELECT l.seq, l.timestamp, l.agent_id, l.note_type, l.content, l.private, l.event_id
+                FROM events e
+                JOIN event_log l ON l.event_id = e.id AND l.kind = 'note' AND l.seq >= COALESCE((
+                    SELECT seq FROM event_log t WHERE t.event_id = e.id AND t.kind = 'note'
+                    ORDER BY seq DESC LIMIT 1 OFFSET ?
+                ), 0)
+                WHERE e.id IN ({marks})
+                ORDER BY e.id, l.seq
+            """, [EVENT_NOTE_TAIL - 1, *chunk])
+            for row in await cursor.fetchall():
+                children[row[6]][3].append(row)
+
+        for row in missing:
+            self.cache.put("event", row[0], row[14], children[row[0]])
+
+        locations: Dict[str, Location] = {}
+        with _gc_paused():
+            return [_build_event(row, children[row[0]], locations) for row in rows]
 
     async def get_event(self, event_id: str) -> Optional[Event]:
         """Get an event by ID."""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT data FROM events WHERE id = ?", (event_id,))
+        async with self._reader(snapshot=True) as conn, conn.cursor() as cursor:
+            await cursor.execute(f"SELECT {_EVENT_COLUMNS} FROM events WHERE id = ?", (event_id,))
             row = await cursor.fetchone()
             if row:
-                return Event.model_validate_json(row[0])
+                return (await self._load_events(cursor, [row]))[0]
         return None
 
+    async def get_events(self, event_ids: List[str]) -> List[Event]:
+        """Get several events by ID in one pass, in the given order.
+
+        IDs with no event, e.g. deleted since they were listed, are skipped.
+        """
+        rows: Dict[str, tuple] = {}
+        async with self._reader(snapshot=True) as conn, conn.cursor() as cursor:
+            for chunk_start in range(0, len(event_ids), _IN_CHUNK):
+                chunk = event_ids[chunk_start:chunk_start + _IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                await cursor.execute(f"SELECT {_EVENT_COLUMNS} FROM events WHERE id IN ({marks})", chunk)
+                for row in await cursor.fetchall():
+                    rows[row[0]] = row
+            return await self._load_events(cursor, [rows[event_id] for event_id in event_ids if event_id in rows])
+
     async def get_user_events(self, user_id: str, status: Optional[str] = None) -> List[Event]:
         """Get all events for a user (as creator or participant)."""
-        events = []
-        async with self._connection.cursor() as cursor:
-            query = """
-                SELECT DISTINCT e.data FROM events e
-                LEFT JOIN event_participants ep ON e.id = ep.event_id
-                WHERE e.creator_id = ? OR ep.user_id = ?
+        async with self._reader(snapshot=True) as conn, conn.cursor() as cursor:
+            query = f"""
+                SELECT {_EVENT_COLUMNS} FROM events
+                WHERE (creator_id = ? OR id IN (
+                    SELECT event_id FROM event_participants WHERE user_id = ?
+                ))
             """
             params = [user_id, user_id]
 
             if status:
-                query += " AND e.status = ?"
+                query += " AND status = ?"
                 params.append(status)
 
-            query += " ORDER BY e.updated_at DESC"
+            query += " ORDER BY updated_at DESC"
+
+            await cursor.execute(query, params)
+            rows = await cursor.fetchall()
+            return await self._load_events(cursor, rows)
+
+    async def get_event_notes(
+        self,
+        event_id: str,
+        before_seq: Optional[int] = None,
+        limit: int = EVENT_NOTE_TAIL,
+    ) -> List[AgentNote]:
+        """Page backwards through an event's agent notes, oldest first.
+
+        Pass the ``seq`` of the earliest note already loaded as ``before_seq``
+        to fetch the notes preceding it.
+        """
+        query = """
+            SELECT seq, timestamp, agent_id, note_type, content, private
+            FROM event_log WHERE event_id = ? AND kind = 'note'
+        """
+        params: list = [event_id]
+        if before_seq is not None:
+            query += " AND seq < ?"
+            params.append(before_seq)
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
 
+        async with self._reader() as conn, conn.cursor() as cursor:
             await cursor.execute(query, params)
             rows = await cursor.fetchall()
+        return [_agent_note(row) for row in reversed(rows)]
+
+    async def get_event_by_title(self, user_id: str, title: str) -> Optional[Event]:
+        """Get the user's most recently updated event with this exact title, ignoring case.
+
+        Matches on ``str.lower()``, so non-ASCII titles match regardless of
+        case too.
+        """
+        async with self._reader(snapshot=True) as conn, conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT {_EVENT_COLUMNS} FROM events
+                WHERE title_key = ?
+                AND (creator_id = ? OR id IN (
+                    SELECT event_id FROM event_participants WHERE user_id = ?
+                ))
+                ORDER BY updated_at DESC LIMIT 1
+            """, (title.lower(), user_id, user_id))
+            row = await cursor.fetchone()
+            if row:
+                return (await self._load_events(cursor, [row]))[0]
+        return None
+
+    async def find_events(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        user_id: Optional[str] = None,
+    ) -> List[Event]:
+        """Search events by title, description and public agent notes.
+
+        Every word in ``query`` must match, as a prefix, somewhere in the
+        event. Results are ordered by most recently updated.
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+
+        sql = f"""
+            SELECT {_EVENT_COLUMNS} FROM events
+            WHERE rowid IN (
+                SELECT rowid FROM events_fts WHERE events_fts MATCH ?
+                UNION
+                SELECT e.rowid FROM event_log_fts
+                JOIN event_log l ON l.rowid = event_log_fts.rowid
+                JOIN events e ON e.id = l.event_id
+                WHERE event_log_fts MATCH ?
+            )
+        """
+        params: list = [match, match]
+
+        if user_id:
+            sql += """
+                AND (creator_id = ? OR id IN (
+                    SELECT event_id FROM event_participants WHERE user_id = ?
+                ))
+            """
+            params.extend([user_id, user_id])
+
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        params.append(limit)
+
+        async with self._reader(snapshot=True) as conn, conn.cursor() as cursor:
+            await cursor.execute(sql, params)
+            rows = await cursor.fetchall()
+            return await self._load_events(cursor, rows)
+
+    async def iter_event_summaries(
+        self,
+        user_id: str,
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        """Iterate ``Event.get_summary()`` dicts for a user's events.
+
+        Summaries are built from SQL columns alone, without loading proposals
+        or notes, and are fetched with keyset pagination on
+        ``(updated_at, id)``, most recently updated first. Each summary also
+        carries a ``cursor``; pass the last one seen as ``after`` to resume.
+        The cursor holds the position itself, so resuming works even if that
+        event has since been updated, archived or deleted.
+        """
+        position = _parse_summary_cursor(after) if after is not None else None
+
+        while True:
+            query, params = _summary_page_query(user_id, status, position, page_size)
+            async with self._reader() as conn, conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
+
             for row in rows:
-                events.append(Event.model_validate_json(row[0]))
-        return events
+                yield {
+                    "id": row[0],
+                    "title": row[1],
+                    "type": row[2],
+                    "status": row[3],
+                    "participants": [name for _, name in sorted(json.loads(row[8]))],
+                    "date": datetime.fromisoformat(row[4]).strftime("%b %d, %Y") if row[4] else "TBD",
+                    "location": row[5] or "TBD",
+                    "consensus": bool(row[6]),
+                    "cursor": _summary_cursor(row[7], row[0]),
+                }
+
+            if len(rows) < page_size:
+                return
+            position = (rows[-1][7], rows[-1][0])
 
     async def get_active_events(self, user_id: str) -> List[Event]:
         """Get all active (planning/proposed/confirmed) events."""
@@ -253,29 +1038,169 @@ class Database:
 
     async def delete_event(self, event_id: str) -> None:
         """Delete an event."""
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
+            for table in ("event_participants", "event_proposals", "event_log"):
+                await cursor.execute(f"DELETE FROM {table} WHERE event_id = ?", (event_id,))
             await cursor.execute("DELETE FROM events WHERE id = ?", (event_id,))
-            await cursor.execute("DELETE FROM event_participants WHERE event_id = ?", (event_id,))
+        self.cache.invalidate("event", event_id)
+
+    # Archive operations
+    async def archive_events(self, older_than_days: int, now: Optional[datetime] = None) -> int:
+        """Move finished events not updated for ``older_than_days`` to the archive.
+
+        Completed and cancelled events are written to ``events_archive`` as
+        compressed snapshots with their full note history, then removed from
+        the live tables. Returns the number of events archived.
+        """
+        cutoff = ((now or datetime.utcnow()) - timedelta(days=older_than_days)).isoformat()
+        archived_at = datetime.utcnow().isoformat()
+        archived_ids: List[str] = []
+
+        async with self.transaction(), self._connection.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT {_EVENT_COLUMNS} FROM events
+                WHERE status IN (?, ?) AND updated_at < ?
+            """, (*ARCHIVABLE_STATUSES, cutoff))
+            rows = await cursor.fetchall()
+
+            for chunk_start in range(0, len(rows), _IN_CHUNK):
+                chunk = rows[chunk_start:chunk_start + _IN_CHUNK]
+                events = await self._load_events(cursor, chunk)
+                event_ids = [event.id for event in events]
+                marks = ",".join("?" * len(event_ids))
+
+                # The live load only carries the note tail; archive everything
+                await cursor.execute(f"""
+                    SELECT event_id, seq, timestamp, agent_id, note_type, content, private
+                    FROM event_log WHERE event_id IN ({marks}) AND kind = 'note'
+                    ORDER BY event_id, seq
+                """, event_ids)
+                notes: Dict[str, List[AgentNote]] = {}
+                for row in await cursor.fetchall():
+                    notes.setdefault(row[0], []).append(_agent_note(row[1:]))
+
+                await cursor.executemany("""
+                    INSERT OR REPLACE INTO events_archive (
+                        id, creator_id, title, event_type, status, participant_ids,
+                        updated_at, archived_at, payload, format
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        event.id,
+                        event.creator_id,
+                        event.title,
+                        event.event_type.value,
+                        event.status.value,
+                        json.dumps([p.user_id for p in event.participants]),
+                        row[14],
+                        archived_at,
+                        zlib.compress(
+                            self._encode_bytes(
+                                event.model_copy(update={"agent_notes": notes.get(event.id, [])})
+                            ),
+                            ARCHIVE_COMPRESSION_LEVEL,
+                        ),
+                        self.codec.name,
+                    )
+                    for event, row in zip(events, chunk)
+                ])
+
+                for table in ("event_participants", "event_proposals", "event_log", "events"):
+                    column = "id" if table == "events" else "event_id"
+                    await cursor.execute(
+                        f"DELETE FROM {table} WHERE {column} IN ({marks})", event_ids
+                    )
+                archived_ids.extend(event_ids)
+
+        for event_id in archived_ids:
+            self.cache.invalidate("event", event_id)
+        return len(archived_ids)
+
+    async def get_archived_event(self, event_id: str) -> Optional[Event]:
+        """Decompress an archived event.
+
+        The result is a read-only snapshot: saving it again would put it
+        back in the live tables without its note history.
+        """
+        async with self._reader() as conn, conn.cursor() as cursor:
+            await cursor.execute("SELECT payload, format FROM events_archive WHERE id = ?", (event_id,))
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        return get_codec(row[1]).decode(Event, zlib.decompress(row[0]))
+
+    async def get_archived_events(self, user_id: str, limit: int = 20) -> List[Event]:
+        """Most recently updated archived events a user created or joined."""
+        async with self._reader() as conn, conn.cursor() as cursor:
+            await cursor.execute("""
+                SELECT payload, format FROM events_archive
+                WHERE creator_id = ?
+                   OR EXISTS (SELECT 1 FROM json_each(participant_ids) WHERE value = ?)
+                ORDER BY updated_at DESC
+                LIMIT ?
+            """, (user_id, user_id, limit))
+            rows = await cursor.fetchall()
+        return [get_codec(fmt).decode(Event, zlib.decompress(payload)) for payload, fmt in rows]
+
+    async def compact(self, older_than_days: Optional[int] = None) -> Dict[str, int]:
+        """Archive finished events, then return freed pages to the filesystem.
+
+        Databases created before incremental auto-vacuum was enabled get one
+        full VACUUM to convert them; after that only the free pages are
+        released. VACUUM cannot run inside a transaction, so calling this
+        from within ``transaction()`` raises ``RuntimeError``.
+        """
+        if self._in_transaction():
+            raise RuntimeError("compact() cannot run inside a transaction")
+        if older_than_days is None:
+            older_than_days = self.config.archive_after_days
+        archived = await self.archive_events(older_than_days)
+
+        async with self._write_lock:
+            async with self._connection.execute("PRAGMA page_count") as cursor:
+                pages_before = (await cursor.fetchone())[0]
+            async with self._connection.execute("PRAGMA auto_vacuum") as cursor:
+                incremental = (await cursor.fetchone())[0] == 2
+
+            if incremental:
+                # A single step frees only one page; executescript runs the
+                # pragma to completion
+                await self._connection.executescript("PRAGMA incremental_vacuum")
+            else:
+                await self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                await self._connection.execute("VACUUM")
             await self._connection.commit()
+            if self.config.journal_mode == "wal":
+                await self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            async with self._connection.execute("PRAGMA page_count") as cursor:
+                pages_after = (await cursor.fetchone())[0]
+
+        return {
+            "archived": archived,
+            "pages_before": pages_before,
+            "pages_after": pages_after,
+        }
 
     # Schedule operations
     async def save_schedule(self, schedule: Schedule) -> None:
         """Save or update a user's schedule."""
         now = datetime.utcnow().isoformat()
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
             await cursor.execute("""
-                INSERT OR REPLACE INTO schedules (user_id, data, updated_at)
-                VALUES (?, ?, ?)
-            """, (schedule.user_id, schedule.model_dump_json(), now))
-            await self._connection.commit()
+                INSERT OR REPLACE INTO schedules (user_id, data, format, updated_at)
+                VALUES (?, ?, ?, ?)
+            """, (schedule.user_id, self.codec.encode(schedule), self.codec.name, now))
+        self.cache.invalidate("schedule", schedule.user_id)
 
     async def get_schedule(self, user_id: str) -> Optional[Schedule]:
         """Get a user's schedule."""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT data FROM schedules WHERE user_id = ?", (user_id,))
+        async with self._reader() as conn, conn.cursor() as cursor:
+            await cursor.execute("SELECT updated_at, data, format FROM schedules WHERE user_id = ?", (user_id,))
             row = await cursor.fetchone()
             if row:
-                return Schedule.model_validate_json(row[0])
+                return self._decode(Schedule, "schedule", user_id, *row)
         return None
 
 
@@ -287,7 +1212,7 @@ async def get_db() -> Database:
     """Get the database singleton."""
     global _db
     if _db is None:
-        _db = Database()
+        _db = Database(config=get_settings().database)
         await _db.connect()
     return _db
 
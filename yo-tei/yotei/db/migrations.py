@@ -0,0 +1,440 @@
+"""Schema migrations for the Yo-tei local database.
+
+The schema version lives in SQLite's ``user_version`` pragma. ``migrate``
+applies every migration newer than the stored version inside one
+transaction, so a connect against an up-to-date database runs no DDL at all.
+"""
+
+from typing import TYPE_CHECKING, Awaitable, Callable, List, Tuple
+
+import aiosqlite
+
+if TYPE_CHECKING:
+    from .local import Database
+
+
+# Indexes backing the per-user and per-status event queries
+EVENT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_events_creator ON events(creator_id)",
+    "CREATE INDEX IF NOT EXISTS idx_events_status ON events(status)",
+    "CREATE INDEX IF NOT EXISTS idx_events_updated_id ON events(updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_events_title ON events(title_key)",
+    "CREATE INDEX IF NOT EXISTS idx_event_participants_user ON event_participants(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_event_proposals_event ON event_proposals(event_id)",
+    "CREATE INDEX IF NOT EXISTS idx_event_log_kind ON event_log(event_id, kind, seq)",
+]
+
+# Indexes returning each event's child rows in the order events are built
+# from them, so loads need no sort; the event_log one also covers the columns
+# of response rows, which are then read from the index alone
+LOAD_ORDER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_event_participants_event ON event_participants(event_id, position)",
+    "CREATE INDEX IF NOT EXISTS idx_event_proposals_event ON event_proposals(event_id, position)",
+    """
+    CREATE INDEX IF NOT EXISTS idx_event_log_kind
+    ON event_log(event_id, kind, seq, proposal_id, agent_id, response)
+    """,
+]
+
+# Full-text search over event titles/descriptions and public agent notes.
+# Both are external-content FTS5 tables kept in sync by triggers; private
+# notes are never indexed.
+SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        title, description, content='events', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF title, description ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO events_fts(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS event_log_fts USING fts5(
+        content, content='event_log', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_log_fts_insert AFTER INSERT ON event_log
+    WHEN new.kind = 'note' AND new.private = 0 BEGIN
+        INSERT INTO event_log_fts(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_log_fts_delete AFTER DELETE ON event_log
+    WHEN old.kind = 'note' AND old.private = 0 BEGIN
+        INSERT INTO event_log_fts(event_log_fts, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+    END
+    """,
+]
+
+
+async def _baseline(db: "Database", cursor: aiosqlite.Cursor) -> None:
+    """Create the full schema, adopting databases from unversioned builds.
+
+    Databases written before versioning have ``user_version`` 0 just like
+    new ones. Their events are unpacked into the normalized tables and their
+    document tables gain a ``format`` column.
+    """
+    legacy = await _set_aside_legacy_events(cursor)
+
+    # Users table
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            format TEXT NOT NULL DEFAULT 'json',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+    # Friends table
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS friends (
+            user_id TEXT NOT NULL,
+            friend_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            format TEXT NOT NULL DEFAULT 'json',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (user_id, friend_id)
+        )
+    """)
+
+    # Events table (core columns only, children live in their own tables)
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id TEXT PRIMARY KEY,
+            creator_id TEXT NOT NULL,
+            title TEXT NOT NULL,
+            title_key TEXT NOT NULL DEFAULT '',
+            description TEXT NOT NULL DEFAULT '',
+            event_type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            start_at TEXT,
+            end_at TEXT,
+            location TEXT,
+            budget_per_person REAL,
+            current_proposal_id TEXT,
+            consensus_reached INTEGER NOT NULL DEFAULT 0,
+            pending_nudges TEXT NOT NULL DEFAULT '{}',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+    # Event participants
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_participants (
+            event_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            user_name TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            confirmed INTEGER NOT NULL DEFAULT 0,
+            enthusiasm_level INTEGER NOT NULL DEFAULT 3,
+            constraints_shared TEXT NOT NULL DEFAULT '[]',
+            agent_responded INTEGER NOT NULL DEFAULT 0,
+            last_response_at TEXT,
+            PRIMARY KEY (event_id, user_id),
+            FOREIGN KEY (event_id) REFERENCES events(id)
+        )
+    """)
+
+    # Event proposals
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_proposals (
+            id TEXT PRIMARY KEY,
+            event_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            proposer_agent_id TEXT NOT NULL,
+            proposed_at TEXT NOT NULL,
+            start_at TEXT,
+            end_at TEXT,
+            location TEXT,
+            activity_suggestion TEXT NOT NULL DEFAULT '',
+            estimated_cost_per_person REAL,
+            reasoning TEXT NOT NULL DEFAULT '',
+            modifications_requested TEXT NOT NULL DEFAULT '[]',
+            FOREIGN KEY (event_id) REFERENCES events(id)
+        )
+    """)
+
+    # Append-only event log: agent notes and proposal responses
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_log (
+            event_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            note_type TEXT,
+            content TEXT,
+            private INTEGER NOT NULL DEFAULT 1,
+            proposal_id TEXT,
+            response TEXT,
+            PRIMARY KEY (event_id, seq),
+            FOREIGN KEY (event_id) REFERENCES events(id)
+        )
+    """)
+
+    # Cold tier for finished events: a few columns to find each one by, plus
+    # the whole event (full note history included) as compressed JSON
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events_archive (
+            id TEXT PRIMARY KEY,
+            creator_id TEXT NOT NULL,
+            title TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            participant_ids TEXT NOT NULL DEFAULT '[]',
+            updated_at TEXT NOT NULL,
+            archived_at TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            format TEXT NOT NULL DEFAULT 'json'
+        )
+    """)
+    await cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_events_archive_creator ON events_archive(creator_id, updated_at)"
+    )
+
+    # Schedules table
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schedules (
+            user_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            format TEXT NOT NULL DEFAULT 'json',
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+    # Group dynamics table
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS group_dynamics (
+            user_id TEXT NOT NULL,
+            group_key TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (user_id, group_key)
+        )
+    """)
+
+    # Tables kept from an unversioned build predate the format tag; every
+    # row they hold is pydantic JSON
+    for table in ("users", "friends", "schedules"):
+        await cursor.execute(f"PRAGMA table_info({table})")
+        if "format" not in {row[1] for row in await cursor.fetchall()}:
+            await cursor.execute(f"ALTER TABLE {table} ADD COLUMN format TEXT NOT NULL DEFAULT 'json'")
+
+    if legacy:
+        await _unpack_legacy_events(cursor)
+        # SQLite's lower() only folds ASCII, so title keys are made in Python
+        await cursor.execute("SELECT id, title FROM events")
+        await cursor.executemany(
+            "UPDATE events SET title_key = ? WHERE id = ?",
+            [(title.lower(), event_id) for event_id, title in await cursor.fetchall()],
+        )
+
+    for statement in EVENT_INDEXES:
+        await cursor.execute(statement)
+
+    await _create_search_index(cursor)
+
+
+async def _create_search_index(cursor: aiosqlite.Cursor) -> None:
+    """Create the FTS5 tables and backfill them for existing rows."""
+    await cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('events_fts', 'event_log_fts')"
+    )
+    existing = {row[0] for row in await cursor.fetchall()}
+
+    for statement in SEARCH_INDEX:
+        await cursor.execute(statement)
+
+    if "events_fts" not in existing:
+        await cursor.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+    if "event_log_fts" not in existing:
+        await cursor.execute("""
+            INSERT INTO event_log_fts(rowid, content)
+            SELECT rowid, content FROM event_log WHERE kind = 'note' AND private = 0
+        """)
+
+
+async def _set_aside_legacy_events(cursor: aiosqlite.Cursor) -> bool:
+    """Rename events stored in the unversioned layout out of the way.
+
+    Unversioned builds kept each event as a single JSON ``data`` blob plus a
+    bare ``event_participants(event_id, user_id)`` table. The blobs move to
+    ``legacy_events`` so the normalized tables can take their names.
+    """
+    await cursor.execute("PRAGMA table_info(events)")
+    if "data" not in {row[1] for row in await cursor.fetchall()}:
+        return False
+
+    await cursor.execute("DROP TABLE IF EXISTS event_participants")
+    await cursor.execute("ALTER TABLE events RENAME TO legacy_events")
+    return True
+
+
+async def _unpack_legacy_events(cursor: aiosqlite.Cursor) -> None:
+    """Rewrite ``legacy_events`` blobs into the normalized tables, then drop it.
+
+    Done in SQL with SQLite's JSON functions, so the migration does not
+    depend on the current models. Notes are numbered in list order and
+    responses follow them in proposal order.
+    """
+    await cursor.execute("""
+        INSERT INTO events (
+            id, creator_id, title, description, event_type, status,
+            start_at, end_at, location, budget_per_person,
+            current_proposal_id, consensus_reached, pending_nudges,
+            created_at, updated_at
+        )
+        SELECT id, creator_id,
+               json_extract(data, '$.title'),
+               COALESCE(json_extract(data, '$.description'), ''),
+               COALESCE(json_extract(data, '$.event_type'), 'hangout'),
+               status,
+               json_extract(data, '$.date_range.start'),
+               json_extract(data, '$.date_range.end'),
+               json_extract(data, '$.location'),
+               json_extract(data, '$.budget_per_person'),
+               json_extract(data, '$.current_proposal_id'),
+               COALESCE(json_extract(data, '$.consensus_reached'), 0),
+               COALESCE(json_extract(data, '$.pending_nudges'), '{}'),
+               created_at, updated_at
+        FROM legacy_events
+    """)
+    await cursor.execute("""
+        INSERT INTO event_participants (
+            event_id, user_id, position, user_name, agent_id, confirmed,
+            enthusiasm_level, constraints_shared, agent_responded, last_response_at
+        )
+        SELECT e.id,
+               json_extract(p.value, '$.user_id'),
+               p.key,
+               json_extract(p.value, '$.user_name'),
+               json_extract(p.value, '$.agent_id'),
+               COALESCE(json_extract(p.value, '$.confirmed'), 0),
+               COALESCE(json_extract(p.value, '$.enthusiasm_level'), 3),
+               COALESCE(json_extract(p.value, '$.constraints_shared'), '[]'),
+               COALESCE(json_extract(p.value, '$.agent_responded'), 0),
+               json_extract(p.value, '$.last_response_at')
+        FROM legacy_events e, json_each(e.data, '$.participants') p
+    """)
+    await cursor.execute("""
+        INSERT INTO event_proposals (
+            id, event_id, position, proposer_agent_id, proposed_at, start_at, end_at,
+            location, activity_suggestion, estimated_cost_per_person, reasoning,
+            modifications_requested
+        )
+        SELECT json_extract(p.value, '$.id'),
+               e.id,
+               p.key,
+               json_extract(p.value, '$.proposer_agent_id'),
+               json_extract(p.value, '$.proposed_at'),
+               json_extract(p.value, '$.date_range.start'),
+               json_extract(p.value, '$.date_range.end'),
+               json_extract(p.value, '$.location'),
+               COALESCE(json_extract(p.value, '$.activity_suggestion'), ''),
+               json_extract(p.value, '$.estimated_cost_per_person'),
+               COALESCE(json_extract(p.value, '$.reasoning'), ''),
+               COALESCE(json_extract(p.value, '$.modifications_requested'), '[]')
+        FROM legacy_events e, json_each(e.data, '$.proposals') p
+    """)
+    await cursor.execute("""
+        INSERT INTO event_log (event_id, seq, kind, timestamp, agent_id, note_type, content, private)
+        SELECT e.id,
+               n.key + 1,
+               'note',
+               json_extract(n.value, '$.timestamp'),
+               json_extract(n.value, '$.agent_id'),
+               json_extract(n.value, '$.note_type'),
+               json_extract(n.value, '$.content'),
+               COALESCE(json_extract(n.value, '$.private'), 1)
+        FROM legacy_events e, json_each(e.data, '$.agent_notes') n
+    """)
+    await cursor.execute("""
+        INSERT INTO event_log (event_id, seq, kind, timestamp, agent_id, private, proposal_id, response)
+        SELECT e.id,
+               COALESCE(json_array_length(e.data, '$.agent_notes'), 0)
+               + ROW_NUMBER() OVER (PARTITION BY e.id ORDER BY p.key, r.id),
+               'response',
+               json_extract(p.value, '$.proposed_at'),
+               r.key,
+               1,
+               json_extract(p.value, '$.id'),
+               r.value
+        FROM legacy_events e,
+             json_each(e.data, '$.proposals') p,
+             json_each(p.value, '$.responses') r
+    """)
+    await cursor.execute("DROP TABLE legacy_events")
+
+
+async def _index_load_order(db: "Database", cursor: aiosqlite.Cursor) -> None:
+    """Replace the child-row indexes with ones in event load order."""
+    await cursor.execute("DROP INDEX IF EXISTS idx_event_proposals_event")
+    await cursor.execute("DROP INDEX IF EXISTS idx_event_log_kind")
+    for statement in LOAD_ORDER_INDEXES:
+        await cursor.execute(statement)
+
+
+# Ordered (version, description, migration). Append only: released
+# migrations must never be edited or reordered.
+MIGRATIONS: List[Tuple[int, str, Callable[["Database", aiosqlite.Cursor], Awaitable[None]]]] = [
+    (1, "baseline schema", _baseline),
+    (2, "child-row indexes in load order", _index_load_order),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_schema_version(connection: aiosqlite.Connection) -> int:
+    """Read the schema version stored in the database file."""
+    async with connection.execute("PRAGMA user_version") as cursor:
+        row = await cursor.fetchone()
+    return row[0]
+
+
+async def migrate(db: "Database", connection: aiosqlite.Connection) -> int:
+    """Bring the schema up to ``SCHEMA_VERSION`` and return the old version."""
+    current = await get_schema_version(connection)
+    if current == SCHEMA_VERSION:
+        return current
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this build supports ({SCHEMA_VERSION})"
+        )
+
+    async with connection.cursor() as cursor:
+        # DDL does not open an implicit transaction, so start one explicitly
+        # to make the whole upgrade all-or-nothing
+        await cursor.execute("BEGIN")
+        try:
+            for version, _, apply in MIGRATIONS:
+                if version > current:
+                    await apply(db, cursor)
+            await cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except BaseException:
+            await connection.rollback()
+            raise
+    await connection.commit()
+    return current
@@ -4,6 +4,7 @@ from .user import User, AvailabilityBlock, BudgetRange
 from .friend import FriendRelationship, GroupDynamic
 from .event import Event, Proposal, EventStatus, EventType
 from .schedule import Schedule, TimeSlot
+from .intervals import IntervalSet
 
 __all__ = [
     "User",
@@ -17,4 +18,5 @@ __all__ = [
     "EventType",
     "Schedule",
     "TimeSlot",
+    "IntervalSet",
 ]
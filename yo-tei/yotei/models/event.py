@@ -2,8 +2,8 @@
 
 from datetime import datetime, date
 from enum import Enum
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 import shortuuid
 
 
@@ -66,10 +66,40 @@ class Proposal(BaseModel):
     responses: Dict[str, str] = Field(default_factory=dict)  # agent_id -> "accept"/"modify"/"decline"
     modifications_requested: List[str] = Field(default_factory=list)
 
+    # Responses already written to the event log (agent_id -> decision)
+    _logged_responses: Dict[str, str] = PrivateAttr(default_factory=dict)
+
     @property
     def is_unanimous(self) -> bool:
         return all(r == "accept" for r in self.responses.values())
 
+    def unlogged_responses(self) -> List[Tuple[str, Optional[str]]]:
+        """Responses added, changed or removed since the proposal was last persisted.
+
+        A removed response is reported as ``None``.
+        """
+        changed: List[Tuple[str, Optional[str]]] = [
+            (agent_id, response)
+            for agent_id, response in self.responses.items()
+            if self._logged_responses.get(agent_id) != response
+        ]
+        changed.extend(
+            (agent_id, None) for agent_id in self._logged_responses if agent_id not in self.responses
+        )
+        return changed
+
+    def mark_responses_logged(self) -> Dict[str, str]:
+        """Record that all current responses are in the event log.
+
+        Returns what was recorded before, for ``restore_logged_responses``.
+        """
+        previous, self._logged_responses = self._logged_responses, dict(self.responses)
+        return previous
+
+    def restore_logged_responses(self, logged: Dict[str, str]):
+        """Go back to an earlier record of logged responses, e.g. after a rollback."""
+        self._logged_responses = logged
+
 
 class AgentNote(BaseModel):
     """A note from agent coordination (for debugging/transparency)."""
@@ -79,6 +109,7 @@ class AgentNote(BaseModel):
     note_type: str  # "negotiation", "concern", "suggestion", "decision"
     content: str
     private: bool = True  # If true, only visible to this user
+    seq: Optional[int] = None  # Position in the event log, set once persisted
 
 
 class ParticipantStatus(BaseModel):
@@ -128,7 +159,8 @@ class Event(BaseModel):
     current_proposal_id: Optional[str] = None
     consensus_reached: bool = False
 
-    # Agent activity log
+    # Agent activity log (events loaded from the database carry only the
+    # most recent notes; older ones are paged in via Database.get_event_notes)
     agent_notes: List[AgentNote] = Field(default_factory=list)
 
     # Nudges
@@ -165,6 +197,10 @@ class Event(BaseModel):
         )
         self.updated_at = datetime.utcnow()
 
+    def unlogged_notes(self) -> List[AgentNote]:
+        """Notes added since the event was last persisted."""
+        return [note for note in self.agent_notes if note.seq is None]
+
     def check_consensus(self) -> bool:
         """Check if all participants have confirmed."""
         if not self.current_proposal_id:
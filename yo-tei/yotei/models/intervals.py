@@ -0,0 +1,109 @@
+"""Interval-set algebra for schedules."""
+
+from bisect import bisect_right
+from heapq import merge
+from typing import Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")  # Any totally ordered value: datetimes, epoch minutes, ...
+
+
+class IntervalSet(Generic[T]):
+    """A set of half-open ``[start, end)`` intervals.
+
+    Intervals are kept sorted, non-empty and disjoint, with touching
+    intervals coalesced, so union, intersection and subtraction are single
+    linear passes over both operands.
+    """
+
+    __slots__ = ("_intervals",)
+
+    def __init__(self, intervals: Iterable[Tuple[T, T]] = (), normalized: bool = False):
+        if normalized:
+            self._intervals: List[Tuple[T, T]] = list(intervals)
+        else:
+            self._intervals = _coalesce(sorted(iv for iv in intervals if iv[0] < iv[1]))
+
+    def __iter__(self) -> Iterator[Tuple[T, T]]:
+        return iter(self._intervals)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self._intervals)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._intervals == other._intervals
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self._intervals!r})"
+
+    def union(self, other: "IntervalSet[T]") -> "IntervalSet[T]":
+        """Every point in either set."""
+        return IntervalSet(_coalesce(merge(self._intervals, other._intervals)), normalized=True)
+
+    def intersect(self, other: "IntervalSet[T]") -> "IntervalSet[T]":
+        """Every point in both sets."""
+        a, b = self._intervals, other._intervals
+        result = []
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i][0], b[j][0])
+            end = min(a[i][1], b[j][1])
+            if start < end:
+                result.append((start, end))
+            # Advance whichever interval finishes first
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet(result, normalized=True)
+
+    def subtract(self, other: "IntervalSet[T]") -> "IntervalSet[T]":
+        """Every point in this set that is not in ``other``."""
+        cuts = other._intervals
+        result = []
+        j = 0
+        for start, end in self._intervals:
+            # Skip cuts that finish before this interval starts
+            while j < len(cuts) and cuts[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(cuts) and cuts[k][0] < end:
+                if cuts[k][0] > start:
+                    result.append((start, cuts[k][0]))
+                start = max(start, cuts[k][1])
+                k += 1
+            if start < end:
+                result.append((start, end))
+        return IntervalSet(result, normalized=True)
+
+    __or__ = union
+    __and__ = intersect
+    __sub__ = subtract
+
+    def covers(self, start: T, end: T) -> bool:
+        """Whether ``[start, end)`` lies entirely inside one interval."""
+        i = bisect_right(self._intervals, start, key=lambda iv: iv[0]) - 1
+        return i >= 0 and self._intervals[i][1] >= end
+
+    def at_least(self, min_length) -> "IntervalSet[T]":
+        """Only the intervals at least ``min_length`` long."""
+        return IntervalSet(
+            [(start, end) for start, end in self._intervals if end - start >= min_length],
+            normalized=True,
+        )
+
+
+def _coalesce(intervals: Iterable[Tuple[T, T]]) -> List[Tuple[T, T]]:
+    """Merge sorted intervals that overlap or touch."""
+    result: List[Tuple[T, T]] = []
+    for start, end in intervals:
+        if result and start <= result[-1][1]:
+            if end > result[-1][1]:
+                result[-1] = (result[-1][0], end)
+        else:
+            result.append((start, end))
+    return result
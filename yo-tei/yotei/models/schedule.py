@@ -1,9 +1,44 @@
 """Schedule model for Yo-tei."""
 
-from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict
-from pydantic import BaseModel, Field
+import math
+from datetime import datetime, date, timedelta, timezone, tzinfo
+from typing import Iterable, Iterator, Optional, List, Dict, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from .user import AvailabilityBlock, BlackoutDate
+from .intervals import IntervalSet
+
+ONE_DAY = timedelta(days=1)
+ONE_MINUTE = timedelta(minutes=1)
+
+# Scheduling internals count minutes from this instant: UTC inside compiled
+# schedules, the organizer's wall-clock time in slots
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+_EPOCH_WEEKDAY = EPOCH.weekday()
+
+
+def to_minutes(moment: datetime, round_up: bool = False) -> int:
+    """Minutes since ``EPOCH``; seconds are dropped, or rounded up."""
+    minutes, rest = divmod(moment - EPOCH, ONE_MINUTE)
+    return minutes + 1 if round_up and rest else minutes
+
+
+def from_minutes(minutes: int) -> datetime:
+    """Inverse of ``to_minutes``."""
+    return EPOCH + minutes * ONE_MINUTE
+
+
+def day_minutes(target_date: date) -> int:
+    """Minutes since ``EPOCH`` at the start of a date."""
+    return (target_date - EPOCH.date()).days * MINUTES_PER_DAY
+
+
+def _wall_clock(moment: datetime, zone: Optional[tzinfo]) -> datetime:
+    """A naive datetime as is; an aware one as naive wall-clock time in ``zone`` (UTC by default)."""
+    if moment.utcoffset() is None:
+        return moment
+    return moment.astimezone(zone or timezone.utc).replace(tzinfo=None)
 
 
 class TimeSlot(BaseModel):
@@ -37,6 +72,116 @@ class TimeSlot(BaseModel):
         }
 
 
+class MinuteSlot:
+    """Compact slot used inside the scheduling engines.
+
+    Holds two ints (minutes since ``EPOCH``) instead of a validated model,
+    so building, comparing and ranking thousands of them stays cheap. Reads
+    like a ``TimeSlot``; call ``to_timeslot()`` where a model is needed.
+    """
+
+    __slots__ = ("start_min", "end_min")
+
+    def __init__(self, start_min: int, end_min: int):
+        self.start_min = start_min
+        self.end_min = end_min
+
+    @classmethod
+    def coerce(cls, slot, zone: Optional[tzinfo] = None) -> "MinuteSlot":
+        """Accept a ``MinuteSlot`` or anything with datetime ``start``/``end``.
+
+        Naive datetimes are taken as wall-clock time already. Aware ones are
+        converted to ``zone``'s wall-clock time, or to UTC without a zone.
+        """
+        if isinstance(slot, cls):
+            return slot
+        return cls(
+            to_minutes(_wall_clock(slot.start, zone)),
+            to_minutes(_wall_clock(slot.end, zone), round_up=True),
+        )
+
+    @property
+    def start(self) -> datetime:
+        return from_minutes(self.start_min)
+
+    @property
+    def end(self) -> datetime:
+        return from_minutes(self.end_min)
+
+    @property
+    def duration_minutes(self) -> int:
+        return self.end_min - self.start_min
+
+    @property
+    def duration_hours(self) -> float:
+        return (self.end_min - self.start_min) / 60
+
+    @property
+    def hour(self) -> int:
+        """Hour of day the slot starts in."""
+        return self.start_min % MINUTES_PER_DAY // 60
+
+    @property
+    def weekday(self) -> int:
+        """Day of week the slot starts on, 0=Monday."""
+        return (self.start_min // MINUTES_PER_DAY + _EPOCH_WEEKDAY) % 7
+
+    def overlaps(self, other: "MinuteSlot") -> bool:
+        """Check if this slot overlaps with another."""
+        return self.start_min < other.end_min and other.start_min < self.end_min
+
+    def contains(self, dt: datetime) -> bool:
+        """Check if a datetime falls within this slot."""
+        return self.start_min <= to_minutes(dt) < self.end_min
+
+    def to_timeslot(self) -> TimeSlot:
+        return TimeSlot(start=self.start, end=self.end)
+
+    def to_shareable(self) -> dict:
+        """Return shareable representation (no private details)."""
+        return self.to_timeslot().to_shareable()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MinuteSlot):
+            return NotImplemented
+        return self.start_min == other.start_min and self.end_min == other.end_min
+
+    def __hash__(self) -> int:
+        return hash((self.start_min, self.end_min))
+
+    def __repr__(self) -> str:
+        return f"MinuteSlot({self.start.isoformat()}, {self.end.isoformat()})"
+
+
+class QuorumSlot(MinuteSlot):
+    """A slot most participants can make, naming those who can't."""
+
+    __slots__ = ("missing",)
+
+    def __init__(self, start_min: int, end_min: int, missing: Tuple[str, ...]):
+        super().__init__(start_min, end_min)
+        self.missing = missing
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QuorumSlot):
+            return NotImplemented
+        return super().__eq__(other) and self.missing == other.missing
+
+    def __hash__(self) -> int:
+        return hash((self.start_min, self.end_min, self.missing))
+
+    def __repr__(self) -> str:
+        return f"QuorumSlot({self.start.isoformat()}, {self.end.isoformat()}, missing={list(self.missing)})"
+
+
+def _minute_intervals(slots: List[TimeSlot], inward: bool, to_utc) -> IntervalSet:
+    """Wall-clock slots as an interval set of UTC minutes, rounded inwards or outwards."""
+    return IntervalSet(
+        (to_utc(to_minutes(slot.start, round_up=inward)), to_utc(to_minutes(slot.end, round_up=not inward)))
+        for slot in slots
+    )
+
+
 class DaySchedule(BaseModel):
     """Schedule for a single day."""
 
@@ -53,6 +198,152 @@ class DaySchedule(BaseModel):
         return sum(slot.duration_hours for slot in self.available_slots)
 
 
+class CompiledSchedule:
+    """Lookup structures derived from a ``Schedule``, built once per change.
+
+    Blackouts are merged into one interval set of dates, each weekday's
+    default blocks become a template of minutes after local midnight, and
+    busy and explicit slots are pre-merged per date. Times are UTC minutes
+    since ``EPOCH``, converted from the schedule's IANA time zone, so
+    schedules in different zones intersect as plain ints; the weekday
+    templates are placed on each date at that date's UTC offset, which
+    handles daylight-saving changes. Free time is rounded inwards and busy
+    time outwards to the minute. Busy and explicit slots are converted a
+    date at a time, the first time that date is looked up, so building
+    this costs little however many dates a calendar fills. ``bitmap`` holds
+    the bitmap engine's form of the schedule once it has been built. Use
+    ``Schedule.compiled()`` rather than constructing this directly.
+    """
+
+    __slots__ = (
+        "zone", "blackouts", "weekdays", "specific", "busy", "bitmap", "_bounds",
+        "_specific_slots", "_busy_slots",
+    )
+
+    def __init__(self, schedule: "Schedule"):
+        self.zone = ZoneInfo(schedule.timezone)
+        self.bitmap = None
+        self._bounds: Dict[date, Tuple[int, int]] = {}
+        self.blackouts = IntervalSet(
+            (blackout.start_date, blackout.end_date + ONE_DAY) for blackout in schedule.blackout_dates
+        )
+        self.weekdays = [
+            IntervalSet(
+                (block.start_hour * 60, block.end_hour * 60)
+                for block in schedule.default_availability
+                if block.day_of_week == weekday
+            )
+            for weekday in range(7)
+        ]
+        self._specific_slots = dict(schedule.specific_availability)
+        self._busy_slots = dict(schedule.specific_busy)
+        self.specific: Dict[str, IntervalSet] = {}  # Converted so far, by date
+        self.busy: Dict[str, IntervalSet] = {}
+
+    def specific_on(self, date_str: str) -> Optional[IntervalSet]:
+        """Explicit availability on a date in UTC minutes, or None when the weekly blocks apply."""
+        specific = self.specific.get(date_str)
+        if specific is None and date_str in self._specific_slots:
+            specific = self.specific[date_str] = _minute_intervals(
+                self._specific_slots[date_str], inward=True, to_utc=self.to_utc
+            )
+        return specific
+
+    def busy_on(self, date_str: str) -> Optional[IntervalSet]:
+        """Busy time on a date in UTC minutes, or None."""
+        busy = self.busy.get(date_str)
+        if busy is None and date_str in self._busy_slots:
+            busy = self.busy[date_str] = _minute_intervals(
+                self._busy_slots[date_str], inward=False, to_utc=self.to_utc
+            )
+        return busy
+
+    def to_utc(self, minutes: int) -> int:
+        """Wall-clock minutes in this schedule's zone as UTC minutes.
+
+        Ambiguous times take the earlier offset; times skipped by a
+        daylight-saving change move forward by the size of the gap.
+        """
+        return minutes - self.zone.utcoffset(from_minutes(minutes)) // ONE_MINUTE
+
+    def to_local(self, minutes: int) -> int:
+        """UTC minutes as wall-clock minutes in this schedule's zone."""
+        local = self.zone.fromutc(from_minutes(minutes).replace(tzinfo=self.zone))
+        return to_minutes(local.replace(tzinfo=None))
+
+    def day_bounds(self, target_date: date) -> Tuple[int, int]:
+        """UTC minutes of the local midnights starting and ending a date."""
+        bounds = self._bounds.get(target_date)
+        if bounds is None:
+            midnight = day_minutes(target_date)
+            bounds = self._bounds[target_date] = (
+                self.to_utc(midnight), self.to_utc(midnight + MINUTES_PER_DAY)
+            )
+        return bounds
+
+    def localize(self, intervals: Iterable[Tuple[int, int]], target_date: date) -> Iterator[Tuple[int, int]]:
+        """UTC intervals within a local date as wall-clock minutes."""
+        start, end = self.day_bounds(target_date)
+        if end - start == MINUTES_PER_DAY:
+            # No daylight-saving change that day: one offset fits every interval
+            shift = day_minutes(target_date) - start
+            for interval_start, interval_end in intervals:
+                yield interval_start + shift, interval_end + shift
+        else:
+            for interval_start, interval_end in intervals:
+                yield self.to_local(interval_start), self.to_local(interval_end)
+
+    def is_blacked_out(self, target_date: date) -> bool:
+        """Whether a blackout covers the date."""
+        return self.blackouts.covers(target_date, target_date + ONE_DAY)
+
+    def availability(self, target_date: date) -> IntervalSet:
+        """Free time on a local date, as an interval set of UTC minutes since ``EPOCH``."""
+        if self.is_blacked_out(target_date):
+            return IntervalSet()
+
+        date_str = target_date.isoformat()
+        specific = self.specific_on(date_str)
+        if specific is not None:
+            return specific
+
+        template = self.weekdays[target_date.weekday()]
+        start, end = self.day_bounds(target_date)
+        if end - start == MINUTES_PER_DAY:
+            free = IntervalSet(
+                [(start + block_start, start + block_end) for block_start, block_end in template],
+                normalized=True,
+            )
+        else:
+            midnight = day_minutes(target_date)
+            free = IntervalSet(
+                (self.to_utc(midnight + block_start), self.to_utc(midnight + block_end))
+                for block_start, block_end in template
+            )
+        busy = self.busy_on(date_str)
+        return free - busy if busy else free
+
+    def window(self, start: int, end: int) -> IntervalSet:
+        """Free time within ``[start, end)`` UTC minutes, whichever local dates it spans."""
+        first = self.local_date(start)
+        last = self.local_date(end - 1)
+        free = []
+        while first <= last:
+            free.extend(self.availability(first))
+            first += ONE_DAY
+        return IntervalSet(free) & IntervalSet([(start, end)], normalized=True)
+
+    def availability_on(self, frame: "CompiledSchedule", target_date: date) -> IntervalSet:
+        """Free time during ``frame``'s local date, in UTC minutes."""
+        if self.zone.key == frame.zone.key:
+            return self.availability(target_date)
+        return self.window(*frame.day_bounds(target_date))
+
+    def local_date(self, minutes: int) -> date:
+        """The local date at a UTC minute."""
+        return EPOCH.date() + timedelta(days=self.to_local(minutes) // MINUTES_PER_DAY)
+
+
 class Schedule(BaseModel):
     """A user's schedule with availability."""
 
@@ -67,62 +358,74 @@ class Schedule(BaseModel):
     specific_availability: Dict[str, List[TimeSlot]] = Field(default_factory=dict)  # date_str -> slots
     specific_busy: Dict[str, List[TimeSlot]] = Field(default_factory=dict)  # date_str -> slots (private)
 
+    @field_validator("timezone")
+    @classmethod
+    def _known_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone: {value!r}")
+        return value
+
+    # Bumped by every change made through this schedule; the compiled
+    # lookup structures remember the version they were built from
+    _version: int = PrivateAttr(default=0)
+    _compiled: Optional[CompiledSchedule] = PrivateAttr(default=None)
+    _compiled_version: int = PrivateAttr(default=-1)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self.invalidate()
+
+    def add_busy(self, slot: TimeSlot) -> None:
+        """Mark a slot busy on its start date."""
+        self.specific_busy.setdefault(slot.start.date().isoformat(), []).append(slot)
+        self.invalidate()
+
+    def add_availability(self, slot: TimeSlot) -> None:
+        """Make a slot available on its start date, overriding the weekly blocks."""
+        self.specific_availability.setdefault(slot.start.date().isoformat(), []).append(slot)
+        self.invalidate()
+
+    def add_blackout(self, blackout: BlackoutDate) -> None:
+        """Black out a range of dates."""
+        self.blackout_dates.append(blackout)
+        self.invalidate()
+
+    def compiled(self) -> CompiledSchedule:
+        """The compiled form of this schedule, rebuilt only after a change.
+
+        Reassigned fields and the ``add_*`` helpers are noticed. After
+        editing the lists, dicts or items in place, e.g. changing a busy
+        slot's ``end``, call ``invalidate()``.
+        """
+        if self._compiled is None or self._compiled_version != self._version:
+            self._compiled = CompiledSchedule(self)
+            self._compiled_version = self._version
+        return self._compiled
+
+    def invalidate(self) -> None:
+        """Mark the schedule changed, so the next ``compiled()`` rebuilds."""
+        self._version += 1
+
     def get_availability_for_date(self, target_date: date) -> List[TimeSlot]:
         """Get available time slots for a specific date."""
-        date_str = target_date.isoformat()
+        return self._availability_for_date(self.compiled(), target_date)
 
-        # Check blackout dates
-        for blackout in self.blackout_dates:
-            if blackout.start_date <= target_date <= blackout.end_date:
-                return []
+    def _availability_for_date(self, compiled: CompiledSchedule, target_date: date) -> List[TimeSlot]:
+        if compiled.is_blacked_out(target_date):
+            return []
 
-        # Check specific availability overrides
+        # Specific availability overrides are returned as given
+        date_str = target_date.isoformat()
         if date_str in self.specific_availability:
             return self.specific_availability[date_str]
 
-        # Fall back to default weekly availability
-        day_of_week = target_date.weekday()
-        slots = []
-
-        for block in self.default_availability:
-            if block.day_of_week == day_of_week:
-                start = datetime.combine(target_date, datetime.min.time().replace(hour=block.start_hour))
-                end = datetime.combine(target_date, datetime.min.time().replace(hour=block.end_hour))
-                slots.append(TimeSlot(start=start, end=end))
-
-        # Remove busy slots
-        if date_str in self.specific_busy:
-            slots = self._subtract_busy_slots(slots, self.specific_busy[date_str])
-
-        return slots
-
-    def _subtract_busy_slots(
-        self,
-        available: List[TimeSlot],
-        busy: List[TimeSlot]
-    ) -> List[TimeSlot]:
-        """Remove busy periods from available slots."""
-        result = []
-
-        for avail in available:
-            remaining = [avail]
-
-            for busy_slot in busy:
-                new_remaining = []
-                for slot in remaining:
-                    if not slot.overlaps(busy_slot):
-                        new_remaining.append(slot)
-                    else:
-                        # Split the slot around the busy period
-                        if slot.start < busy_slot.start:
-                            new_remaining.append(TimeSlot(start=slot.start, end=busy_slot.start))
-                        if slot.end > busy_slot.end:
-                            new_remaining.append(TimeSlot(start=busy_slot.end, end=slot.end))
-                remaining = new_remaining
-
-            result.extend(remaining)
-
-        return result
+        return [
+            TimeSlot(start=from_minutes(start), end=from_minutes(end))
+            for start, end in compiled.localize(compiled.availability(target_date), target_date)
+        ]
 
     def get_availability_range(
         self,
@@ -130,14 +433,15 @@ class Schedule(BaseModel):
         end_date: date
     ) -> Dict[str, List[TimeSlot]]:
         """Get availability for a date range."""
+        compiled = self.compiled()
         result = {}
         current = start_date
 
         while current <= end_date:
-            slots = self.get_availability_for_date(current)
+            slots = self._availability_for_date(compiled, current)
             if slots:
                 result[current.isoformat()] = slots
-            current += timedelta(days=1)
+            current += ONE_DAY
 
         return result
 
@@ -165,42 +469,148 @@ def find_common_availability(
     min_duration_hours: float = 2.0
 ) -> List[TimeSlot]:
     """Find time slots when all participants are available."""
+    return [
+        slot.to_timeslot()
+        for slot in common_minute_slots(schedules, start_date, end_date, min_duration_hours)
+    ]
+
+
+def common_minute_slots(
+    schedules: List[Schedule],
+    start_date: date,
+    end_date: date,
+    min_duration_hours: float = 2.0
+) -> List[MinuteSlot]:
+    """``find_common_availability`` returning compact slots."""
+    return list(iter_common_minute_slots(schedules, start_date, end_date, min_duration_hours))
+
+
+def iter_common_minute_slots(
+    schedules: List[Schedule],
+    start_date: date,
+    end_date: date,
+    min_duration_hours: float = 2.0
+) -> Iterator[MinuteSlot]:
+    """Yield common slots in chronological order, computing one day at a time.
+
+    Days are the first schedule's (the organizer's) local dates, and slots
+    are in its wall-clock time; the intersection itself is done in UTC.
+    """
 
     if not schedules:
-        return []
+        return
 
-    common_slots = []
+    min_duration = math.ceil(min_duration_hours * 60 - 1e-9)
+    organizer, *others = [schedule.compiled() for schedule in schedules]
     current = start_date
 
     while current <= end_date:
-        # Get each person's availability for this date
-        all_slots = [
-            schedule.get_availability_for_date(current)
-            for schedule in schedules
-        ]
+        # Intersect everyone's availability for this date, stopping as soon
+        # as nothing is left
+        common = organizer.availability(current)
+        for other in others:
+            if not common:
+                break
+            common &= other.availability_on(organizer, current)
+
+        for start, end in organizer.localize(common.at_least(min_duration), current):
+            yield MinuteSlot(start, end)
+        current += ONE_DAY
+
+
+def merge_spans(slots: Iterable[MinuteSlot], min_duration_hours: float = 2.0) -> Iterator[MinuteSlot]:
+    """Join touching slots, such as the two sides of midnight, into continuous windows.
+
+    The engines work one calendar day at a time, so on their own they never
+    return anything longer than a day. ``slots`` must be in chronological
+    order, as the engines' iterators yield them; each window is yielded as
+    soon as a gap closes it.
+    """
+    min_duration = math.ceil(min_duration_hours * 60 - 1e-9)
+    start = end = None
+    for slot in slots:
+        if end is not None and slot.start_min <= end:
+            end = max(end, slot.end_min)
+            continue
+        if end is not None and end - start >= min_duration:
+            yield MinuteSlot(start, end)
+        start, end = slot.start_min, slot.end_min
+    if end is not None and end - start >= min_duration:
+        yield MinuteSlot(start, end)
+
+
+def find_quorum_slots(
+    schedules: List[Schedule],
+    k: int,
+    start_date: date,
+    end_date: date,
+    min_duration_hours: float = 2.0,
+    reserved: Optional[Dict[str, IntervalSet]] = None,
+) -> List[QuorumSlot]:
+    """Find windows when at least ``k`` participants are available."""
+    return list(iter_quorum_slots(schedules, k, start_date, end_date, min_duration_hours, reserved))
 
-        # Find intersections
-        if all(slots for slots in all_slots):  # Everyone has some availability
-            # Start with first person's slots
-            intersections = all_slots[0]
-
-            for other_slots in all_slots[1:]:
-                new_intersections = []
-                for slot in intersections:
-                    for other in other_slots:
-                        if slot.overlaps(other):
-                            # Find the intersection
-                            inter_start = max(slot.start, other.start)
-                            inter_end = min(slot.end, other.end)
-                            if inter_end > inter_start:
-                                new_intersections.append(TimeSlot(start=inter_start, end=inter_end))
-                intersections = new_intersections
-
-            # Filter by minimum duration
-            for slot in intersections:
-                if slot.duration_hours >= min_duration_hours:
-                    common_slots.append(slot)
-
-        current += timedelta(days=1)
-
-    return common_slots
+
+def iter_quorum_slots(
+    schedules: List[Schedule],
+    k: int,
+    start_date: date,
+    end_date: date,
+    min_duration_hours: float = 2.0,
+    reserved: Optional[Dict[str, IntervalSet]] = None,
+) -> Iterator[QuorumSlot]:
+    """Yield windows when at least ``k`` participants are free, day by day.
+
+    A counting sweep over every participant's interval boundaries splits
+    each day into segments with a constant set of free people. Adjacent
+    segments are joined greedily while at least ``k`` people stay free for
+    the whole window; ``missing`` lists everyone else. ``reserved`` maps
+    user ids to UTC minutes already booked, which count as busy.
+    """
+    if not 1 <= k <= len(schedules):
+        raise ValueError(f"Quorum must be between 1 and {len(schedules)}, got {k}")
+
+    min_duration = math.ceil(min_duration_hours * 60 - 1e-9)
+    compiled = [schedule.compiled() for schedule in schedules]
+    user_ids = [schedule.user_id for schedule in schedules]
+    current = start_date
+
+    organizer = compiled[0]
+
+    while current <= end_date:
+        # Boundaries as (minute, +bit) for starts and (minute, -bit) for ends
+        edges = []
+        for i, schedule in enumerate(compiled):
+            free_time = schedule.availability_on(organizer, current)
+            if reserved and user_ids[i] in reserved:
+                free_time = free_time - reserved[user_ids[i]]
+            for start, end in free_time:
+                edges.append((start, 1 << i))
+                edges.append((end, -(1 << i)))
+        edges.sort()
+
+        windows = []  # (start, end, people free throughout) in UTC minutes
+
+        free = 0  # Bitmask of participants free in the current segment
+        open_start: Optional[int] = None  # Start of the window being grown
+        open_free = 0  # People free for the whole window so far
+        for index, (minute, bit) in enumerate(edges):
+            free = free + bit
+            if index + 1 < len(edges) and edges[index + 1][0] == minute:
+                continue  # Apply every change at this minute first
+
+            if open_start is not None and (open_free & free).bit_count() < k:
+                if minute - open_start >= min_duration:
+                    windows.append((open_start, minute, open_free))
+                open_start = None
+            if free.bit_count() >= k:
+                if open_start is None:
+                    open_start, open_free = minute, free
+                else:
+                    open_free &= free
+
+        local = organizer.localize([(start, end) for start, end, _ in windows], current)
+        for (start, end), (_, _, free) in zip(local, windows):
+            missing = tuple(user_id for i, user_id in enumerate(user_ids) if not free >> i & 1)
+            yield QuorumSlot(start, end, missing)
+        current += ONE_DAY
@@ -3,47 +3,186 @@
 import asyncio
 import json
 from datetime import datetime
-from typing import Dict, Set, Optional
+from typing import Dict, List, Set, Optional
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+from ..config.settings import get_settings
 from .protocol import AgentMessage, MessageType, create_error_message
 
 
+# What a connection does when its outbound queue is full
+OVERFLOW_POLICIES = ("drop_oldest", "disconnect", "block")
+
+
+def encode_frame(data: dict) -> str:
+    """Encode a JSON text frame exactly as ``WebSocket.send_json`` would."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
 class AgentConnection:
-    """Represents a connected agent."""
+    """Represents a connected agent.
+
+    Outgoing messages go through a bounded queue drained by a writer task,
+    so a slow socket only delays its own agent. When the queue is full,
+    ``overflow_policy`` decides: ``"drop_oldest"`` discards the oldest
+    queued message, ``"disconnect"`` closes the socket, and ``"block"``
+    makes the sender wait for room.
+    """
 
-    def __init__(self, agent_id: str, websocket: WebSocket):
+    def __init__(
+        self,
+        agent_id: str,
+        websocket: WebSocket,
+        queue_size: int = 256,
+        overflow_policy: str = "drop_oldest",
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy!r}")
         self.agent_id = agent_id
         self.websocket = websocket
         self.connected_at = datetime.utcnow()
         self.last_ping = datetime.utcnow()
         self.subscribed_events: Set[str] = set()
 
+        self.overflow_policy = overflow_policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.max_queued = 0
+        self._writer: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def close(self):
+        """Stop the writer; anything still queued is discarded."""
+        self.closed = True
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+        self._writer = None
+        self._discard_queued()
+
     async def send(self, message: AgentMessage):
         """Send a message to this agent."""
-        await self.websocket.send_json(message.to_wire())
+        await self.send_raw(encode_frame(message.to_wire()))
 
     async def send_json(self, data: dict):
         """Send raw JSON to this agent."""
-        await self.websocket.send_json(data)
+        await self.send_raw(encode_frame(data))
+
+    async def send_raw(self, text: str):
+        """Send an already encoded text frame, waiting only under the "block" policy.
+
+        Fan-out encodes a message once and passes the same frame to every
+        recipient.
+        """
+        if not self.send_nowait(text):
+            await self.queue.put(text)
+            self.max_queued = max(self.max_queued, self.queue.qsize())
+
+    def send_nowait(self, text: str) -> bool:
+        """Queue an encoded text frame without waiting.
+
+        Returns False only when the queue is full under the "block" policy,
+        in which case nothing was queued.
+        """
+        if self.closed:
+            return True
+        if self.queue.full():
+            if self.overflow_policy == "block":
+                return False
+            self.dropped += 1
+            if self.overflow_policy == "disconnect":
+                self._abort()
+                return True
+            self.queue.get_nowait()  # drop_oldest
+        self.queue.put_nowait(text)
+        self.max_queued = max(self.max_queued, self.queue.qsize())
+        return True
+
+    def stats(self) -> dict:
+        """Queue depth and delivery counters."""
+        return {
+            "queued": self.queue.qsize(),
+            "max_queued": self.max_queued,
+            "capacity": self.queue.maxsize,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "overflow_policy": self.overflow_policy,
+        }
+
+    async def _write_loop(self):
+        while True:
+            text = await self.queue.get()
+            try:
+                await self.websocket.send_text(text)
+            except Exception:
+                # The receive loop sees the disconnect and cleans up
+                self.closed = True
+                self._discard_queued()
+                return
+            self.sent += 1
+
+    def _abort(self):
+        """Give up on a client that can't keep up; its receive loop then disconnects it."""
+        self.closed = True
+        self._closing = asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self):
+        await self.close()
+        try:
+            await self.websocket.close(code=1013, reason="Send queue overflow")
+        except Exception:
+            pass
+
+    def _discard_queued(self):
+        # Also wakes any sender blocked on a full queue
+        while not self.queue.empty():
+            self.queue.get_nowait()
 
 
 class RelayServer:
     """WebSocket relay server for routing messages between agents."""
 
-    def __init__(self):
+    def __init__(self, send_queue_size: int = 256, overflow_policy: str = "drop_oldest"):
+        self.send_queue_size = send_queue_size  # per connection
+        self.overflow_policy = overflow_policy
         self.connections: Dict[str, AgentConnection] = {}
         self.event_subscriptions: Dict[str, Set[str]] = {}  # event_id -> {agent_ids}
         self.message_log: list = []  # In production, use proper storage
 
     async def connect(self, agent_id: str, websocket: WebSocket) -> AgentConnection:
-        """Register a new agent connection."""
+        """Register a new agent connection, replacing any earlier one for the agent."""
         await websocket.accept()
-        connection = AgentConnection(agent_id, websocket)
+        previous = self.connections.pop(agent_id, None)
+        if previous is not None:
+            # Its receive loop then ends and finds it already replaced
+            await previous.close()
+            try:
+                await previous.websocket.close(code=4000, reason="Replaced by a new connection")
+            except Exception:
+                pass
+        connection = AgentConnection(
+            agent_id,
+            websocket,
+            queue_size=self.send_queue_size,
+            overflow_policy=self.overflow_policy,
+        )
+        if previous is not None:
+            connection.subscribed_events = previous.subscribed_events
+        connection.start()
         self.connections[agent_id] = connection
 
         # Broadcast hello to other agents
@@ -55,10 +194,17 @@ class RelayServer:
 
         return connection
 
-    async def disconnect(self, agent_id: str):
-        """Remove an agent connection."""
+    async def disconnect(self, agent_id: str, connection: Optional[AgentConnection] = None):
+        """Remove an agent connection.
+
+        With ``connection``, only that connection is removed; an agent that
+        has since reconnected keeps its new one.
+        """
+        if connection is not None and self.connections.get(agent_id) is not connection:
+            await connection.close()
+            return
         if agent_id in self.connections:
-            del self.connections[agent_id]
+            await self.connections.pop(agent_id).close()
 
             # Remove from all event subscriptions
             for event_id in list(self.event_subscriptions.keys()):
@@ -134,13 +280,10 @@ class RelayServer:
     async def broadcast(self, message: AgentMessage, exclude: Set[str] = None):
         """Broadcast a message to all connected agents."""
         exclude = exclude or set()
-
-        for agent_id, connection in self.connections.items():
-            if agent_id not in exclude:
-                try:
-                    await connection.send(message)
-                except Exception:
-                    pass  # Handle disconnected clients
+        await self._deliver(
+            [conn for agent_id, conn in self.connections.items() if agent_id not in exclude],
+            encode_frame(message.to_wire()),
+        )
 
     async def broadcast_to_event(
         self,
@@ -151,24 +294,32 @@ class RelayServer:
         """Broadcast a message to all agents subscribed to an event."""
         exclude = exclude or set()
         subscribers = self.event_subscriptions.get(event_id, set())
-
-        for agent_id in subscribers:
-            if agent_id not in exclude and agent_id in self.connections:
-                try:
-                    await self.connections[agent_id].send(message)
-                except Exception:
-                    pass
+        await self._deliver(
+            [
+                self.connections[agent_id]
+                for agent_id in subscribers
+                if agent_id not in exclude and agent_id in self.connections
+            ],
+            encode_frame(message.to_wire()),
+        )
 
     async def broadcast_system(self, data: dict, exclude: Set[str] = None):
         """Broadcast a system message."""
         exclude = exclude or set()
+        await self._deliver(
+            [conn for agent_id, conn in self.connections.items() if agent_id not in exclude],
+            encode_frame(data),
+        )
 
-        for agent_id, connection in self.connections.items():
-            if agent_id not in exclude:
-                try:
-                    await connection.send_json(data)
-                except Exception:
-                    pass
+    async def _deliver(self, connections: List[AgentConnection], text: str):
+        """Queue one encoded frame for every connection.
+
+        Only connections that are full under the "block" policy make this
+        wait, and they are waited on together rather than one by one.
+        """
+        waiting = [conn.send_raw(text) for conn in connections if not conn.send_nowait(text)]
+        if waiting:
+            await asyncio.gather(*waiting)
 
     def subscribe_to_event(self, agent_id: str, event_id: str):
         """Subscribe an agent to event updates."""
@@ -187,6 +338,10 @@ class RelayServer:
         if agent_id in self.connections:
             self.connections[agent_id].subscribed_events.discard(event_id)
 
+    def get_queue_stats(self) -> Dict[str, dict]:
+        """Outbound queue stats for every connection."""
+        return {agent_id: conn.stats() for agent_id, conn in self.connections.items()}
+
     def get_online_agents(self) -> list:
         """Get list of online agent IDs."""
         return list(self.connections.keys())
@@ -200,6 +355,7 @@ class RelayServer:
                 "online": True,
                 "connected_at": conn.connected_at.isoformat(),
                 "subscribed_events": list(conn.subscribed_events),
+                "send_queue": conn.stats(),
             }
         return None
 
@@ -246,19 +402,21 @@ async def websocket_endpoint(websocket: WebSocket, agent_id: str):
             # Handle special commands
             if data.get("cmd") == "subscribe":
                 relay.subscribe_to_event(agent_id, data["event_id"])
-                await websocket.send_json({"status": "subscribed", "event_id": data["event_id"]})
+                await connection.send_json({"status": "subscribed", "event_id": data["event_id"]})
             elif data.get("cmd") == "unsubscribe":
                 relay.unsubscribe_from_event(agent_id, data["event_id"])
-                await websocket.send_json({"status": "unsubscribed", "event_id": data["event_id"]})
+                await connection.send_json({"status": "unsubscribed", "event_id": data["event_id"]})
             elif data.get("cmd") == "ping":
                 connection.last_ping = datetime.utcnow()
-                await websocket.send_json({"cmd": "pong"})
+                await connection.send_json({"cmd": "pong"})
             else:
                 # Regular message
                 await relay.handle_message(agent_id, data)
 
     except WebSocketDisconnect:
-        await relay.disconnect(agent_id)
+        pass
+    finally:
+        await relay.disconnect(agent_id, connection)
 
 
 @app.get("/")
@@ -280,6 +438,12 @@ async def list_agents():
     }
 
 
+@app.get("/queues")
+async def queue_stats():
+    """Outbound queue depth and drops per connected agent."""
+    return relay.get_queue_stats()
+
+
 @app.get("/agents/{agent_id}")
 async def get_agent(agent_id: str):
     """Get status of a specific agent."""
@@ -291,6 +455,9 @@ async def get_agent(agent_id: str):
 
 def run_server(host: str = "0.0.0.0", port: int = 8765):
     """Run the relay server."""
+    config = get_settings().relay
+    relay.send_queue_size = config.send_queue_size
+    relay.overflow_policy = config.overflow_policy
     uvicorn.run(app, host=host, port=port)
 
 